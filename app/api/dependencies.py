@@ -1,13 +1,38 @@
-from fastapi import Depends, HTTPException, status
+from datetime import timedelta
+
+from fastapi import Depends, Header, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_async_session
-from app.core.security import oauth2_scheme
+from app.api.idempotency import IdempotentCall
+from app.api.profiling import can_profile
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_async_session
+from app.core.exceptions import ForbiddenError
+from app.core.leaderboard import get_leaderboard
+from app.core.milestone import get_milestone_sink
+from app.core.security import Principal, oauth2_scheme
+from app.core.slow_query import set_query_user
 from app.models.user import User
+from app.repositories.analytics import AnalyticsRepository
+from app.repositories.archive import ArchiveRepository
+from app.repositories.deletion import UserDeletionRepository
 from app.repositories.habit import HabitRepository 
+from app.repositories.idempotency import IdempotencyRepository
+from app.repositories.milestone import MilestoneRepository
+from app.repositories.sync import SyncRepository
+from app.repositories.tracking import HabitTrackingRepository
 from app.repositories.user import UserRepository
+from app.services.analytics import AnalyticsService
+from app.services.archive import ArchiveService
 from app.services.auth import AuthService
+from app.services.deletion import UserDeletionService
 from app.services.habit import HabitService
+from app.services.idempotency import IdempotencyService
+from app.services.leaderboard import LeaderboardService
+from app.services.milestone import MilestoneService
+from app.services.sync import SyncService
+from app.services.tracking import TrackingService
 
 
 async def get_user_repository(
@@ -22,6 +47,18 @@ async def get_auth_service(
     return AuthService(user_repo)
 
 
+async def get_user_deletion_repository(
+    db: AsyncSession = Depends(get_async_session),
+) -> UserDeletionRepository:
+    return UserDeletionRepository(db)
+
+
+async def get_user_deletion_service(
+    deletion_repo: UserDeletionRepository = Depends(get_user_deletion_repository),
+) -> UserDeletionService:
+    return UserDeletionService(deletion_repo, get_cache(), get_leaderboard())
+
+
 async def get_habit_repository(
     db: AsyncSession = Depends(get_async_session),
 ) -> HabitRepository:
@@ -31,14 +68,103 @@ async def get_habit_repository(
 async def get_habit_service(
     habit_repo: HabitRepository = Depends(get_habit_repository),
 ) -> HabitService:
-    return HabitService(habit_repo)
+    return HabitService(habit_repo, get_cache())
+
+
+async def get_archive_repository(
+    db: AsyncSession = Depends(get_async_session),
+) -> ArchiveRepository:
+    return ArchiveRepository(db)
+
+
+async def get_archive_service(
+    archive_repo: ArchiveRepository = Depends(get_archive_repository),
+    habit_repo: HabitRepository = Depends(get_habit_repository),
+) -> ArchiveService:
+    return ArchiveService(archive_repo, habit_repo, get_cache())
+
+
+async def get_analytics_repository(
+    db: AsyncSession = Depends(get_async_session),
+) -> AnalyticsRepository:
+    return AnalyticsRepository(db)
+
+
+async def get_analytics_service(
+    analytics_repo: AnalyticsRepository = Depends(get_analytics_repository),
+) -> AnalyticsService:
+    return AnalyticsService(analytics_repo, get_cache())
+
+
+async def get_tracking_repository(
+    db: AsyncSession = Depends(get_async_session),
+) -> HabitTrackingRepository:
+    return HabitTrackingRepository(db)
+
+
+async def get_leaderboard_service(
+    user_repo: UserRepository = Depends(get_user_repository),
+    tracking_repo: HabitTrackingRepository = Depends(get_tracking_repository),
+) -> LeaderboardService:
+    return LeaderboardService(get_leaderboard(), user_repo, tracking_repo)
+
+
+async def get_milestone_repository(
+    db: AsyncSession = Depends(get_async_session),
+) -> MilestoneRepository:
+    return MilestoneRepository(db)
+
+
+async def get_milestone_service(
+    milestone_repo: MilestoneRepository = Depends(get_milestone_repository),
+) -> MilestoneService:
+    return MilestoneService(milestone_repo, get_milestone_sink())
+
+
+async def get_tracking_service(
+    tracking_repo: HabitTrackingRepository = Depends(get_tracking_repository),
+    habit_repo: HabitRepository = Depends(get_habit_repository),
+    leaderboard_service: LeaderboardService = Depends(get_leaderboard_service),
+    milestone_service: MilestoneService = Depends(get_milestone_service),
+) -> TrackingService:
+    return TrackingService(tracking_repo, habit_repo, leaderboard_service, milestone_service)
+
+
+async def get_sync_repository(
+    db: AsyncSession = Depends(get_async_session),
+) -> SyncRepository:
+    return SyncRepository(db)
+
+
+async def get_sync_service(
+    sync_repo: SyncRepository = Depends(get_sync_repository),
+) -> SyncService:
+    return SyncService(sync_repo, timedelta(milliseconds=settings.sync.COMMIT_LAG_MS))
+
+
+async def get_idempotency_repository(
+    db: AsyncSession = Depends(get_async_session),
+) -> IdempotencyRepository:
+    return IdempotencyRepository(db)
+
+
+async def get_idempotency_service(
+    idempotency_repo: IdempotencyRepository = Depends(get_idempotency_repository),
+) -> IdempotencyService:
+    return IdempotencyService(
+        idempotency_repo,
+        ttl=timedelta(hours=settings.idempotency.TTL_HOURS),
+        lease=timedelta(seconds=settings.idempotency.LEASE_SECONDS),
+    )
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     auth_service: AuthService = Depends(get_auth_service),
 ) -> User:
-    return await auth_service.validate_token(token)
+    user = await auth_service.validate_token(token)
+    set_query_user(user.id)
+    return user
 
 
 async def get_current_active_user(
@@ -49,3 +175,47 @@ async def get_current_active_user(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Account is inactive"
         )
     return current_user
+
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    auth_service: AuthService = Depends(get_auth_service),
+) -> Principal:
+    """
+    Вариант get_current_active_user для эндпоинтов, которым нужен только
+    user.id: пользователь берётся из токена, User из БД не загружается.
+    """
+    principal = await auth_service.authenticate(token)
+    set_query_user(principal.id)
+    return principal
+
+
+async def get_profiling_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    if not can_profile(principal):
+        raise ForbiddenError("Profiling is not allowed")
+    return principal
+
+
+async def get_stream_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    Аутентификация для долгих потоковых ответов.
+    Сессия закрывается сразу после проверки токена, чтобы открытый
+    поток не удерживал соединение из пула БД.
+    """
+    async with AsyncSessionLocal() as session:
+        principal = await AuthService(UserRepository(session)).authenticate(token)
+    set_query_user(principal.id)
+    return principal
+
+
+async def get_idempotent_call(
+    request: Request,
+    idempotency_key: str | None = Header(
+        None, alias="Idempotency-Key", min_length=1, max_length=255
+    ),
+    current_user: User = Depends(get_current_active_user),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
+) -> IdempotentCall:
+    return IdempotentCall(request, current_user, idempotency_key, idempotency_service)
@@ -0,0 +1,69 @@
+from functools import lru_cache
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.models.user import User
+from app.services.idempotency import IdempotencyService, request_fingerprint
+
+
+@lru_cache
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+class IdempotentCall:
+    """
+    Обёртка обработчика эндпоинта для заголовка Idempotency-Key.
+    Без заголовка обработчик выполняется как обычно.
+    """
+
+    REPLAY_HEADER = "Idempotent-Replayed"
+
+    def __init__(
+        self,
+        request: Request,
+        user: User,
+        key: str | None,
+        service: IdempotencyService,
+    ):
+        self.request = request
+        self.user = user
+        self.key = key
+        self.service = service
+
+    async def __call__(self, handler: Callable[[], Awaitable[Any]]) -> Any:
+        if self.key is None:
+            return await handler()
+
+        route = self.request.scope["route"]
+        fingerprint = request_fingerprint(
+            self.request.method, self.request.url.path, await self.request.body()
+        )
+
+        result = await self.service.execute(
+            self.user.id,
+            self.key,
+            fingerprint,
+            route.status_code or 200,
+            handler,
+            lambda value: self._serialize(route.response_model, value),
+        )
+        if not result.replayed:
+            return result.body
+
+        headers = {self.REPLAY_HEADER: "true"}
+        if result.body is None:
+            return Response(status_code=result.status_code, headers=headers)
+        return JSONResponse(result.body, status_code=result.status_code, headers=headers)
+
+    @staticmethod
+    def _serialize(response_model: Any, value: Any) -> Any:
+        if response_model is None or value is None:
+            return None
+        adapter = _adapter(response_model)
+        return adapter.dump_python(
+            adapter.validate_python(value, from_attributes=True), mode="json"
+        )
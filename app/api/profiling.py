@@ -0,0 +1,113 @@
+import asyncio
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import AuthenticationError
+from app.core.logger import get_logger
+from app.core.profiler import (
+    RequestProfile,
+    background_profiler,
+    profile_request,
+    profile_store,
+    route_template,
+)
+from app.core.security import Principal
+from app.repositories.user import UserRepository
+from app.services.auth import AuthService
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+def can_profile(principal: Principal) -> bool:
+    """Вне production профилировать может любой пользователь, в production — только админы."""
+    if not settings.profiling.ENABLED:
+        return False
+    if settings.ENVIRONMENT != "production":
+        return True
+    return principal.email in settings.profiling.ADMINS
+
+
+def _profile_requested(scope: Scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value in (b"1", b"true")
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return query.get("profile", [""])[-1] in ("1", "true")
+
+
+async def _principal(scope: Scope) -> Principal | None:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            try:
+                async with AsyncSessionLocal() as session:
+                    return await AuthService(UserRepository(session)).authenticate(token)
+            except AuthenticationError:
+                return None
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware профилирования.
+
+    Запрос с заголовком X-Profile: 1 (или ?profile=1) от пользователя,
+    которому разрешено профилирование, выполняется под сэмплером; профиль
+    сохраняется в profile_store, его id возвращается в заголовке X-Profile-Id.
+    Без флага или прав запрос проходит как обычно. Пока работает фоновый
+    сэмплер, middleware сообщает ему, какая задача обслуживает какой маршрут.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        if background_profiler.running:
+            background_profiler.active_requests[task] = scope
+        try:
+            principal = await _principal(scope) if _profile_requested(scope) else None
+            if principal is not None and can_profile(principal):
+                await self._profile(scope, receive, send, principal)
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            background_profiler.active_requests.pop(task, None)
+
+    async def _profile(
+        self, scope: Scope, receive: Receive, send: Send, principal: Principal
+    ) -> None:
+        profile = RequestProfile(
+            scope["method"],
+            scope["path"],
+            settings.profiling.INTERVAL_MS,
+            settings.profiling.MAX_SAMPLES,
+        )
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []), (PROFILE_ID_HEADER, profile.id.encode())
+                ]
+            await send(message)
+
+        try:
+            await profile_request(profile, lambda: self.app(scope, receive, send_with_id))
+        finally:
+            profile.route = route_template(scope)
+            profile_store.add(profile)
+            logger.info("Request profiled | profile_id=%s | route=%s | user_id=%s | samples=%s",
+                        profile.id, profile.route, principal.id, len(profile.samples)
+            )
@@ -0,0 +1,123 @@
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.exceptions import AuthenticationError, TooManyRequestsError
+from app.core.logger import get_logger
+from app.core.ratelimit import BackoffPolicy, Rate, get_rate_limit_backend
+from app.core.security import decode_token
+
+logger = get_logger(__name__)
+
+
+async def client_ip(request: Request) -> str | None:
+    return request.client.host if request.client else None
+
+
+async def _body_field(request: Request, field: str) -> str | None:
+    # Тело уже прочитано FastAPI и закешировано в Request — повторного чтения сокета нет
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    value = body.get(field) if isinstance(body, dict) else None
+    return value if isinstance(value, str) else None
+
+
+async def body_email(request: Request) -> str | None:
+    email = await _body_field(request, "email")
+    return email.strip().lower() if email else None
+
+
+async def refresh_token_subject(request: Request) -> str | None:
+    # Проверка подписи HMAC дешёвая, в отличие от argon2 и запросов к БД
+    token = await _body_field(request, "refresh_token")
+    payload = decode_token(token) if token else None
+    return payload.get("sub") if payload else None
+
+
+class RateLimit:
+    """
+    Зависимость FastAPI: token bucket на ключ запроса (IP, email, user id).
+    Подключается через dependencies=[...] маршрута, поэтому отказ происходит
+    до хеширования паролей и обращений к БД.
+    """
+
+    def __init__(
+        self,
+        scope: str,
+        rate: str,
+        key: Callable[[Request], Awaitable[str | None]],
+    ):
+        self.scope = scope
+        self.rate = Rate.parse(rate)
+        self.key = key
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.ratelimit.ENABLED:
+            return
+
+        identity = await self.key(request)
+        if identity is None:
+            return
+
+        retry_after = await get_rate_limit_backend().hit(
+            f"{self.scope}:{identity}", self.rate
+        )
+        if retry_after > 0:
+            logger.warning("Rate limit exceeded | scope=%s | retry_after=%.1f",
+                           self.scope, retry_after
+            )
+            raise TooManyRequestsError(retry_after)
+
+
+login_backoff_policy = BackoffPolicy(
+    threshold=settings.ratelimit.BACKOFF_THRESHOLD,
+    base_seconds=settings.ratelimit.BACKOFF_BASE_SECONDS,
+    max_seconds=settings.ratelimit.BACKOFF_MAX_SECONDS,
+    window_seconds=settings.ratelimit.BACKOFF_WINDOW_SECONDS,
+)
+
+
+async def login_backoff(request: Request) -> AsyncIterator[None]:
+    """
+    Прогрессивная блокировка email после неудачных входов подряд:
+    base, 2 * base, 4 * base ... секунд. Успешный вход сбрасывает счётчик.
+    """
+    email = await body_email(request)
+    if not settings.ratelimit.ENABLED or email is None:
+        yield
+        return
+
+    backend = get_rate_limit_backend()
+    key = f"login:{email}"
+
+    blocked_for = await backend.blocked_for(key)
+    if blocked_for > 0:
+        raise TooManyRequestsError(blocked_for, "Too many failed login attempts")
+
+    try:
+        yield
+    except AuthenticationError:
+        delay = await backend.add_failure(key, login_backoff_policy)
+        if delay > 0:
+            logger.warning("Login backoff applied | delay=%.0fs", delay)
+        raise
+    else:
+        await backend.reset_failures(key)
+
+
+login_rate_limits = [
+    RateLimit("login:ip", settings.ratelimit.LOGIN_PER_IP, client_ip),
+    RateLimit("login:email", settings.ratelimit.LOGIN_PER_EMAIL, body_email),
+]
+
+register_rate_limits = [
+    RateLimit("register:ip", settings.ratelimit.REGISTER_PER_IP, client_ip),
+]
+
+refresh_rate_limits = [
+    RateLimit("refresh:ip", settings.ratelimit.REFRESH_PER_IP, client_ip),
+    RateLimit("refresh:user", settings.ratelimit.REFRESH_PER_USER, refresh_token_subject),
+]
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, habit, analytics
+from app.api.v1.endpoints import auth, habit, analytics, dashboard, diagnostics, events, leaderboard, profiling, sync, tracking
+from app.core.config import settings
 
 
 api_v1_router = APIRouter()
@@ -7,3 +8,16 @@ api_v1_router = APIRouter()
 api_v1_router.include_router(auth.router)
 api_v1_router.include_router(habit.router)
 api_v1_router.include_router(analytics.router)
+api_v1_router.include_router(dashboard.router)
+api_v1_router.include_router(tracking.router)
+api_v1_router.include_router(sync.router)
+api_v1_router.include_router(events.router)
+api_v1_router.include_router(leaderboard.router)
+
+# Служебные счётчики не публикуем в production
+if settings.ENVIRONMENT != "production":
+    api_v1_router.include_router(diagnostics.router)
+
+# Профили доступны по отдельному разрешению, в том числе в production
+if settings.profiling.ENABLED or settings.profiling.BACKGROUND_ENABLED:
+    api_v1_router.include_router(profiling.router)
@@ -1,3 +1,16 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import get_analytics_service, get_current_principal
+from app.core.security import Principal
+from app.schemas.analytics import HabitInsightsResponse
+from app.services.analytics import AnalyticsService
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/insights", response_model=HabitInsightsResponse)
+async def get_insights(
+    current_user: Principal = Depends(get_current_principal),
+    analytics_service: AnalyticsService = Depends(get_analytics_service),
+):
+    return await analytics_service.get_insights(current_user)
@@ -1,6 +1,16 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, status
 
-from app.api.dependencies import get_auth_service, get_current_active_user
+from app.api.dependencies import (
+    get_auth_service,
+    get_current_active_user,
+    get_user_deletion_service,
+)
+from app.api.ratelimit import (
+    login_backoff,
+    login_rate_limits,
+    refresh_rate_limits,
+    register_rate_limits,
+)
 from app.models.user import User
 from app.schemas.auth import (
     ChangePasswordRequest,
@@ -8,13 +18,19 @@ from app.schemas.auth import (
     RefreshTokenRequest,
     TokenResponse,
 )
-from app.schemas.user import UserCreate, UserResponse
+from app.schemas.user import UserCreate, UserDeletionResponse, UserResponse
 from app.services.auth import AuthService
+from app.services.deletion import UserDeletionService
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/register", status_code=status.HTTP_201_CREATED, response_model=TokenResponse)
+@router.post(
+    "/register",
+    status_code=status.HTTP_201_CREATED,
+    response_model=TokenResponse,
+    dependencies=[Depends(limit) for limit in register_rate_limits],
+)
 async def register(
     user_data: UserCreate, 
     auth_service: AuthService = Depends(get_auth_service)
@@ -22,15 +38,24 @@ async def register(
     return await auth_service.register(user_data)
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(limit) for limit in login_rate_limits] + [Depends(login_backoff)],
+)
 async def login(
     login_data: LoginRequest, 
+    background_tasks: BackgroundTasks,
     auth_service: AuthService = Depends(get_auth_service)
 ):
-    return await auth_service.login(login_data)
+    return await auth_service.login(login_data, background_tasks)
 
 
-@router.post("/refresh", response_model=TokenResponse)
+@router.post(
+    "/refresh",
+    response_model=TokenResponse,
+    dependencies=[Depends(limit) for limit in refresh_rate_limits],
+)
 async def refresh_tokens(
     request: RefreshTokenRequest,
     auth_service: AuthService = Depends(get_auth_service)
@@ -59,6 +84,26 @@ async def logout(
     await auth_service.logout(request.refresh_token)
 
 
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(
+    current_user: User = Depends(get_current_active_user),
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    await auth_service.logout_all(current_user)
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: User = Depends(get_current_active_user)):
     return current_user
+
+
+@router.delete(
+    "/me",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=UserDeletionResponse,
+)
+async def delete_me(
+    current_user: User = Depends(get_current_active_user),
+    deletion_service: UserDeletionService = Depends(get_user_deletion_service),
+):
+    return await deletion_service.request_deletion(current_user)
@@ -0,0 +1,21 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.dependencies import get_current_principal, get_habit_service
+from app.core.security import Principal
+from app.schemas.habit import HabitDashboardResponse
+from app.services.habit import HabitService
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("", response_model=list[HabitDashboardResponse])
+async def get_dashboard(
+    day: date | None = Query(
+        None, description="День, для которого строится экран (по умолчанию — сегодня)"
+    ),
+    current_user: Principal = Depends(get_current_principal),
+    habit_service: HabitService = Depends(get_habit_service),
+):
+    return await habit_service.get_dashboard(current_user, day)
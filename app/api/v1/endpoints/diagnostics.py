@@ -0,0 +1,39 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.dependencies import get_profiling_principal
+from app.core.events import event_hub
+from app.core.revocation import revocation_store
+from app.core.singleflight import singleflight
+from app.core.slow_query import slow_query_log
+
+router = APIRouter(
+    prefix="/diagnostics",
+    tags=["diagnostics"],
+    dependencies=[Depends(get_profiling_principal)],
+)
+
+
+@router.get("/singleflight")
+async def get_singleflight_stats():
+    return singleflight.stats
+
+
+@router.get("/events")
+async def get_event_hub_stats():
+    return event_hub.stats
+
+
+@router.get("/revocation")
+async def get_revocation_stats():
+    return revocation_store.stats
+
+
+@router.get("/queries")
+async def get_query_stats(
+    order_by: Literal["total_ms", "count", "max_ms", "slow_count"] = Query("total_ms"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Запросы к БД по отпечаткам: где тратится время и чему нужен индекс."""
+    return slow_query_log.top(limit, order_by)
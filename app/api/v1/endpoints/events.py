@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.api.dependencies import get_stream_user
+from app.core.config import settings
+from app.core.events import event_hub, event_stream
+from app.core.security import Principal
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("/stream")
+async def stream_events(current_user: Principal = Depends(get_stream_user)):
+    return StreamingResponse(
+        event_stream(event_hub, current_user.id, settings.events.HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Отключаем буферизацию ответа в nginx
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -1,9 +1,18 @@
 from fastapi import APIRouter, Depends, Path, Query, status
 
-from app.api.dependencies import get_current_active_user, get_habit_service
+from app.api.dependencies import (
+    get_archive_service,
+    get_current_active_user,
+    get_current_principal,
+    get_habit_service,
+    get_idempotent_call,
+)
+from app.api.idempotency import IdempotentCall
 from app.core.logger import get_logger
+from app.core.security import Principal
 from app.models.user import User
 from app.schemas.habit import HabitCreate, HabitResponse, HabitUpdate
+from app.services.archive import ArchiveService
 from app.services.habit import HabitService
 
 logger = get_logger(__name__)
@@ -16,22 +25,33 @@ async def create_habit(
     habit_data: HabitCreate,
     current_user: User = Depends(get_current_active_user),
     habit_service: HabitService = Depends(get_habit_service),
+    idempotent: IdempotentCall = Depends(get_idempotent_call),
 ):
-    return await habit_service.create_habit(current_user, habit_data)
+    return await idempotent(
+        lambda: habit_service.create_habit(current_user, habit_data)
+    )
 
 
 @router.get("", response_model=list[HabitResponse])
 async def get_habits(
     only_active: bool = Query(True, description="Only active habits"),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_principal),
     habit_service: HabitService = Depends(get_habit_service),
 ):
     return await habit_service.get_user_habits(current_user, only_active)
 
 
+@router.get("/archived", response_model=list[HabitResponse])
+async def get_archived_habits(
+    current_user: Principal = Depends(get_current_principal),
+    archive_service: ArchiveService = Depends(get_archive_service),
+):
+    return await archive_service.get_archived_habits(current_user)
+
+
 @router.get("/{habit_id}", response_model=HabitResponse)
 async def get_habit(
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_principal),
     habit_id: int = Path(..., ge=1),
     habit_service: HabitService = Depends(get_habit_service),
 ):
@@ -44,8 +64,11 @@ async def update_habit(
     current_user: User = Depends(get_current_active_user),
     habit_id: int = Path(..., ge=1),
     habit_service: HabitService = Depends(get_habit_service),
+    idempotent: IdempotentCall = Depends(get_idempotent_call),
 ):
-    return await habit_service.update_habit(current_user, habit_id, habit_data)
+    return await idempotent(
+        lambda: habit_service.update_habit(current_user, habit_id, habit_data)
+    )
 
 
 @router.delete("/{habit_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -54,4 +77,16 @@ async def delete_habit(
     habit_id: int = Path(..., ge=1),
     habit_service: HabitService = Depends(get_habit_service),
 ):
-    await habit_service.deactivate_habit(current_user, habit_id)
\ No newline at end of file
+    await habit_service.deactivate_habit(current_user, habit_id)
+
+
+@router.post("/{habit_id}/restore", response_model=HabitResponse)
+async def restore_habit(
+    current_user: User = Depends(get_current_active_user),
+    habit_id: int = Path(..., ge=1),
+    archive_service: ArchiveService = Depends(get_archive_service),
+    idempotent: IdempotentCall = Depends(get_idempotent_call),
+):
+    return await idempotent(
+        lambda: archive_service.restore_habit(current_user, habit_id)
+    )
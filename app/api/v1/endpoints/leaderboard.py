@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Query, status
+
+from app.api.dependencies import get_current_active_user, get_leaderboard_service
+from app.models.user import User
+from app.schemas.leaderboard import Board, LeaderboardParticipation, LeaderboardResponse
+from app.services.leaderboard import LeaderboardService
+
+router = APIRouter(prefix="/leaderboards", tags=["leaderboards"])
+
+
+@router.put("/participation", status_code=status.HTTP_204_NO_CONTENT)
+async def set_participation(
+    data: LeaderboardParticipation,
+    current_user: User = Depends(get_current_active_user),
+    leaderboard_service: LeaderboardService = Depends(get_leaderboard_service),
+):
+    await leaderboard_service.set_participation(current_user, data.enabled)
+
+
+@router.get("/{board}", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    board: Board,
+    limit: int = Query(10, ge=1, le=LeaderboardService.MAX_LIMIT),
+    current_user: User = Depends(get_current_active_user),
+    leaderboard_service: LeaderboardService = Depends(get_leaderboard_service),
+):
+    return await leaderboard_service.get_board(current_user, board, limit)
+
+
+@router.get("/{board}/around-me", response_model=LeaderboardResponse)
+async def get_leaderboard_around_me(
+    board: Board,
+    radius: int = Query(5, ge=1, le=LeaderboardService.MAX_RADIUS),
+    current_user: User = Depends(get_current_active_user),
+    leaderboard_service: LeaderboardService = Depends(get_leaderboard_service),
+):
+    return await leaderboard_service.get_around(current_user, board, radius)
@@ -0,0 +1,64 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from app.api.dependencies import get_profiling_principal
+from app.core.exceptions import NotFoundError
+from app.core.profiler import background_profiler, profile_store
+
+router = APIRouter(
+    prefix="/profiles",
+    tags=["profiling"],
+    dependencies=[Depends(get_profiling_principal)],
+)
+
+
+@router.get("")
+async def list_profiles():
+    """Последние профили запросов, снятые по X-Profile: 1."""
+    return [profile.summary() for profile in profile_store.recent()]
+
+
+@router.get("/hot")
+async def get_hot_stacks(
+    route: str | None = Query(None, description="Шаблон маршрута, например 'GET /api/v1/habits'"),
+    format: Literal["json", "collapsed"] = Query("json"),
+    limit: int = Query(20, ge=1, le=500),
+):
+    """Горячие стеки фонового сэмплера по шаблонам маршрутов."""
+    hot_stacks = background_profiler.hot_stacks
+    if format == "collapsed":
+        return PlainTextResponse(hot_stacks.collapsed(route))
+
+    routes = hot_stacks.routes()
+    if route is not None:
+        routes = {route: routes.get(route, 0)}
+    return {
+        "running": background_profiler.running,
+        "interval_ms": background_profiler.interval_ms,
+        "routes": {
+            name: {
+                "samples": samples,
+                "stacks": [
+                    {"stack": ";".join(frame.label for frame in stack), "count": count}
+                    for stack, count in hot_stacks.top(name, limit)
+                ],
+            }
+            for name, samples in routes.items()
+        },
+    }
+
+
+@router.get("/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: Literal["speedscope", "collapsed"] = Query("speedscope"),
+):
+    """Профиль запроса: JSON для speedscope.app или collapsed stacks для flamegraph."""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise NotFoundError("Profile")
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed())
+    return profile.speedscope()
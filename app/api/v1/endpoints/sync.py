@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.api.dependencies import get_current_principal, get_sync_service
+from app.core.security import Principal
+from app.schemas.sync import SyncResponse
+from app.services.sync import SyncService
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("", response_model=SyncResponse)
+async def get_changes(
+    since: str | None = Query(
+        None, description="Курсор из предыдущего ответа; без него — полная выгрузка"
+    ),
+    limit: int = Query(500, ge=1, le=1000, description="Максимум изменений в ответе"),
+    current_user: Principal = Depends(get_current_principal),
+    sync_service: SyncService = Depends(get_sync_service),
+):
+    return await sync_service.get_changes(current_user, since, limit)
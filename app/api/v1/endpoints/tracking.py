@@ -0,0 +1,77 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, Path, Query, status
+
+from app.api.dependencies import (
+    get_current_active_user,
+    get_current_principal,
+    get_idempotent_call,
+    get_tracking_service,
+)
+from app.api.idempotency import IdempotentCall
+from app.core.security import Principal
+from app.models.user import User
+from app.schemas.habit import (
+    HabitHeatmapResponse,
+    HabitTrackingBatchCreate,
+    HabitTrackingBatchResponse,
+    HabitTrackingResponse,
+    HeatmapEncoding,
+)
+from app.services.tracking import TrackingService
+
+router = APIRouter(prefix="/tracking", tags=["tracking"])
+
+
+@router.post("/batch", response_model=HabitTrackingBatchResponse)
+async def check_in_batch(
+    data: HabitTrackingBatchCreate,
+    current_user: User = Depends(get_current_active_user),
+    tracking_service: TrackingService = Depends(get_tracking_service),
+    idempotent: IdempotentCall = Depends(get_idempotent_call),
+):
+    return await idempotent(
+        lambda: tracking_service.check_in_batch(current_user, data)
+    )
+
+
+@router.get("/heatmap", response_model=HabitHeatmapResponse, response_model_exclude_none=True)
+async def get_heatmap(
+    date_from: date,
+    date_to: date,
+    encoding: HeatmapEncoding = Query(HeatmapEncoding.BITS, description="Day encoding"),
+    habit_id: int | None = Query(None, ge=1, description="Only this habit"),
+    current_user: Principal = Depends(get_current_principal),
+    tracking_service: TrackingService = Depends(get_tracking_service),
+):
+    return await tracking_service.get_heatmap(
+        current_user, date_from, date_to, encoding, habit_id
+    )
+
+
+@router.get("/{habit_id}", response_model=list[HabitTrackingResponse])
+async def get_tracking_history(
+    date_from: date,
+    date_to: date,
+    include_archive: bool = Query(False, description="Include archived trackings"),
+    current_user: Principal = Depends(get_current_principal),
+    habit_id: int = Path(..., ge=1),
+    tracking_service: TrackingService = Depends(get_tracking_service),
+):
+    return await tracking_service.get_history(
+        current_user, habit_id, date_from, date_to, include_archive
+    )
+
+
+@router.delete("/{habit_id}/{day}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_check_in(
+    day: date,
+    current_user: User = Depends(get_current_active_user),
+    habit_id: int = Path(..., ge=1),
+    tracking_service: TrackingService = Depends(get_tracking_service),
+    idempotent: IdempotentCall = Depends(get_idempotent_call),
+):
+    async def delete():
+        await tracking_service.delete_check_in(current_user, habit_id, day)
+
+    return await idempotent(delete)
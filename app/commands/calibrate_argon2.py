@@ -0,0 +1,117 @@
+"""
+Подбор параметров argon2id под CPU хоста, на котором работает приложение.
+
+Память фиксируется (--memory-mib), time_cost увеличивается, пока медиана
+одного хеширования укладывается в --target-ms. Если даже time_cost=1 не
+укладывается, память уменьшается вдвое, но не ниже --min-memory-mib.
+Результат печатается и, с --write, записывается в .env как ARGON2_*,
+откуда его читает AuthSettings. Старые хеши обновятся при следующем входе.
+
+Запуск на целевом хосте:
+    python -m app.commands.calibrate_argon2 --target-ms 250 --write
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+# Путь повторяет app.core.config.BASE_DIR: импорт конфигурации собрал бы
+# Settings(), а калибровка должна работать и до заполнения .env
+ENV_FILE = Path(__file__).parent.parent.parent / ".env"
+
+SAMPLE_PASSWORD = "calibration-Passw0rd!"
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, rounds: int) -> float:
+    """Медиана времени одного хеширования, мс."""
+    hasher = Argon2Hasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    hasher.hash(SAMPLE_PASSWORD)  # прогрев: выделение памяти, потоки
+
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.hash(SAMPLE_PASSWORD)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def calibrate(
+    target_ms: float,
+    memory_mib: int,
+    min_memory_mib: int,
+    parallelism: int,
+    rounds: int,
+    max_time_cost: int = 20,
+) -> dict:
+    memory_cost = memory_mib * 1024
+
+    while True:
+        elapsed = measure(1, memory_cost, parallelism, rounds)
+        if elapsed <= target_ms or memory_cost // 2 < min_memory_mib * 1024:
+            break
+        memory_cost //= 2
+
+    time_cost = 1
+    while time_cost < max_time_cost:
+        candidate = measure(time_cost + 1, memory_cost, parallelism, rounds)
+        if candidate > target_ms:
+            break
+        time_cost, elapsed = time_cost + 1, candidate
+
+    return {
+        "ARGON2_TIME_COST": time_cost,
+        "ARGON2_MEMORY_COST": memory_cost,
+        "ARGON2_PARALLELISM": parallelism,
+        "hash_ms": round(elapsed, 1),
+        "hashes_per_second": round(1000 / elapsed, 1),
+    }
+
+
+def write_env(path: Path, values: dict[str, int]) -> None:
+    """Обновляет ARGON2_* в .env, остальные строки не трогает."""
+    lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+    pending = dict(values)
+
+    for i, line in enumerate(lines):
+        name = line.split("=", 1)[0].strip()
+        if name in pending:
+            lines[i] = f"{name}={pending.pop(name)}"
+
+    lines += [f"{name}={value}" for name, value in pending.items()]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target-ms", type=float, default=250,
+                        help="Допустимое время одного хеширования")
+    parser.add_argument("--memory-mib", type=int, default=64)
+    parser.add_argument("--min-memory-mib", type=int, default=19)
+    parser.add_argument("--parallelism", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--write", action="store_true",
+                        help="Записать параметры в .env")
+    parser.add_argument("--env-file", type=Path, default=ENV_FILE)
+    args = parser.parse_args()
+
+    result = calibrate(
+        args.target_ms, args.memory_mib, args.min_memory_mib, args.parallelism, args.rounds
+    )
+    print(json.dumps(result, indent=2))
+
+    if args.write:
+        write_env(
+            args.env_file,
+            {name: value for name, value in result.items() if name.startswith("ARGON2_")},
+        )
+        print(f"Written to {args.env_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CacheBackend(ABC):
+    """Общий интерфейс кэша: ключи — строки, значения — сериализованные байты."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int | None = None) -> None: ...
+
+    @abstractmethod
+    async def add(self, key: str, value: bytes, ttl: int | None = None) -> bool:
+        """Записывает значение, только если ключа ещё нет."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU с ограничением по суммарному размеру ключей и значений."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+        self._size = 0
+
+    async def get(self, key: str) -> bytes | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        entry_size = len(key) + len(value)
+        if entry_size > self.max_bytes:
+            return
+
+        self._remove(key)
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (value, expires_at)
+        self._size += entry_size
+
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+
+    async def add(self, key: str, value: bytes, ttl: int | None = None) -> bool:
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._size -= len(key) + len(item[0])
+
+
+class RedisCache(CacheBackend):
+    """
+    Кэш в Redis для нескольких инстансов приложения.
+    Ошибки Redis не пробрасываются: кэш деградирует до промаха.
+    """
+
+    def __init__(self, url: str):
+        self._client = Redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await self._client.get(key)
+        except RedisError as e:
+            logger.warning("Cache get failed | key=%s | error=%s", key, e)
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        try:
+            await self._client.set(key, value, ex=ttl)
+        except RedisError as e:
+            logger.warning("Cache set failed | key=%s | error=%s", key, e)
+
+    async def add(self, key: str, value: bytes, ttl: int | None = None) -> bool:
+        try:
+            return bool(await self._client.set(key, value, ex=ttl, nx=True))
+        except RedisError as e:
+            logger.warning("Cache add failed | key=%s | error=%s", key, e)
+            return False
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self._client.delete(key)
+        except RedisError as e:
+            logger.warning("Cache delete failed | key=%s | error=%s", key, e)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class FakeCache(CacheBackend):
+    """Простой словарь без TTL и вытеснения — для тестов."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        self.data[key] = value
+
+    async def add(self, key: str, value: bytes, ttl: int | None = None) -> bool:
+        if key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+
+_cache: CacheBackend | None = None
+
+
+def get_cache() -> CacheBackend:
+    global _cache
+
+    if _cache is None:
+        if settings.cache.BACKEND == "redis":
+            _cache = RedisCache(settings.redis.REDIS_URL)
+        elif settings.cache.BACKEND == "fake":
+            _cache = FakeCache()
+        else:
+            _cache = MemoryCache(settings.cache.MAX_BYTES)
+
+        logger.info("Cache backend initialized | backend=%s", settings.cache.BACKEND)
+
+    return _cache
+
+
+async def close_cache() -> None:
+    global _cache
+
+    if _cache is not None:
+        await _cache.close()
+        _cache = None
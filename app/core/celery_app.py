@@ -0,0 +1,41 @@
+from celery import Celery
+from celery.schedules import crontab
+
+from app.core.config import settings
+
+
+celery_app = Celery(
+    "habit_tracker",
+    broker=settings.redis.REDIS_URL,
+    include=["app.tasks.celery_tasks"],
+)
+
+celery_app.conf.update(
+    timezone="UTC",
+    # Задачи обслуживания идемпотентны: при падении воркера повторяем
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+    beat_schedule={
+        "maintain-tracking-partitions": {
+            "task": "app.tasks.celery_tasks.maintain_tracking_partitions",
+            "schedule": crontab(hour=3, minute=15),
+        },
+        "archive-inactive-habits": {
+            "task": "app.tasks.celery_tasks.archive_inactive_habits",
+            "schedule": crontab(hour=3, minute=45),
+        },
+        "compute-habit-insights": {
+            "task": "app.tasks.celery_tasks.compute_habit_insights",
+            "schedule": crontab(hour=4, minute=15),
+        },
+        "purge-idempotency-keys": {
+            "task": "app.tasks.celery_tasks.purge_idempotency_keys",
+            "schedule": crontab(minute=30),
+        },
+        "purge-deleted-users": {
+            "task": "app.tasks.celery_tasks.purge_deleted_users",
+            "schedule": crontab(minute="*/5"),
+        },
+    },
+)
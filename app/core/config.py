@@ -19,6 +19,8 @@ class DbSettings(BaseSettings):
     USER: str = Field(alias="DB_USER")
     PASS: str = Field(alias="DB_PASS")
     NAME: str = Field(alias="DB_NAME")
+    # Режим для тестов: любая неявная подгрузка атрибута или связи — ошибка
+    RAISE_ON_LAZY_LOAD: bool = Field(False, alias="DB_RAISE_ON_LAZY_LOAD")
 
     model_config = settings_config
 
@@ -28,11 +30,196 @@ class DbSettings(BaseSettings):
         return f"postgresql+asyncpg://{self.USER}:{self.PASS}@{self.HOST}:{self.PORT}/{self.NAME}"
 
 
+class RedisSettings(BaseSettings):
+    HOST: str = Field("localhost", alias="REDIS_HOST")
+    PORT: int = Field(6379, alias="REDIS_PORT")
+    DB: int = Field(0, alias="REDIS_DB")
+
+    model_config = settings_config
+
+    @computed_field
+    @property
+    def REDIS_URL(self) -> str:
+        return f"redis://{self.HOST}:{self.PORT}/{self.DB}"
+
+
+class CacheSettings(BaseSettings):
+    # memory — LRU внутри одного процесса: другие воркеры uvicorn и задачи
+    # Celery его не видят и не инвалидируют, поэтому только для разработки
+    # с одним воркером; redis — общий кэш для нескольких воркеров и инстансов
+    BACKEND: Literal["memory", "redis", "fake"] = Field("memory", alias="CACHE_BACKEND")
+    MAX_BYTES: int = Field(32 * 1024 * 1024, alias="CACHE_MAX_BYTES")
+    TTL_SECONDS: int = Field(300, alias="CACHE_TTL_SECONDS")
+
+    model_config = settings_config
+
+
+class EventSettings(BaseSettings):
+    # memory — события только внутри одного процесса: SSE-клиент другого
+    # воркера uvicorn и вехи из Celery их не получат, поэтому только для
+    # разработки с одним воркером; redis — рассылка между воркерами
+    BACKEND: Literal["memory", "redis"] = Field("memory", alias="EVENTS_BACKEND")
+    QUEUE_SIZE: int = Field(100, alias="EVENTS_QUEUE_SIZE")
+    HEARTBEAT_SECONDS: int = Field(15, alias="EVENTS_HEARTBEAT_SECONDS")
+
+    model_config = settings_config
+
+
+class IdempotencySettings(BaseSettings):
+    # Сколько хранится ответ на запрос с заголовком Idempotency-Key
+    TTL_HOURS: int = Field(24, alias="IDEMPOTENCY_TTL_HOURS")
+    # Сколько ключ считается занятым выполняющимся запросом; дольше — процесс
+    # считается упавшим, и повтор с тем же ключом выполняется заново
+    LEASE_SECONDS: int = Field(60, alias="IDEMPOTENCY_LEASE_SECONDS")
+
+    model_config = settings_config
+
+
+class SyncSettings(BaseSettings):
+    # Запас к горизонту /sync: изменения моложе начала самой старой открытой
+    # транзакции минус этот запас в ленту ещё не попадают
+    COMMIT_LAG_MS: int = Field(500, alias="SYNC_COMMIT_LAG_MS")
+
+    model_config = settings_config
+
+
+class RevocationSettings(BaseSettings):
+    # postgres — общий список отзыва, fake — только внутри процесса (тесты)
+    BACKEND: Literal["postgres", "fake"] = Field("postgres", alias="REVOCATION_BACKEND")
+    BLOOM_CAPACITY: int = Field(1_000_000, alias="REVOCATION_BLOOM_CAPACITY")
+    BLOOM_ERROR_RATE: float = Field(0.01, alias="REVOCATION_BLOOM_ERROR_RATE")
+    LRU_SIZE: int = Field(10_000, alias="REVOCATION_LRU_SIZE")
+    # Как часто воркер подтягивает отзывы, сделанные другими воркерами
+    REFRESH_SECONDS: int = Field(5, alias="REVOCATION_REFRESH_SECONDS")
+    # Полная перезагрузка выбрасывает из фильтра истёкшие jti
+    REBUILD_SECONDS: int = Field(3600, alias="REVOCATION_REBUILD_SECONDS")
+
+    model_config = settings_config
+
+
+class RateLimitSettings(BaseSettings):
+    ENABLED: bool = Field(True, alias="RATELIMIT_ENABLED")
+    # memory — лимиты на процесс, redis — общие для всех инстансов
+    BACKEND: Literal["memory", "redis"] = Field("memory", alias="RATELIMIT_BACKEND")
+    MAX_KEYS: int = Field(100_000, alias="RATELIMIT_MAX_KEYS")
+
+    # Лимиты маршрутов в формате "<количество>/<second|minute|hour|day>"
+    LOGIN_PER_IP: str = Field("20/minute", alias="RATELIMIT_LOGIN_PER_IP")
+    LOGIN_PER_EMAIL: str = Field("5/minute", alias="RATELIMIT_LOGIN_PER_EMAIL")
+    REGISTER_PER_IP: str = Field("5/minute", alias="RATELIMIT_REGISTER_PER_IP")
+    REFRESH_PER_IP: str = Field("30/minute", alias="RATELIMIT_REFRESH_PER_IP")
+    REFRESH_PER_USER: str = Field("10/minute", alias="RATELIMIT_REFRESH_PER_USER")
+
+    # Прогрессивная блокировка email после неудачных входов подряд
+    BACKOFF_THRESHOLD: int = Field(3, alias="RATELIMIT_BACKOFF_THRESHOLD")
+    BACKOFF_BASE_SECONDS: float = Field(1.0, alias="RATELIMIT_BACKOFF_BASE_SECONDS")
+    BACKOFF_MAX_SECONDS: float = Field(900.0, alias="RATELIMIT_BACKOFF_MAX_SECONDS")
+    BACKOFF_WINDOW_SECONDS: int = Field(3600, alias="RATELIMIT_BACKOFF_WINDOW_SECONDS")
+
+    model_config = settings_config
+
+
+class PartitionSettings(BaseSettings):
+    # На сколько месяцев вперёд заранее создаются секции habit_tracking
+    MONTHS_AHEAD: int = Field(3, alias="PARTITION_MONTHS_AHEAD")
+    # Секции старше срока переносятся в архив (схема archive); 0 — хранить всё
+    RETENTION_MONTHS: int = Field(0, alias="PARTITION_RETENTION_MONTHS")
+
+    model_config = settings_config
+
+
+class ArchiveSettings(BaseSettings):
+    # Привычки, деактивированные дольше срока, переносятся в схему archive; 0 — не переносить
+    INACTIVE_DAYS: int = Field(90, alias="ARCHIVE_INACTIVE_DAYS")
+    # Привычек на транзакцию и пакетов за один запуск задачи
+    BATCH_SIZE: int = Field(200, alias="ARCHIVE_BATCH_SIZE")
+    MAX_BATCHES: int = Field(100, alias="ARCHIVE_MAX_BATCHES")
+
+    model_config = settings_config
+
+
+class DeletionSettings(BaseSettings):
+    # Строк на один DELETE и пакетов за один запуск задачи очистки
+    BATCH_SIZE: int = Field(5000, alias="DELETION_BATCH_SIZE")
+    MAX_BATCHES: int = Field(500, alias="DELETION_MAX_BATCHES")
+
+    model_config = settings_config
+
+
+class AnalyticsSettings(BaseSettings):
+    # Окно аналитики в днях, заканчивается вчера
+    WINDOW_DAYS: int = Field(182, alias="ANALYTICS_WINDOW_DAYS")
+    # Пользователей в одной матрице фоновой задачи
+    BATCH_USERS: int = Field(500, alias="ANALYTICS_BATCH_USERS")
+    CACHE_TTL_SECONDS: int = Field(2 * 24 * 3600, alias="ANALYTICS_CACHE_TTL_SECONDS")
+
+    model_config = settings_config
+
+
+class LeaderboardSettings(BaseSettings):
+    # memory — skip list в процессе со снимком в Postgres: только один
+    # воркер, иначе у каждого свои места и свой писатель снимка;
+    # redis — sorted sets (несколько воркеров и инстансов), fake — для тестов
+    BACKEND: Literal["memory", "redis", "fake"] = Field("memory", alias="LEADERBOARD_BACKEND")
+    # Как часто рейтинги в памяти сбрасываются в leaderboard_scores
+    SNAPSHOT_SECONDS: int = Field(60, alias="LEADERBOARD_SNAPSHOT_SECONDS")
+
+    model_config = settings_config
+
+
+class MilestoneSettings(BaseSettings):
+    # Куда уходят вехи целей: log — только в лог, celery — задача уведомления
+    SINK: Literal["log", "celery"] = Field("log", alias="MILESTONES_SINK")
+    # Привычек в одной порции начального расчёта прогресса
+    BACKFILL_BATCH: int = Field(2000, alias="MILESTONES_BACKFILL_BATCH")
+
+    model_config = settings_config
+
+
+class SlowQuerySettings(BaseSettings):
+    # Запросы дольше порога пишутся в лог с маршрутом и пользователем
+    THRESHOLD_MS: float = Field(200.0, alias="SLOW_QUERY_THRESHOLD_MS")
+    MAX_FINGERPRINTS: int = Field(1000, alias="SLOW_QUERY_MAX_FINGERPRINTS")
+    # Доля медленных SELECT, для которых снимается EXPLAIN (ANALYZE, BUFFERS); 0 — выключено
+    EXPLAIN_SAMPLE_RATE: float = Field(0.0, alias="SLOW_QUERY_EXPLAIN_SAMPLE_RATE")
+    # Не чаще раза в интервал на один отпечаток запроса
+    EXPLAIN_INTERVAL_SECONDS: int = Field(600, alias="SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS")
+    EXPLAIN_TIMEOUT_MS: int = Field(5000, alias="SLOW_QUERY_EXPLAIN_TIMEOUT_MS")
+
+    model_config = settings_config
+
+
+class ProfilingSettings(BaseSettings):
+    # Профиль отдельного запроса по заголовку X-Profile: 1 или ?profile=1
+    ENABLED: bool = Field(False, alias="PROFILING_ENABLED")
+    # В production профилировать могут только перечисленные email
+    ADMINS: list[str] = Field([], alias="PROFILING_ADMINS")
+    INTERVAL_MS: float = Field(1.0, alias="PROFILING_INTERVAL_MS")
+    MAX_SAMPLES: int = Field(30_000, alias="PROFILING_MAX_SAMPLES")
+    STORED_PROFILES: int = Field(50, alias="PROFILING_STORED_PROFILES")
+
+    # Фоновый сэмплер с низкой частотой: горячие стеки по шаблонам маршрутов
+    BACKGROUND_ENABLED: bool = Field(False, alias="PROFILING_BACKGROUND_ENABLED")
+    BACKGROUND_INTERVAL_MS: float = Field(50.0, alias="PROFILING_BACKGROUND_INTERVAL_MS")
+    MAX_STACKS_PER_ROUTE: int = Field(500, alias="PROFILING_MAX_STACKS_PER_ROUTE")
+
+    model_config = settings_config
+
+
 class AuthSettings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Эндпоинты чтения доверяют access-токену без загрузки User из БД;
+    # блокировка аккаунта действует через отзыв токенов
+    STATELESS_ACCESS_TOKENS: bool = True
+
+    # Параметры argon2id; подбираются под CPU хоста командой
+    # python -m app.commands.calibrate_argon2
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
 
     model_config = settings_config
 
@@ -55,11 +242,37 @@ class Settings(BaseSettings):
     # Сетевые настройки сервера uvicorn
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    # Число воркеров: uvicorn берёт его из WEB_CONCURRENCY вместо --workers
+    WORKERS: int = Field(1, alias="WEB_CONCURRENCY")
 
     db: DbSettings = Field(default_factory=DbSettings)
     auth: AuthSettings = Field(default_factory=AuthSettings)
+    redis: RedisSettings = Field(default_factory=RedisSettings)
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+    events: EventSettings = Field(default_factory=EventSettings)
+    idempotency: IdempotencySettings = Field(default_factory=IdempotencySettings)
+    sync: SyncSettings = Field(default_factory=SyncSettings)
+    revocation: RevocationSettings = Field(default_factory=RevocationSettings)
+    ratelimit: RateLimitSettings = Field(default_factory=RateLimitSettings)
+    profiling: ProfilingSettings = Field(default_factory=ProfilingSettings)
+    slow_query: SlowQuerySettings = Field(default_factory=SlowQuerySettings)
+    partitions: PartitionSettings = Field(default_factory=PartitionSettings)
+    archive: ArchiveSettings = Field(default_factory=ArchiveSettings)
+    deletion: DeletionSettings = Field(default_factory=DeletionSettings)
+    leaderboard: LeaderboardSettings = Field(default_factory=LeaderboardSettings)
+    analytics: AnalyticsSettings = Field(default_factory=AnalyticsSettings)
+    milestones: MilestoneSettings = Field(default_factory=MilestoneSettings)
 
     model_config = settings_config
 
+    def process_local_backends(self) -> list[str]:
+        """Бэкенды в режиме memory: их состояние не выходит за пределы процесса."""
+        backends = {
+            "CACHE_BACKEND": self.cache.BACKEND,
+            "EVENTS_BACKEND": self.events.BACKEND,
+            "LEADERBOARD_BACKEND": self.leaderboard.BACKEND,
+        }
+        return [name for name, backend in backends.items() if backend == "memory"]
+
 
 settings = Settings()
@@ -1,15 +1,20 @@
 from typing import AsyncGenerator
 
 from datetime import datetime
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, event
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, Session
 
 from app.core.config import settings
+from app.core.slow_query import slow_query_log
 
 
 engine = create_async_engine(settings.db.DATABASE_URL, echo=False)
 
+# Время запросов по отпечаткам и лог медленных запросов
+slow_query_log.install(engine)
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -17,6 +22,35 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+class LazyLoadError(InvalidRequestError):
+    """Неявная подгрузка в режиме DB_RAISE_ON_LAZY_LOAD."""
+
+
+def _forbid_lazy_load(state: ORMExecuteState) -> None:
+    # selectinload и прочие явные стратегии идут без lazy_loaded_from;
+    # подгрузка истёкших или отложенных колонок — is_column_load
+    if not state.is_select:
+        return
+    if state.lazy_loaded_from is not None or state.is_column_load:
+        raise LazyLoadError(
+            f"Unexpected lazy load: {state.statement}. "
+            "Load it explicitly with query options or select the columns"
+        )
+
+
+def forbid_lazy_loads() -> None:
+    """
+    Любая подгрузка, которую не запросил сам запрос, становится ошибкой.
+    С AsyncAttrs такая подгрузка через awaitable_attrs тихо добавляет
+    по запросу на объект; в тестах её нужно ловить сразу.
+    """
+    event.listen(Session, "do_orm_execute", _forbid_lazy_load)
+
+
+if settings.db.RAISE_ON_LAZY_LOAD:
+    forbid_lazy_loads()
+
+
 class Base(AsyncAttrs, DeclarativeBase):
     type_annotation_map = {
         datetime: DateTime(timezone=True)
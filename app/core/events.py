@@ -0,0 +1,227 @@
+import asyncio
+import json
+import uuid
+from collections import Counter, deque
+from typing import Any, AsyncIterator
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Subscription:
+    """
+    Подписка одного соединения на события пользователя.
+
+    Буфер ограничен: если клиент не успевает читать, подписка помечается
+    переполненной и соединение закрывается — клиент переподключается
+    и догоняет состояние через /sync. Вместо asyncio.Queue используется
+    deque и одна Future: простаивающий подписчик стоит заметно меньше памяти.
+    """
+
+    __slots__ = ("user_id", "maxsize", "buffer", "overflowed", "_waiter")
+
+    def __init__(self, user_id: UUID, maxsize: int):
+        self.user_id = user_id
+        self.maxsize = maxsize
+        self.buffer: deque[dict[str, Any]] = deque()
+        self.overflowed = False
+        self._waiter: asyncio.Future | None = None
+
+    def push(self, event: dict[str, Any]) -> bool:
+        if len(self.buffer) >= self.maxsize:
+            self.overflowed = True
+            accepted = False
+        else:
+            self.buffer.append(event)
+            accepted = True
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+        return accepted
+
+    async def wait(self, timeout: float) -> bool:
+        """Ждёт новых событий не дольше timeout. False — таймаут."""
+        if self.buffer or self.overflowed:
+            return True
+
+        self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(self._waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiter = None
+
+
+class EventHub:
+    """In-process pub/sub событий изменения привычек и отметок по user_id."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: dict[UUID, set[Subscription]] = {}
+        self._bridge: "RedisEventBridge | None" = None
+        self._stats: Counter[str] = Counter()
+
+    def subscribe(self, user_id: UUID) -> Subscription:
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None:
+            return
+
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+
+    async def publish(self, user_id: UUID, event_type: str, data: dict[str, Any]) -> None:
+        event = {"type": event_type, "data": data}
+        self.deliver(user_id, event)
+
+        if self._bridge is not None:
+            await self._bridge.publish(user_id, event)
+
+    def deliver(self, user_id: UUID, event: dict[str, Any]) -> None:
+        self._stats["published"] += 1
+        for subscription in self._subscribers.get(user_id, ()):
+            if subscription.push(event):
+                self._stats["delivered"] += 1
+            else:
+                self._stats["dropped"] += 1
+                logger.warning("Subscriber overflowed | user_id=%s", user_id)
+
+    def attach_bridge(self, bridge: "RedisEventBridge | None") -> None:
+        self._bridge = bridge
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "users": len(self._subscribers),
+            "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+            "published": self._stats["published"],
+            "delivered": self._stats["delivered"],
+            "dropped": self._stats["dropped"],
+        }
+
+
+class RedisEventBridge:
+    """
+    Рассылка событий между воркерами через Redis pub/sub.
+    Собственные сообщения воркер отбрасывает по origin — локальным
+    подписчикам они уже доставлены в EventHub.publish.
+    """
+
+    CHANNEL = "habit_tracker:events"
+
+    def __init__(self, hub: EventHub, url: str):
+        self.hub = hub
+        self.origin = uuid.uuid4().hex
+        self._client = Redis.from_url(url)
+        self._listener: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+        await self._client.aclose()
+
+    async def publish(self, user_id: UUID, event: dict[str, Any]) -> None:
+        message = json.dumps(
+            {"origin": self.origin, "user_id": str(user_id), "event": event},
+            default=str,
+        )
+        try:
+            await self._client.publish(self.CHANNEL, message)
+        except RedisError as e:
+            logger.warning("Event fan-out failed | user_id=%s | error=%s", user_id, e)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._handle(message["data"])
+
+            except RedisError as e:
+                logger.warning("Event listener disconnected, retrying | error=%s", e)
+                await asyncio.sleep(1)
+
+    def _handle(self, data: bytes) -> None:
+        # Одно битое сообщение в канале не должно останавливать рассылку
+        try:
+            payload = json.loads(data)
+            if payload["origin"] == self.origin:
+                return
+            user_id, event = UUID(payload["user_id"]), payload["event"]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Malformed event message skipped | error=%r", e)
+            return
+        self.hub.deliver(user_id, event)
+
+
+def format_sse(event_type: str, data: Any) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def event_stream(
+    hub: EventHub, user_id: UUID, heartbeat: float
+) -> AsyncIterator[str]:
+    """
+    Поток Server-Sent Events для одного соединения.
+    Пустой комментарий раз в heartbeat секунд не даёт прокси закрыть соединение.
+    """
+    subscription = hub.subscribe(user_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            if subscription.overflowed:
+                # Часть событий потеряна — клиент должен догнать состояние через /sync
+                yield format_sse("resync", {})
+                return
+
+            if not await subscription.wait(heartbeat):
+                yield ": heartbeat\n\n"
+                continue
+
+            while subscription.buffer:
+                event = subscription.buffer.popleft()
+                yield format_sse(event["type"], event["data"])
+    finally:
+        hub.unsubscribe(subscription)
+
+
+event_hub = EventHub(settings.events.QUEUE_SIZE)
+
+_bridge: RedisEventBridge | None = None
+
+
+async def start_event_bridge() -> None:
+    global _bridge
+
+    if settings.events.BACKEND == "redis":
+        _bridge = RedisEventBridge(event_hub, settings.redis.REDIS_URL)
+        event_hub.attach_bridge(_bridge)
+        await _bridge.start()
+        logger.info("Event fan-out via Redis enabled")
+
+
+async def stop_event_bridge() -> None:
+    global _bridge
+
+    if _bridge is not None:
+        event_hub.attach_bridge(None)
+        await _bridge.stop()
+        _bridge = None
@@ -1,3 +1,4 @@
+import math
 from http import HTTPStatus
 
 class AppError(Exception):
@@ -8,6 +9,7 @@ class AppError(Exception):
     ):
         self.message = message
         self.status_code = status_code
+        self.headers: dict[str, str] | None = None
         super().__init__(self.message)
 
 class AuthenticationError(AppError):
@@ -44,4 +46,12 @@ class BusinessError(AppError):
 class ConflictError(AppError):
     """409"""    
     def __init__(self, message: str = "Resource conflict"):
-        super().__init__(message=message, status_code=HTTPStatus.CONFLICT.value)
\ No newline at end of file
+        super().__init__(message=message, status_code=HTTPStatus.CONFLICT.value)
+
+
+class TooManyRequestsError(AppError):
+    """429"""
+    def __init__(self, retry_after: float, message: str = "Too many requests"):
+        super().__init__(message=message, status_code=HTTPStatus.TOO_MANY_REQUESTS.value)
+        self.retry_after = math.ceil(retry_after)
+        self.headers = {"Retry-After": str(self.retry_after)}
\ No newline at end of file
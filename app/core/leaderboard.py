@@ -0,0 +1,472 @@
+import asyncio
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Any, NamedTuple
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import DatabaseError
+from app.core.logger import get_logger
+from app.repositories.leaderboard import LeaderboardRepository
+
+logger = get_logger(__name__)
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.next: list["_Node | None"] = [None] * level
+        # width[i] — на сколько позиций вперёд ведёт next[i]
+        self.width = [1] * level
+
+
+class RankedSet:
+    """
+    Индексируемый skip list: упорядоченное множество ключей, где вставка,
+    удаление, позиция ключа и ключ по позиции стоят O(log n).
+    """
+
+    MAX_LEVEL = 24
+
+    def __init__(self):
+        self._head = _Node(None, self.MAX_LEVEL)
+        # Хвост — сторож после последнего элемента
+        self._tail = _Node(None, 0)
+        self._head.next = [self._tail] * self.MAX_LEVEL
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: Any) -> None:
+        update, positions = self._search(key)
+        level = self._random_level()
+        node = _Node(key, level)
+        position = positions[0] + 1
+
+        for i in range(level):
+            prev = update[i]
+            node.next[i] = prev.next[i]
+            prev.next[i] = node
+            node.width[i] = prev.width[i] - (position - positions[i]) + 1
+            prev.width[i] = position - positions[i]
+        for i in range(level, self.MAX_LEVEL):
+            update[i].width[i] += 1
+        self._size += 1
+
+    def fill(self, keys: list[Any]) -> None:
+        """
+        Заполняет пустое множество отсортированными ключами за O(n):
+        узлы только дописываются в конец, поиск места не нужен.
+        """
+        if self._size:
+            raise ValueError("RankedSet is not empty")
+
+        last = [self._head] * self.MAX_LEVEL
+        positions = [0] * self.MAX_LEVEL
+        for position, key in enumerate(keys, start=1):
+            node = _Node(key, self._random_level())
+            for i in range(len(node.next)):
+                last[i].next[i] = node
+                last[i].width[i] = position - positions[i]
+                last[i], positions[i] = node, position
+        for i in range(self.MAX_LEVEL):
+            last[i].next[i] = self._tail
+            last[i].width[i] = len(keys) + 1 - positions[i]
+        self._size = len(keys)
+
+    def remove(self, key: Any) -> None:
+        update, _ = self._search(key)
+        node = update[0].next[0]
+        if node is self._tail or node.key != key:
+            raise KeyError(key)
+
+        for i in range(self.MAX_LEVEL):
+            prev = update[i]
+            if prev.next[i] is node:
+                prev.width[i] += node.width[i] - 1
+                prev.next[i] = node.next[i]
+            else:
+                prev.width[i] -= 1
+        self._size -= 1
+
+    def index(self, key: Any) -> int:
+        """Позиция ключа, считая с нуля."""
+        node, position = self._head, 0
+        for i in reversed(range(self.MAX_LEVEL)):
+            while node.next[i] is not self._tail and node.next[i].key < key:
+                position += node.width[i]
+                node = node.next[i]
+        node = node.next[0]
+        if node is self._tail or node.key != key:
+            raise KeyError(key)
+        return position
+
+    def slice(self, start: int, stop: int) -> list[Any]:
+        """Ключи с позициями start..stop-1."""
+        start, stop = max(start, 0), min(stop, self._size)
+        if start >= stop:
+            return []
+
+        node, position, target = self._head, 0, start + 1
+        for i in reversed(range(self.MAX_LEVEL)):
+            while node.next[i] is not self._tail and position + node.width[i] <= target:
+                position += node.width[i]
+                node = node.next[i]
+
+        keys = []
+        for _ in range(stop - start):
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+    def _search(self, key: Any) -> tuple[list[_Node], list[int]]:
+        # update[i] — последний узел уровня i с ключом меньше key, positions[i] — его позиция
+        update: list[_Node] = [self._head] * self.MAX_LEVEL
+        positions = [0] * self.MAX_LEVEL
+        node, position = self._head, 0
+        for i in reversed(range(self.MAX_LEVEL)):
+            while node.next[i] is not self._tail and node.next[i].key < key:
+                position += node.width[i]
+                node = node.next[i]
+            update[i] = node
+            positions[i] = position
+        return update, positions
+
+    def _random_level(self) -> int:
+        # Число младших нулевых битов — геометрическое распределение с p=1/2
+        bits = random.getrandbits(self.MAX_LEVEL - 1)
+        if bits == 0:
+            return self.MAX_LEVEL
+        return (bits & -bits).bit_length()
+
+
+class LeaderboardEntry(NamedTuple):
+    rank: int  # с единицы
+    user_id: UUID
+    score: float
+
+
+class LeaderboardBackend(ABC):
+    """
+    Рейтинги: пользователь -> очки, порядок по убыванию очков. Порядок
+    при равных очках стабилен (по user_id), но направление зависит от
+    бэкенда. ttl продлевает жизнь всего рейтинга — помесячные рейтинги
+    сами исчезают после окончания месяца.
+    """
+
+    @abstractmethod
+    async def set_score(
+        self, board: str, user_id: UUID, score: float, ttl: int | None = None
+    ) -> None: ...
+
+    @abstractmethod
+    async def remove(self, board: str, user_id: UUID) -> None: ...
+
+    @abstractmethod
+    async def get(self, board: str, user_id: UUID) -> LeaderboardEntry | None: ...
+
+    @abstractmethod
+    async def top(self, board: str, limit: int) -> list[LeaderboardEntry]: ...
+
+    @abstractmethod
+    async def around(self, board: str, user_id: UUID, radius: int) -> list[LeaderboardEntry]:
+        """До radius соседей выше и ниже пользователя вместе с ним самим."""
+
+    @abstractmethod
+    async def size(self, board: str) -> int: ...
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class MemoryLeaderboard(LeaderboardBackend):
+    """
+    Рейтинги в памяти процесса на RankedSet. Изменения раз в
+    snapshot_seconds сбрасываются в таблицу leaderboard_scores, при старте
+    рейтинги загружаются из неё. Годится для одного инстанса приложения;
+    при нескольких — RedisLeaderboard.
+    """
+
+    def __init__(self, snapshot_seconds: int = 0):
+        self.snapshot_seconds = snapshot_seconds
+        self._sets: dict[str, RankedSet] = {}
+        self._scores: dict[str, dict[UUID, float]] = {}
+        self._expires: dict[str, float] = {}
+        # Несохранённые изменения: None — удаление
+        self._changes: dict[tuple[str, UUID], float | None] = {}
+        self._task: asyncio.Task | None = None
+
+    async def set_score(
+        self, board: str, user_id: UUID, score: float, ttl: int | None = None
+    ) -> None:
+        self._set(board, user_id, score)
+        if ttl is not None:
+            self._expires[board] = time.time() + ttl
+        self._changes[board, user_id] = score
+
+    async def remove(self, board: str, user_id: UUID) -> None:
+        scores = self._scores.get(board)
+        if scores is None or user_id not in scores:
+            return
+        self._sets[board].remove((-scores.pop(user_id), user_id))
+        self._changes[board, user_id] = None
+
+    async def get(self, board: str, user_id: UUID) -> LeaderboardEntry | None:
+        score = self._scores.get(board, {}).get(user_id)
+        if score is None:
+            return None
+        return LeaderboardEntry(
+            self._sets[board].index((-score, user_id)) + 1, user_id, score
+        )
+
+    async def top(self, board: str, limit: int) -> list[LeaderboardEntry]:
+        return self._slice(board, 0, limit)
+
+    async def around(self, board: str, user_id: UUID, radius: int) -> list[LeaderboardEntry]:
+        entry = await self.get(board, user_id)
+        if entry is None:
+            return []
+        return self._slice(board, entry.rank - 1 - radius, entry.rank + radius)
+
+    async def size(self, board: str) -> int:
+        return len(self._sets.get(board, ()))
+
+    def load(self, board: str, entries: list[tuple[UUID, float]], expires_at: float | None) -> None:
+        if board in self._sets:
+            for user_id, score in entries:
+                self._set(board, user_id, score)
+        else:
+            # Новый рейтинг строится из отсортированных ключей, без вставок по одному
+            scores = dict(entries)
+            ranked = RankedSet()
+            ranked.fill(sorted((-score, user_id) for user_id, score in scores.items()))
+            self._sets[board] = ranked
+            self._scores[board] = scores
+        if expires_at is not None:
+            self._expires[board] = expires_at
+
+    async def snapshot(self) -> int:
+        """Сохраняет накопленные изменения и удаляет истёкшие рейтинги."""
+        now = time.time()
+        expired = [board for board, expires_at in self._expires.items() if expires_at <= now]
+        for board in expired:
+            del self._expires[board]
+            self._sets.pop(board, None)
+            self._scores.pop(board, None)
+
+        changes, self._changes = self._changes, {}
+        if not changes and not expired:
+            return 0
+        try:
+            async with AsyncSessionLocal() as session:
+                await LeaderboardRepository(session).save(
+                    changes, dict(self._expires), expired
+                )
+        except DatabaseError:
+            # Более новые изменения, пришедшие во время записи, не затираем
+            self._changes = {**changes, **self._changes}
+            raise
+        return len(changes)
+
+    async def start(self) -> None:
+        async with AsyncSessionLocal() as session:
+            boards = await LeaderboardRepository(session).load()
+        for board, (entries, expires_at) in boards.items():
+            self.load(board, entries, expires_at)
+        logger.info("Leaderboards loaded | boards=%s | entries=%s",
+                    len(boards), sum(len(scores) for scores in self._scores.values())
+        )
+        if self.snapshot_seconds > 0:
+            self._task = asyncio.create_task(self._snapshot_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            await self.snapshot()
+
+    def _set(self, board: str, user_id: UUID, score: float) -> None:
+        ranked = self._sets.setdefault(board, RankedSet())
+        scores = self._scores.setdefault(board, {})
+        previous = scores.get(user_id)
+        if previous == score:
+            return
+        if previous is not None:
+            ranked.remove((-previous, user_id))
+        ranked.add((-score, user_id))
+        scores[user_id] = score
+
+    def _slice(self, board: str, start: int, stop: int) -> list[LeaderboardEntry]:
+        ranked = self._sets.get(board)
+        if ranked is None:
+            return []
+        start = max(start, 0)
+        return [
+            LeaderboardEntry(start + offset + 1, user_id, -negative)
+            for offset, (negative, user_id) in enumerate(ranked.slice(start, stop))
+        ]
+
+    async def _snapshot_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.snapshot_seconds)
+            try:
+                await self.snapshot()
+            except DatabaseError as e:
+                logger.warning("Leaderboard snapshot failed | error=%s", e.message)
+
+
+class RedisLeaderboard(LeaderboardBackend):
+    """
+    Sorted set на рейтинг: ZADD, ZREVRANK и ZREVRANGE — O(log n).
+    Ошибки Redis не пробрасываются: рейтинг не должен ронять отметки.
+    """
+
+    PREFIX = "leaderboard:"
+
+    def __init__(self, url: str):
+        self._client = Redis.from_url(url)
+
+    async def set_score(
+        self, board: str, user_id: UUID, score: float, ttl: int | None = None
+    ) -> None:
+        key = self.PREFIX + board
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.zadd(key, {str(user_id): score})
+                if ttl is not None:
+                    pipe.expire(key, ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Leaderboard update failed | board=%s | error=%s", board, e)
+
+    async def remove(self, board: str, user_id: UUID) -> None:
+        try:
+            await self._client.zrem(self.PREFIX + board, str(user_id))
+        except RedisError as e:
+            logger.warning("Leaderboard remove failed | board=%s | error=%s", board, e)
+
+    async def get(self, board: str, user_id: UUID) -> LeaderboardEntry | None:
+        key, member = self.PREFIX + board, str(user_id)
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.zrevrank(key, member)
+                pipe.zscore(key, member)
+                rank, score = await pipe.execute()
+        except RedisError as e:
+            logger.warning("Leaderboard get failed | board=%s | error=%s", board, e)
+            return None
+        if rank is None:
+            return None
+        return LeaderboardEntry(rank + 1, user_id, score)
+
+    async def top(self, board: str, limit: int) -> list[LeaderboardEntry]:
+        return await self._range(board, 0, limit - 1)
+
+    async def around(self, board: str, user_id: UUID, radius: int) -> list[LeaderboardEntry]:
+        entry = await self.get(board, user_id)
+        if entry is None:
+            return []
+        start = max(entry.rank - 1 - radius, 0)
+        return await self._range(board, start, entry.rank - 1 + radius)
+
+    async def size(self, board: str) -> int:
+        try:
+            return await self._client.zcard(self.PREFIX + board)
+        except RedisError as e:
+            logger.warning("Leaderboard size failed | board=%s | error=%s", board, e)
+            return 0
+
+    async def stop(self) -> None:
+        await self._client.aclose()
+
+    async def _range(self, board: str, start: int, stop: int) -> list[LeaderboardEntry]:
+        try:
+            members = await self._client.zrevrange(
+                self.PREFIX + board, start, stop, withscores=True
+            )
+        except RedisError as e:
+            logger.warning("Leaderboard range failed | board=%s | error=%s", board, e)
+            return []
+        return [
+            LeaderboardEntry(start + offset + 1, UUID(member.decode()), score)
+            for offset, (member, score) in enumerate(members)
+        ]
+
+
+class FakeLeaderboard(LeaderboardBackend):
+    """Словарь с сортировкой на каждый запрос — эталон для тестов, O(n log n)."""
+
+    def __init__(self):
+        self.scores: dict[str, dict[UUID, float]] = {}
+
+    async def set_score(
+        self, board: str, user_id: UUID, score: float, ttl: int | None = None
+    ) -> None:
+        self.scores.setdefault(board, {})[user_id] = score
+
+    async def remove(self, board: str, user_id: UUID) -> None:
+        self.scores.get(board, {}).pop(user_id, None)
+
+    async def get(self, board: str, user_id: UUID) -> LeaderboardEntry | None:
+        return next((e for e in self._ranked(board) if e.user_id == user_id), None)
+
+    async def top(self, board: str, limit: int) -> list[LeaderboardEntry]:
+        return self._ranked(board)[:limit]
+
+    async def around(self, board: str, user_id: UUID, radius: int) -> list[LeaderboardEntry]:
+        entry = await self.get(board, user_id)
+        if entry is None:
+            return []
+        return self._ranked(board)[max(entry.rank - 1 - radius, 0):entry.rank + radius]
+
+    async def size(self, board: str) -> int:
+        return len(self.scores.get(board, {}))
+
+    def _ranked(self, board: str) -> list[LeaderboardEntry]:
+        ordered = sorted(self.scores.get(board, {}).items(), key=lambda i: (-i[1], i[0]))
+        return [
+            LeaderboardEntry(rank, user_id, score)
+            for rank, (user_id, score) in enumerate(ordered, start=1)
+        ]
+
+
+_leaderboard: LeaderboardBackend | None = None
+
+
+def get_leaderboard() -> LeaderboardBackend:
+    global _leaderboard
+
+    if _leaderboard is None:
+        if settings.leaderboard.BACKEND == "redis":
+            _leaderboard = RedisLeaderboard(settings.redis.REDIS_URL)
+        elif settings.leaderboard.BACKEND == "fake":
+            _leaderboard = FakeLeaderboard()
+        else:
+            _leaderboard = MemoryLeaderboard(settings.leaderboard.SNAPSHOT_SECONDS)
+
+        logger.info("Leaderboard backend initialized | backend=%s", settings.leaderboard.BACKEND)
+
+    return _leaderboard
+
+
+async def start_leaderboard() -> None:
+    await get_leaderboard().start()
+
+
+async def stop_leaderboard() -> None:
+    global _leaderboard
+
+    if _leaderboard is not None:
+        await _leaderboard.stop()
+        _leaderboard = None
@@ -0,0 +1,178 @@
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from enum import Enum
+from itertools import chain
+from typing import NamedTuple
+from uuid import UUID
+
+import numpy as np
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Дни в потоках отметок считаются от EPOCH: целые вместо дат
+EPOCH = date(1970, 1, 1)
+# Об оборванной серии короче этого не сообщается
+MIN_BROKEN_STREAK = 3
+
+
+class Milestone(str, Enum):
+    HALF = "half"
+    GOAL = "goal"
+    BROKEN = "broken"
+
+
+# Уровни вех в порядке прохождения внутри серии
+LEVELS = (Milestone.HALF, Milestone.GOAL)
+
+
+class Progress(NamedTuple):
+    """Состояние потока отметок одной привычки (строка habit_progress)."""
+
+    streak: int = 0
+    run_start: date | None = None
+    last_date: date | None = None
+    milestone: int = 0
+
+
+class MilestoneEvent(NamedTuple):
+    user_id: UUID
+    habit_id: int
+    milestone: Milestone
+    streak: int
+    goal: int
+    date: date
+
+
+def level(streak: int, goal: int) -> int:
+    """Уровень вехи для серии: 0, 1 — половина цели, 2 — цель."""
+    if streak >= goal:
+        return 2
+    # При цели в один день половины нет
+    return 1 if streak >= (goal + 1) // 2 and goal > 1 else 0
+
+
+def advance(progress: Progress, day: date, completed: bool) -> Progress:
+    """
+    Следующее состояние по отметке за day, более поздней, чем
+    progress.last_date. Вехи не пересчитываются — это делает transition.
+    """
+    if not completed:
+        return Progress(0, None, day, 0)
+    if progress.streak and day == progress.run_start + timedelta(days=progress.streak):
+        return progress._replace(streak=progress.streak + 1, last_date=day)
+    return Progress(1, day, day, 0)
+
+
+def transition(
+    old: Progress, new: Progress, goal: int
+) -> tuple[Progress, list[tuple[Milestone, int]]]:
+    """
+    Вехи при переходе old -> new: оборванная серия и высший новый уровень
+    текущей серии. Возвращает new с пройденными вехами.
+    """
+    same_run = bool(old.streak and new.streak and old.run_start == new.run_start)
+    events = []
+    if old.streak >= MIN_BROKEN_STREAK and not same_run:
+        events.append((Milestone.BROKEN, old.streak))
+
+    passed = old.milestone if same_run else 0
+    reached = level(new.streak, goal)
+    if reached > passed:
+        events.append((LEVELS[reached - 1], new.streak))
+    return new._replace(milestone=max(passed, reached)), events
+
+
+def replay(days: list[list[int] | None], completed: list[list[bool] | None]) -> list[Progress]:
+    """
+    Итоговые состояния для целых потоков отметок, по потоку на привычку:
+    дни от EPOCH по возрастанию и признак выполнения. Совпадает со
+    свёрткой advance по потоку, но без цикла по отметкам: серия — хвост
+    потока из выполненных отметок за дни подряд.
+    """
+    lengths = np.fromiter((len(d or ()) for d in days), dtype=np.intp, count=len(days))
+    total = int(lengths.sum())
+    day = np.fromiter(chain.from_iterable(d or () for d in days), dtype=np.int64, count=total)
+    done = np.fromiter(
+        chain.from_iterable(c or () for c in completed), dtype=bool, count=total
+    )
+    owner = np.repeat(np.arange(len(days)), lengths)
+
+    # Отметка продолжает серию, если она и предыдущая той же привычки
+    # выполнены, а дни идут подряд; серия начинается с выполненной отметки,
+    # которая ничего не продолжает
+    continues = np.zeros(total, dtype=bool)
+    continues[1:] = (
+        done[1:] & done[:-1] & (owner[1:] == owner[:-1]) & (day[1:] == day[:-1] + 1)
+    )
+    starts = np.where(done & ~continues, np.arange(total), -1)
+    run_start = np.maximum.accumulate(starts) if total else starts
+
+    last = np.cumsum(lengths) - 1
+    result = []
+    for i, end in enumerate(last.tolist()):
+        if not lengths[i]:
+            result.append(Progress())
+            continue
+        last_date = EPOCH + timedelta(days=int(day[end]))
+        if not done[end]:
+            result.append(Progress(0, None, last_date, 0))
+            continue
+        start = int(run_start[end])
+        result.append(
+            Progress(end - start + 1, EPOCH + timedelta(days=int(day[start])), last_date, 0)
+        )
+    return result
+
+
+class MilestoneSink(ABC):
+    """Получатель вех: уведомления пользователю идут дальше по этой цепочке."""
+
+    @abstractmethod
+    async def emit(self, events: list[MilestoneEvent]) -> None: ...
+
+
+class LogMilestoneSink(MilestoneSink):
+    async def emit(self, events: list[MilestoneEvent]) -> None:
+        for event in events:
+            logger.info("Milestone | user_id=%s | habit_id=%s | milestone=%s | streak=%s | goal=%s",
+                        event.user_id, event.habit_id, event.milestone.value, event.streak, event.goal
+            )
+
+
+class CeleryMilestoneSink(MilestoneSink):
+    """
+    Ставит задачу notify_milestones. Задача ставится по имени — модуль
+    задач импортирует сервисы, и прямой импорт дал бы цикл. Отправка
+    синхронная, поэтому уходит в поток и не держит event loop.
+    """
+
+    TASK = "app.tasks.celery_tasks.notify_milestones"
+
+    async def emit(self, events: list[MilestoneEvent]) -> None:
+        payload = [
+            {
+                **event._asdict(),
+                "user_id": str(event.user_id),
+                "milestone": event.milestone.value,
+                "date": event.date.isoformat(),
+            }
+            for event in events
+        ]
+        try:
+            await asyncio.to_thread(
+                celery_app.send_task, self.TASK, args=[payload], retry=False
+            )
+        except Exception as e:
+            # Отметка уже сохранена: потерянное уведомление не должно её ронять
+            logger.warning("Milestone dispatch failed | events=%s | error=%s", len(events), e)
+
+
+def get_milestone_sink() -> MilestoneSink:
+    if settings.milestones.SINK == "celery":
+        return CeleryMilestoneSink()
+    return LogMilestoneSink()
@@ -0,0 +1,348 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
+from types import FrameType
+from typing import Any, Callable, NamedTuple
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class FrameInfo(NamedTuple):
+    name: str
+    file: str
+    line: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} ({self.file}:{self.line})"
+
+
+Stack = tuple[FrameInfo, ...]
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _short_path(filename: str) -> str:
+    marker = "site-packages" + os.sep
+    index = filename.rfind(marker)
+    if index != -1:
+        return filename[index + len(marker):]
+    if filename.startswith(_PROJECT_ROOT):
+        return os.path.relpath(filename, _PROJECT_ROOT)
+    return filename
+
+
+@lru_cache(maxsize=8192)
+def _frame_info(code) -> FrameInfo:
+    # Строка начала функции, а не текущая: так стеки одной функции склеиваются
+    return FrameInfo(code.co_qualname, _short_path(code.co_filename), code.co_firstlineno)
+
+
+def is_idle(frame: FrameType) -> bool:
+    # Event loop без задачи ждёт ввода-вывода в selector.select
+    return frame.f_code.co_name == "select"
+
+
+def capture_stack(frame: FrameType | None) -> Stack:
+    """Стек от корня к листу."""
+    stack = []
+    while frame is not None:
+        stack.append(_frame_info(frame.f_code))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def to_collapsed(stacks: Counter, root: str | None = None) -> str:
+    """Формат collapsed stacks (flamegraph.pl, speedscope): 'a;b;c <count>'."""
+    prefix = [root] if root else []
+    return "\n".join(
+        ";".join(prefix + [frame.label for frame in stack]) + f" {count}"
+        for stack, count in stacks.most_common()
+    )
+
+
+def to_speedscope(name: str, samples: list[Stack], weights: list[float]) -> dict[str, Any]:
+    """Sampled-профиль в формате https://www.speedscope.app/file-format-schema.json."""
+    frames: dict[FrameInfo, int] = {}
+    indexed = [
+        [frames.setdefault(frame, len(frames)) for frame in stack] for stack in samples
+    ]
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": settings.PROJECT_NAME,
+        "shared": {
+            "frames": [
+                {"name": frame.name, "file": frame.file, "line": frame.line}
+                for frame in frames
+            ],
+        },
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": indexed,
+                "weights": [round(weight, 3) for weight in weights],
+            }
+        ],
+    }
+
+
+class StackSampler(threading.Thread):
+    """
+    Поток, который раз в interval снимает стек потока event loop и
+    задачу asyncio, выполняющуюся в этот момент.
+
+    Пока event loop занят CPU, сэмплер получает GIL не чаще раза в
+    sys.getswitchinterval() — поэтому вес сэмпла считается по фактически
+    прошедшему времени, а не по номинальному интервалу.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        loop: asyncio.AbstractEventLoop,
+        thread_id: int,
+        on_sample: Callable[[asyncio.Task | None, FrameType, float], None],
+    ):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.interval = interval
+        self.loop = loop
+        self.thread_id = thread_id
+        self.on_sample = on_sample
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        last = time.perf_counter()
+        while not self._stopped.wait(self.interval):
+            task = asyncio.current_task(self.loop)
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                self.on_sample(task, frame, (now - last) * 1000)
+            last = now
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+class RequestProfile:
+    """Сэмплы одного запроса в порядке времени."""
+
+    def __init__(self, method: str, path: str, interval_ms: float, max_samples: int):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.route: str | None = None
+        self.interval_ms = interval_ms
+        self.max_samples = max_samples
+        self.created_at = datetime.now(timezone.utc)
+        self.duration_ms = 0.0
+        self.samples: list[Stack] = []
+        self.weights: list[float] = []
+        # Профиль on-CPU: ожидание ввода-вывода и чужие задачи только считаются
+        self.idle_samples = 0
+        self.other_samples = 0
+
+    def add(self, stack: Stack, weight: float) -> None:
+        if len(self.samples) < self.max_samples:
+            self.samples.append(stack)
+            self.weights.append(weight)
+
+    @property
+    def name(self) -> str:
+        return self.route or f"{self.method} {self.path}"
+
+    def collapsed(self) -> str:
+        return to_collapsed(Counter(self.samples))
+
+    def speedscope(self) -> dict[str, Any]:
+        return to_speedscope(self.name, self.samples, self.weights)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "created_at": self.created_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "interval_ms": self.interval_ms,
+            "samples": len(self.samples),
+            "idle_samples": self.idle_samples,
+            "other_samples": self.other_samples,
+        }
+
+
+class ProfileStore:
+    """Последние профили запросов в памяти процесса."""
+
+    def __init__(self, max_profiles: int):
+        self.max_profiles = max_profiles
+        self._profiles: OrderedDict[str, RequestProfile] = OrderedDict()
+
+    def add(self, profile: RequestProfile) -> None:
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        return self._profiles.get(profile_id)
+
+    def recent(self) -> list[RequestProfile]:
+        return list(reversed(self._profiles.values()))
+
+
+async def profile_request(profile: RequestProfile, call: Callable[[], Any]) -> None:
+    """Выполняет call под сэмплером; в профиль попадает только текущая задача."""
+    task = asyncio.current_task()
+
+    def on_sample(current: asyncio.Task | None, frame: FrameType, weight: float) -> None:
+        if current is task:
+            profile.add(capture_stack(frame), weight)
+        elif current is None and is_idle(frame):
+            profile.idle_samples += 1
+        else:
+            profile.other_samples += 1
+
+    sampler = StackSampler(
+        profile.interval_ms / 1000,
+        asyncio.get_running_loop(),
+        threading.get_ident(),
+        on_sample,
+    )
+    started = time.perf_counter()
+    sampler.start()
+    try:
+        await call()
+    finally:
+        sampler.stop()
+        profile.duration_ms = (time.perf_counter() - started) * 1000
+
+
+class HotStacks:
+    """
+    Агрегат фоновых сэмплов: счётчики стеков по шаблону маршрута.
+    Число стеков маршрута ограничено — при переполнении редкие отбрасываются.
+    """
+
+    def __init__(self, max_stacks_per_route: int):
+        self.max_stacks_per_route = max_stacks_per_route
+        self._routes: dict[str, Counter] = {}
+        self._samples: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, route: str, stack: Stack) -> None:
+        with self._lock:
+            stacks = self._routes.setdefault(route, Counter())
+            stacks[stack] += 1
+            self._samples[route] += 1
+            if len(stacks) > self.max_stacks_per_route:
+                self._routes[route] = Counter(
+                    dict(stacks.most_common(self.max_stacks_per_route // 2))
+                )
+
+    def routes(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._samples.most_common())
+
+    def top(self, route: str, limit: int) -> list[tuple[Stack, int]]:
+        with self._lock:
+            return self._routes.get(route, Counter()).most_common(limit)
+
+    def collapsed(self, route: str | None = None) -> str:
+        with self._lock:
+            routes = [route] if route else list(self._routes)
+            snapshot = {name: Counter(self._routes.get(name, {})) for name in routes}
+        return "\n".join(
+            to_collapsed(stacks, root=name) for name, stacks in snapshot.items() if stacks
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._samples.clear()
+
+
+class BackgroundProfiler:
+    """
+    Постоянный сэмплер с низкой частотой. Задача asyncio сопоставляется с
+    маршрутом через active_requests, который заполняет middleware.
+    """
+
+    IDLE = "<idle>"
+    OTHER = "<other>"
+
+    def __init__(self, interval_ms: float, max_stacks_per_route: int):
+        self.interval_ms = interval_ms
+        self.hot_stacks = HotStacks(max_stacks_per_route)
+        self.active_requests: dict[asyncio.Task, dict] = {}
+        self._sampler: StackSampler | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._sampler is not None
+
+    def start(self) -> None:
+        self._sampler = StackSampler(
+            self.interval_ms / 1000,
+            asyncio.get_running_loop(),
+            threading.get_ident(),
+            self._on_sample,
+        )
+        self._sampler.start()
+        logger.info("Background profiler started | interval_ms=%s", self.interval_ms)
+
+    def stop(self) -> None:
+        if self._sampler is not None:
+            self._sampler.stop()
+            self._sampler = None
+
+    def _on_sample(self, task: asyncio.Task | None, frame: FrameType, weight: float) -> None:
+        if task is None:
+            if is_idle(frame):
+                # Для простоя важна только доля сэмплов, стек не нужен
+                self.hot_stacks.add(self.IDLE, ())
+                return
+            route = self.OTHER
+        else:
+            scope = self.active_requests.get(task)
+            route = self.OTHER if scope is None else route_template(scope)
+        self.hot_stacks.add(route, capture_stack(frame))
+
+
+def route_template(scope: dict) -> str:
+    # Router дописывает найденный маршрут в scope запроса
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', '<unmatched>')}"
+
+
+profile_store = ProfileStore(settings.profiling.STORED_PROFILES)
+
+background_profiler = BackgroundProfiler(
+    settings.profiling.BACKGROUND_INTERVAL_MS,
+    settings.profiling.MAX_STACKS_PER_ROUTE,
+)
+
+
+def start_background_profiler() -> None:
+    if settings.profiling.BACKGROUND_ENABLED:
+        background_profiler.start()
+
+
+def stop_background_profiler() -> None:
+    background_profiler.stop()
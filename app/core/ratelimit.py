@@ -0,0 +1,230 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class Rate(NamedTuple):
+    """Token bucket: burst запросов сразу, далее per_second в секунду."""
+
+    burst: int
+    per_second: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """'10/minute' -> Rate(10, 10 / 60)."""
+        try:
+            count, period = value.split("/")
+            return cls(int(count), int(count) / _PERIODS[period.strip()])
+        except (KeyError, ValueError):
+            raise ValueError(f"Invalid rate limit: {value!r}")
+
+
+class BackoffPolicy(NamedTuple):
+    """После threshold неудач подряд ключ блокируется на base * 2^n секунд."""
+
+    threshold: int
+    base_seconds: float
+    max_seconds: float
+    window_seconds: int
+
+    def delay(self, failures: int) -> float:
+        if failures < self.threshold:
+            return 0.0
+        return min(self.max_seconds, self.base_seconds * 2 ** (failures - self.threshold))
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def hit(self, key: str, rate: Rate) -> float:
+        """Списывает токен. 0 — запрос разрешён, иначе секунды до следующей попытки."""
+
+    @abstractmethod
+    async def blocked_for(self, key: str) -> float:
+        """Сколько секунд ключ ещё заблокирован после неудачных попыток."""
+
+    @abstractmethod
+    async def add_failure(self, key: str, policy: BackoffPolicy) -> float:
+        """Учитывает неудачу и возвращает длительность блокировки."""
+
+    @abstractmethod
+    async def reset_failures(self, key: str) -> None: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Счётчики в памяти процесса. Число ключей ограничено: перебор случайных
+    email не должен раздувать память — самые старые ключи вытесняются.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._failures: OrderedDict[str, tuple[int, float, float]] = OrderedDict()
+
+    async def hit(self, key: str, rate: Rate) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (rate.burst, now))
+        tokens = min(rate.burst, tokens + (now - updated) * rate.per_second)
+
+        if tokens >= 1:
+            retry_after = 0.0
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate.per_second
+
+        self._store(self._buckets, key, (tokens, now))
+        return retry_after
+
+    async def blocked_for(self, key: str) -> float:
+        item = self._failures.get(key)
+        if item is None:
+            return 0.0
+        return max(0.0, item[1] - time.monotonic())
+
+    async def add_failure(self, key: str, policy: BackoffPolicy) -> float:
+        now = time.monotonic()
+        failures, _, expires_at = self._failures.get(key, (0, now, 0.0))
+        if expires_at <= now:
+            failures = 0
+
+        failures += 1
+        delay = policy.delay(failures)
+        self._store(
+            self._failures, key, (failures, now + delay, now + policy.window_seconds)
+        )
+        return delay
+
+    async def reset_failures(self, key: str) -> None:
+        self._failures.pop(key, None)
+
+    def _store(self, data: OrderedDict, key: str, value: tuple) -> None:
+        data[key] = value
+        data.move_to_end(key)
+        while len(data) > self.max_keys:
+            data.popitem(last=False)
+
+
+# Token bucket одним вызовом: время берём у Redis, чтобы часы инстансов
+# не влияли на результат
+_TOKEN_BUCKET = """
+local burst = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - updated) * per_second)
+
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / per_second
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / per_second * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Общие лимиты для нескольких инстансов. При недоступности Redis
+    лимит не применяется — авторизация не должна падать вместе с Redis.
+    """
+
+    PREFIX = "ratelimit:"
+
+    def __init__(self, url: str):
+        self._client = Redis.from_url(url)
+        self._token_bucket = self._client.register_script(_TOKEN_BUCKET)
+
+    async def hit(self, key: str, rate: Rate) -> float:
+        try:
+            retry_after = await self._token_bucket(
+                keys=[f"{self.PREFIX}bucket:{key}"], args=[rate.burst, rate.per_second]
+            )
+            return float(retry_after)
+        except RedisError as e:
+            logger.warning("Rate limit check failed | key=%s | error=%s", key, e)
+            return 0.0
+
+    async def blocked_for(self, key: str) -> float:
+        try:
+            ttl_ms = await self._client.pttl(f"{self.PREFIX}block:{key}")
+            return max(0.0, ttl_ms / 1000)
+        except RedisError as e:
+            logger.warning("Backoff check failed | key=%s | error=%s", key, e)
+            return 0.0
+
+    async def add_failure(self, key: str, policy: BackoffPolicy) -> float:
+        failures_key = f"{self.PREFIX}failures:{key}"
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.incr(failures_key)
+                pipe.expire(failures_key, policy.window_seconds)
+                failures, _ = await pipe.execute()
+
+            delay = policy.delay(failures)
+            if delay > 0:
+                await self._client.set(
+                    f"{self.PREFIX}block:{key}", 1, px=int(delay * 1000)
+                )
+            return delay
+        except RedisError as e:
+            logger.warning("Backoff update failed | key=%s | error=%s", key, e)
+            return 0.0
+
+    async def reset_failures(self, key: str) -> None:
+        try:
+            await self._client.delete(
+                f"{self.PREFIX}failures:{key}", f"{self.PREFIX}block:{key}"
+            )
+        except RedisError as e:
+            logger.warning("Backoff reset failed | key=%s | error=%s", key, e)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+_backend: RateLimitBackend | None = None
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    global _backend
+
+    if _backend is None:
+        if settings.ratelimit.BACKEND == "redis":
+            _backend = RedisRateLimitBackend(settings.redis.REDIS_URL)
+        else:
+            _backend = MemoryRateLimitBackend(settings.ratelimit.MAX_KEYS)
+
+        logger.info("Rate limit backend initialized | backend=%s", settings.ratelimit.BACKEND)
+
+    return _backend
+
+
+async def close_rate_limit_backend() -> None:
+    global _backend
+
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
@@ -0,0 +1,325 @@
+import asyncio
+import hashlib
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import DatabaseError
+from app.core.logger import get_logger
+from app.repositories.revocation import RevocationChanges, RevocationRepository
+
+logger = get_logger(__name__)
+
+
+class BloomFilter:
+    """
+    Фильтр Блума для jti отозванных токенов.
+    Отрицательный ответ точен, положительный проверяется в хранилище.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> list[int]:
+        # Двойное хеширование: k позиций из двух 64-битных половин одного дайджеста
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class RevocationBackend(ABC):
+    """Источник истины для отзывов; к нему идём только при срабатывании фильтра."""
+
+    @abstractmethod
+    async def revoke(self, jti: str, user_id: UUID, expires_at: datetime) -> None: ...
+
+    @abstractmethod
+    async def is_revoked(self, jti: str) -> bool: ...
+
+    @abstractmethod
+    async def set_watermark(self, user_id: UUID, not_before: datetime) -> None: ...
+
+    @abstractmethod
+    async def get_changes(
+        self, since: datetime | None, horizon: datetime
+    ) -> RevocationChanges: ...
+
+    @abstractmethod
+    async def purge_expired(self) -> int: ...
+
+
+class PostgresRevocationBackend(RevocationBackend):
+    """
+    Таблицы revoked_tokens и token_watermarks. Каждый вызов берёт
+    короткую собственную сессию — проверка токена не зависит от сессии запроса.
+    """
+
+    async def revoke(self, jti: str, user_id: UUID, expires_at: datetime) -> None:
+        async with AsyncSessionLocal() as session:
+            await RevocationRepository(session).revoke(jti, user_id, expires_at)
+
+    async def is_revoked(self, jti: str) -> bool:
+        async with AsyncSessionLocal() as session:
+            return await RevocationRepository(session).is_revoked(jti)
+
+    async def set_watermark(self, user_id: UUID, not_before: datetime) -> None:
+        async with AsyncSessionLocal() as session:
+            await RevocationRepository(session).set_watermark(user_id, not_before)
+
+    async def get_changes(
+        self, since: datetime | None, horizon: datetime
+    ) -> RevocationChanges:
+        async with AsyncSessionLocal() as session:
+            return await RevocationRepository(session).get_changes(since, horizon)
+
+    async def purge_expired(self) -> int:
+        async with AsyncSessionLocal() as session:
+            return await RevocationRepository(session).purge_expired()
+
+
+class FakeRevocationBackend(RevocationBackend):
+    """Хранилище в памяти процесса для тестов и локальной разработки."""
+
+    def __init__(self):
+        self.revoked: dict[str, tuple[datetime, datetime]] = {}
+        self.watermarks: dict[UUID, tuple[datetime, datetime]] = {}
+
+    async def revoke(self, jti: str, user_id: UUID, expires_at: datetime) -> None:
+        self.revoked.setdefault(jti, (expires_at, datetime.now(timezone.utc)))
+
+    async def is_revoked(self, jti: str) -> bool:
+        return jti in self.revoked
+
+    async def set_watermark(self, user_id: UUID, not_before: datetime) -> None:
+        current = self.watermarks.get(user_id)
+        if current is not None:
+            not_before = max(not_before, current[0])
+        self.watermarks[user_id] = (not_before, datetime.now(timezone.utc))
+
+    async def get_changes(
+        self, since: datetime | None, horizon: datetime
+    ) -> RevocationChanges:
+        now = datetime.now(timezone.utc)
+        since = since or datetime.min.replace(tzinfo=timezone.utc)
+        return RevocationChanges(
+            [
+                jti for jti, (expires_at, revoked_at) in self.revoked.items()
+                if expires_at > now and revoked_at >= since
+            ],
+            [
+                (user_id, not_before)
+                for user_id, (not_before, updated_at) in self.watermarks.items()
+                if not_before > horizon and updated_at >= since
+            ],
+            now,
+        )
+
+    async def purge_expired(self) -> int:
+        now = datetime.now(timezone.utc)
+        expired = [jti for jti, (expires_at, _) in self.revoked.items() if expires_at <= now]
+        for jti in expired:
+            del self.revoked[jti]
+        return len(expired)
+
+
+class RevocationStore:
+    """
+    Проверка отзыва токена без обращения к БД в обычном случае.
+
+    В памяти воркера: фильтр Блума по отозванным jti, LRU подтверждённых
+    ответов хранилища и водяные знаки «токены пользователя, выданные раньше
+    X, недействительны». К хранилищу идём только при срабатывании фильтра.
+    Отзывы других воркеров подтягиваются раз в refresh_seconds — это и есть
+    окно, в течение которого отозванный токен ещё может пройти на другом воркере.
+    """
+
+    # Перекрытие инкрементальных выборок: транзакция, начатая до предыдущего
+    # чтения, могла закоммититься после него
+    OVERLAP = timedelta(seconds=30)
+
+    def __init__(
+        self,
+        backend: RevocationBackend,
+        capacity: int,
+        error_rate: float,
+        lru_size: int,
+        refresh_seconds: int,
+        rebuild_seconds: int,
+        max_token_lifetime: timedelta,
+    ):
+        self.backend = backend
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.lru_size = lru_size
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.max_token_lifetime = max_token_lifetime
+
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._confirmed: OrderedDict[str, bool] = OrderedDict()
+        self._watermarks: dict[str, float] = {}
+        self._since: datetime | None = None
+        self._rebuilt_at: float | None = None
+        self._task: asyncio.Task | None = None
+        self._stats = {"checks": 0, "bloom_hits": 0, "backend_checks": 0, "revoked": 0}
+
+    async def is_revoked(self, payload: dict[str, Any]) -> bool:
+        self._stats["checks"] += 1
+
+        # Токены без iat/jti выпущены до появления отзыва
+        watermark = self._watermarks.get(payload.get("sub"))
+        if watermark is not None and payload.get("iat", 0) < watermark:
+            self._stats["revoked"] += 1
+            return True
+
+        jti = payload.get("jti")
+        if jti is None or jti not in self._bloom:
+            return False
+
+        self._stats["bloom_hits"] += 1
+        revoked = self._confirmed.get(jti)
+        if revoked is None:
+            self._stats["backend_checks"] += 1
+            revoked = await self.backend.is_revoked(jti)
+            self._remember(jti, revoked)
+        else:
+            self._confirmed.move_to_end(jti)
+
+        if revoked:
+            self._stats["revoked"] += 1
+        return revoked
+
+    async def revoke(self, jti: str, user_id: UUID, expires_at: datetime) -> None:
+        await self.backend.revoke(jti, user_id, expires_at)
+        self._bloom.add(jti)
+        self._remember(jti, True)
+
+    async def revoke_all(self, user_id: UUID, not_before: datetime | None = None) -> None:
+        """Отзывает все токены пользователя, выданные раньше not_before."""
+        not_before = not_before or datetime.now(timezone.utc)
+        await self.backend.set_watermark(user_id, not_before)
+        self._apply_watermark(user_id, not_before)
+
+    async def refresh(self) -> None:
+        """
+        Подтягивает изменения хранилища. Раз в rebuild_seconds фильтр
+        собирается заново — так из него уходят истёкшие jti.
+        """
+        horizon = datetime.now(timezone.utc) - self.max_token_lifetime
+        rebuild = (
+            self._rebuilt_at is None
+            or time.monotonic() - self._rebuilt_at >= self.rebuild_seconds
+        )
+
+        if rebuild:
+            await self.backend.purge_expired()
+            changes = await self.backend.get_changes(None, horizon)
+            bloom = BloomFilter(self.capacity, self.error_rate)
+            for jti in changes.jtis:
+                bloom.add(jti)
+            # Отзывы этого воркера, сделанные во время чтения снимка
+            for jti, revoked in self._confirmed.items():
+                if revoked:
+                    bloom.add(jti)
+            self._bloom = bloom
+            self._watermarks = {}
+            self._rebuilt_at = time.monotonic()
+
+            if len(changes.jtis) > self.capacity:
+                logger.warning("Revocation filter over capacity | revoked=%s | capacity=%s",
+                               len(changes.jtis), self.capacity
+                )
+        else:
+            changes = await self.backend.get_changes(self._since, horizon)
+            for jti in changes.jtis:
+                self._bloom.add(jti)
+
+        for jti in changes.jtis:
+            if jti in self._confirmed:
+                self._confirmed[jti] = True
+        for user_id, not_before in changes.watermarks:
+            self._apply_watermark(user_id, not_before)
+
+        self._since = changes.as_of - self.OVERLAP
+
+    async def start(self) -> None:
+        await self.refresh()
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            **self._stats,
+            "filter_items": self._bloom.count,
+            "filter_bytes": self._bloom.nbytes,
+            "watermarks": len(self._watermarks),
+            "confirmed": len(self._confirmed),
+        }
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except DatabaseError as e:
+                logger.warning("Revocation refresh failed | error=%s", e.message)
+            except Exception:
+                # Без цикла отзывы других воркеров здесь не действовали бы до
+                # перезапуска: любую ошибку пишем в лог и продолжаем опрос
+                logger.exception("Revocation refresh crashed")
+
+    def _apply_watermark(self, user_id: UUID, not_before: datetime) -> None:
+        key = str(user_id)
+        self._watermarks[key] = max(self._watermarks.get(key, 0.0), not_before.timestamp())
+
+    def _remember(self, jti: str, revoked: bool) -> None:
+        self._confirmed[jti] = revoked
+        self._confirmed.move_to_end(jti)
+        while len(self._confirmed) > self.lru_size:
+            self._confirmed.popitem(last=False)
+
+
+def _create_backend() -> RevocationBackend:
+    if settings.revocation.BACKEND == "fake":
+        return FakeRevocationBackend()
+    return PostgresRevocationBackend()
+
+
+revocation_store = RevocationStore(
+    _create_backend(),
+    capacity=settings.revocation.BLOOM_CAPACITY,
+    error_rate=settings.revocation.BLOOM_ERROR_RATE,
+    lru_size=settings.revocation.LRU_SIZE,
+    refresh_seconds=settings.revocation.REFRESH_SECONDS,
+    rebuild_seconds=settings.revocation.REBUILD_SECONDS,
+    max_token_lifetime=timedelta(days=settings.auth.REFRESH_TOKEN_EXPIRE_DAYS),
+)
@@ -1,9 +1,12 @@
+import uuid
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, NamedTuple
+from uuid import UUID
 
 import jwt
 from fastapi.security import OAuth2PasswordBearer
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 
 from app.core.config import settings
 from app.core.logger import get_logger
@@ -11,13 +14,30 @@ from app.core.logger import get_logger
 
 logger = get_logger(__name__)
 
-password_hash = PasswordHash.recommended()
+password_hash = PasswordHash((
+    Argon2Hasher(
+        time_cost=settings.auth.ARGON2_TIME_COST,
+        memory_cost=settings.auth.ARGON2_MEMORY_COST,
+        parallelism=settings.auth.ARGON2_PARALLELISM,
+    ),
+))
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_URL_PREFIX}{settings.API_VERSION_STR}/auth/login", auto_error=False
 )
 
 
+class Principal(NamedTuple):
+    """
+    Пользователь, восстановленный из claims access-токена без чтения БД.
+    Для чтения данных по user.id его достаточно вместо ORM-объекта User.
+    """
+
+    id: UUID
+    email: str
+    username: str
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return password_hash.verify(plain_password, hashed_password)
 
@@ -26,13 +46,22 @@ def get_password_hash(password: str) -> str:
     return password_hash.hash(password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Хеш создан с другими параметрами argon2, чем заданы в AuthSettings."""
+    hasher = password_hash.current_hasher
+    return not hasher.identify(hashed_password) or hasher.check_needs_rehash(hashed_password)
+
+
 def _create_token(
     data: dict[str, Any], expires_delta: timedelta, token_type: str = "access"
 ) -> str:
-    expire = datetime.now(timezone.utc) + expires_delta
+    now = datetime.now(timezone.utc)
     payload = {
         **data,
-        "exp": expire,
+        "exp": now + expires_delta,
+        # Дробный iat: токен, выданный сразу после отзыва всех сессий, не попадёт под него
+        "iat": now.timestamp(),
+        "jti": uuid.uuid4().hex,
         "type": token_type
     }
 
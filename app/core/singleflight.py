@@ -0,0 +1,90 @@
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, TypeVar
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Склейка одинаковых параллельных чтений в один запрос (в пределах процесса).
+
+    Ключ состоит из scope (обычно user_id) и описания запроса. Пока первый
+    вызов выполняется, остальные с тем же ключом ждут его результат.
+    invalidate(scope) отвязывает незавершённые чтения после записи,
+    чтобы новые вызовы не получили устаревшие данные; запись оборачивается
+    в writing(scope), который отвязывает их и до, и после неё.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, dict[Hashable, asyncio.Task]] = {}
+        self._stats: Counter[str] = Counter()
+
+    async def do(
+        self, scope: Hashable, key: Hashable, fn: Callable[[], Awaitable[T]]
+    ) -> T:
+        self._stats["calls"] += 1
+        pending = self._inflight.setdefault(scope, {})
+        task = pending.get(key)
+
+        if task is None:
+            self._stats["executed"] += 1
+            task = asyncio.ensure_future(fn())
+            pending[key] = task
+            task.add_done_callback(lambda t: self._release(scope, key, t))
+        else:
+            self._stats["merged"] += 1
+            logger.debug("Read merged | scope=%s | key=%s", scope, key)
+
+        # shield: отмена одного ожидающего не должна отменять общий запрос
+        return await asyncio.shield(task)
+
+    def invalidate(self, scope: Hashable) -> None:
+        stale = self._inflight.pop(scope, None)
+        if stale:
+            self._stats["invalidated"] += len(stale)
+            logger.debug("In-flight reads invalidated | scope=%s | count=%s",
+                         scope, len(stale)
+            )
+
+    @asynccontextmanager
+    async def writing(self, scope: Hashable) -> AsyncIterator[None]:
+        """
+        Запись в scope. Чтение, начатое до записи, могло прочитать старые
+        данные, а начатое во время неё — тоже: отвязываем и те, и другие,
+        чтобы после коммита к ним никто не присоединился.
+        """
+        self.invalidate(scope)
+        try:
+            yield
+        finally:
+            self.invalidate(scope)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "calls": self._stats["calls"],
+            "executed": self._stats["executed"],
+            "merged": self._stats["merged"],
+            "invalidated": self._stats["invalidated"],
+            "inflight": sum(len(keys) for keys in self._inflight.values()),
+        }
+
+    def _release(self, scope: Hashable, key: Hashable, task: asyncio.Task) -> None:
+        pending = self._inflight.get(scope)
+        if pending is not None and pending.get(key) is task:
+            del pending[key]
+            if not pending:
+                del self._inflight[scope]
+
+        # Помечаем исключение как полученное, даже если все ожидающие отменены
+        if not task.cancelled():
+            task.exception()
+
+
+singleflight = SingleFlight()
@@ -0,0 +1,282 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from contextvars import ContextVar
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.profiler import route_template
+
+logger = get_logger(__name__)
+
+# Кто выполняет запрос к БД: заполняется middleware и зависимостями аутентификации
+_request_scope: ContextVar[dict | None] = ContextVar("query_request_scope", default=None)
+_request_user: ContextVar[str | None] = ContextVar("query_request_user", default=None)
+
+
+def set_query_user(user_id: Any) -> None:
+    _request_user.set(str(user_id))
+
+
+class QueryContextMiddleware:
+    """ASGI middleware: связывает запросы к БД с маршрутом HTTP-запроса."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        scope_token = _request_scope.set(scope)
+        user_token = _request_user.set(None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(scope_token)
+            _request_user.reset(user_token)
+
+
+_BIND = r"\?(?:::[\w\[\] ]+)?"
+_TUPLE = rf"\(\s*{_BIND}(?:\s*,\s*{_BIND})*\s*\)"
+_NORMALIZE = (
+    (re.compile(r"\s+"), " "),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\$\d+"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    # Многострочный VALUES и списки IN разной длины — один отпечаток
+    (re.compile(rf"{_TUPLE}(?:\s*,\s*{_TUPLE})+"), "(...), ..."),
+    (re.compile(rf"\(\s*{_BIND}(?:\s*,\s*{_BIND})+\s*\)"), "(?, ...)"),
+)
+
+
+@lru_cache(maxsize=4096)
+def normalize_statement(statement: str) -> tuple[str, str]:
+    """SQL без литералов и параметров и его короткий отпечаток."""
+    normalized = statement.strip()
+    for pattern, replacement in _NORMALIZE:
+        normalized = pattern.sub(replacement, normalized)
+    fingerprint = hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+    return normalized, fingerprint
+
+
+def redact_value(value: Any) -> Any:
+    # Идентификаторы, числа и даты помогают воспроизвести запрос;
+    # строки (email, хеши паролей, заметки) в лог не попадают
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (Decimal, UUID, date)):
+        return str(value)
+    if isinstance(value, (str, bytes, list, tuple)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any, executemany: bool) -> Any:
+    if executemany:
+        rows = list(parameters)
+        return {"rows": len(rows), "first": redact_parameters(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_value(value) for value in parameters]
+    return redact_value(parameters)
+
+
+def redact_plan(node: Any) -> Any:
+    """
+    План EXPLAIN без значений параметров: ANALYZE подставляет их в условия
+    узлов (Index Cond, Filter, Hash Cond...) литералами. В условиях остаются
+    столбцы и операторы, литералы заменяются на ?, как в отпечатке запроса.
+    """
+    if isinstance(node, list):
+        return [redact_plan(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    redacted = {}
+    for key, value in node.items():
+        if isinstance(value, str) and key.endswith(("Cond", "Filter")):
+            value = normalize_statement(value)[0]
+        else:
+            value = redact_plan(value)
+        redacted[key] = value
+    return redacted
+
+
+class QueryStats:
+    """Агрегат по отпечатку запроса."""
+
+    __slots__ = (
+        "fingerprint", "statement", "count", "total_ms", "max_ms", "slow_count",
+        "last_route", "last_slow_at", "plan", "explained_at",
+    )
+
+    def __init__(self, fingerprint: str, statement: str):
+        self.fingerprint = fingerprint
+        self.statement = statement
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow_count = 0
+        self.last_route: str | None = None
+        self.last_slow_at: datetime | None = None
+        self.plan: Any = None
+        self.explained_at = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "slow_count": self.slow_count,
+            "last_route": self.last_route,
+            "last_slow_at": self.last_slow_at,
+            "plan": self.plan,
+        }
+
+
+class SlowQueryLog:
+    """
+    Хуки движка SQLAlchemy: время каждого запроса агрегируется по отпечатку,
+    запросы дольше threshold_ms пишутся в лог с маршрутом и пользователем.
+    Для доли медленных SELECT в фоне выполняется EXPLAIN (ANALYZE, BUFFERS) —
+    не чаще раза в explain_interval на отпечаток, в откатываемой транзакции.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        max_fingerprints: int,
+        explain_sample_rate: float,
+        explain_interval_seconds: int,
+        explain_timeout_ms: int,
+    ):
+        self.threshold_ms = threshold_ms
+        self.max_fingerprints = max_fingerprints
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_interval_seconds = explain_interval_seconds
+        self.explain_timeout_ms = explain_timeout_ms
+
+        self._engine: AsyncEngine | None = None
+        self._stats: dict[str, QueryStats] = {}
+        self._explains: set[asyncio.Task] = set()
+
+    def install(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_execute)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+        # Собственные запросы EXPLAIN не учитываем
+        if context is not None and not context.execution_options.get("log_queries", True):
+            return
+
+        normalized, fingerprint = normalize_statement(statement)
+        slow = elapsed_ms >= self.threshold_ms
+        stats = self._stats.get(fingerprint)
+        if stats is None:
+            if len(self._stats) >= self.max_fingerprints:
+                self._evict()
+            stats = self._stats[fingerprint] = QueryStats(fingerprint, normalized)
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        if not slow:
+            return
+
+        scope = _request_scope.get()
+        route = route_template(scope) if scope is not None else None
+        stats.slow_count += 1
+        stats.last_slow_at = datetime.now(timezone.utc)
+        stats.last_route = route
+        logger.warning("Slow query | fingerprint=%s | duration_ms=%.1f | route=%s | user_id=%s | statement=%s | params=%s",
+                       fingerprint, elapsed_ms, route, _request_user.get(), normalized,
+                       json.dumps(redact_parameters(parameters, executemany), default=str)
+        )
+
+        if self._should_explain(stats, normalized):
+            self._schedule_explain(stats, statement, parameters)
+
+    def _should_explain(self, stats: QueryStats, normalized: str) -> bool:
+        # ANALYZE выполняет запрос, поэтому изменяющие данные не трогаем
+        if not normalized.upper().startswith("SELECT") or self._engine is None:
+            return False
+        if random.random() >= self.explain_sample_rate:
+            return False
+        return time.monotonic() - stats.explained_at >= self.explain_interval_seconds
+
+    def _schedule_explain(self, stats: QueryStats, statement: str, parameters: Any) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        stats.explained_at = time.monotonic()
+        task = loop.create_task(self._explain(stats, statement, parameters))
+        self._explains.add(task)
+        task.add_done_callback(self._explains.discard)
+
+    async def _explain(self, stats: QueryStats, statement: str, parameters: Any) -> None:
+        try:
+            async with self._engine.connect() as conn:
+                await conn.execution_options(log_queries=False)
+                # Транзакция откатывается при закрытии соединения
+                await conn.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}"
+                )
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", tuple(parameters)
+                )
+                plan = result.scalar_one()
+        except SQLAlchemyError as e:
+            logger.warning("Failed to explain slow query | fingerprint=%s | error=%s",
+                           stats.fingerprint, e
+            )
+            return
+
+        plan = redact_plan(plan[0] if isinstance(plan, list) else json.loads(plan)[0])
+        stats.plan = plan
+        logger.warning("Slow query plan | fingerprint=%s | execution_ms=%s | plan=%s",
+                       stats.fingerprint, plan.get("Execution Time"), json.dumps(plan["Plan"])
+        )
+
+    def _evict(self) -> None:
+        # Выбрасываем самые дешёвые по суммарному времени отпечатки
+        keep = sorted(self._stats.values(), key=lambda s: s.total_ms, reverse=True)
+        self._stats = {s.fingerprint: s for s in keep[: self.max_fingerprints // 2]}
+
+    def top(self, limit: int, order_by: str = "total_ms") -> list[dict[str, Any]]:
+        items = sorted(self._stats.values(), key=lambda s: getattr(s, order_by), reverse=True)
+        return [stats.as_dict() for stats in items[:limit]]
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.slow_query.THRESHOLD_MS,
+    max_fingerprints=settings.slow_query.MAX_FINGERPRINTS,
+    explain_sample_rate=settings.slow_query.EXPLAIN_SAMPLE_RATE,
+    explain_interval_seconds=settings.slow_query.EXPLAIN_INTERVAL_SECONDS,
+    explain_timeout_ms=settings.slow_query.EXPLAIN_TIMEOUT_MS,
+)
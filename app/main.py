@@ -1,11 +1,21 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import JSONResponse
 
+from app.api.profiling import ProfilingMiddleware
 from app.api.v1 import api_v1_router
+from app.core.cache import close_cache
 from app.core.config import settings
+from app.core.events import start_event_bridge, stop_event_bridge
+from app.core.exceptions import AppError
+from app.core.leaderboard import start_leaderboard, stop_leaderboard
 from app.core.logger import setup_logging, get_logger
+from app.core.profiler import start_background_profiler, stop_background_profiler
+from app.core.ratelimit import close_rate_limit_backend
+from app.core.revocation import revocation_store
+from app.core.slow_query import QueryContextMiddleware
 
 
 logger = get_logger(__name__)
@@ -18,13 +28,32 @@ async def lifespan(app: FastAPI):
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug mode: {settings.DEBUG}")
 
+    # С несколькими воркерами бэкенды memory расходятся между процессами
+    local_backends = settings.process_local_backends()
+    if settings.WORKERS > 1 and local_backends:
+        raise RuntimeError(
+            f"{', '.join(local_backends)}=memory is single-process only; "
+            f"use redis with WEB_CONCURRENCY={settings.WORKERS}"
+        )
+
     # Здесь можно добавить инициализацию подключений к БД, кэшу и т.д.
     # Например: await database.connect()
+    await start_event_bridge()
+    await revocation_store.start()
+    await start_leaderboard()
+    start_background_profiler()
 
     yield
 
     logger.info("Shutting down application...")
 
+    stop_background_profiler()
+    await stop_leaderboard()
+    await revocation_store.stop()
+    await stop_event_bridge()
+    await close_cache()
+    await close_rate_limit_backend()
+
     # Здесь можно добавить закрытие подключений
     # Например: await database.disconnect()
 
@@ -55,6 +84,8 @@ def create_application() -> FastAPI:
 
     setup_middleware(application)
 
+    setup_exception_handlers(application)
+
     setup_routers(application)
 
     return application
@@ -77,6 +108,26 @@ def setup_middleware(application: FastAPI) -> None:
             allowed_hosts=settings.ALLOWED_HOSTS,
         )
 
+    # Маршрут запроса для лога медленных запросов к БД
+    application.add_middleware(QueryContextMiddleware)
+
+    # Профилирование по запросу и фоновый сэмплер; без них middleware не нужен
+    if settings.profiling.ENABLED or settings.profiling.BACKGROUND_ENABLED:
+        application.add_middleware(ProfilingMiddleware)
+
+
+def setup_exception_handlers(application: FastAPI) -> None:
+    """
+    Доменные ошибки (AppError) отдаются клиенту со своим HTTP-статусом.
+    """
+    @application.exception_handler(AppError)
+    async def app_error_handler(request: Request, exc: AppError):
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.message},
+            headers=exc.headers,
+        )
+
 
 def setup_routers(application: FastAPI) -> None:
     """
@@ -0,0 +1,107 @@
+import uuid
+import datetime
+
+from sqlalchemy import DDL, Enum as SQLEnum, ForeignKey, Index, String, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+from app.models.habit import HabitStatus
+
+# Холодные данные: удалённые (деактивированные) привычки с их отметками и
+# отключённые по сроку хранения помесячные секции habit_tracking
+ARCHIVE_SCHEMA = "archive"
+
+
+class ArchivedHabit(Base):
+    """Привычка, деактивированная дольше срока и вынесенная из горячей таблицы."""
+
+    __tablename__ = "habits"
+    __table_args__ = (
+        # Список архива пользователя и лента /sync по времени переноса
+        Index("ix_archive_habits_user_id_archived_at", "user_id", "archived_at"),
+        {"schema": ARCHIVE_SCHEMA},
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+    )
+
+    title: Mapped[str] = mapped_column(String(100))
+
+    description: Mapped[str | None]
+
+    created_at: Mapped[datetime.datetime]
+
+    updated_at: Mapped[datetime.datetime]
+
+    is_active: Mapped[bool]
+
+    color: Mapped[str] = mapped_column(String(7))
+
+    goal_streak: Mapped[int]
+
+    reminder_time: Mapped[datetime.time | None]
+
+    archived_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"ArchivedHabit(id={self.id}, title={self.title})"
+
+
+class ArchivedHabitTracking(Base):
+    """
+    Архивные отметки. Колонки и ключ секционирования совпадают с
+    habit_tracking: отключённая секция подключается сюда без копирования.
+    Внешнего ключа на habits нет — в секциях по сроку есть и живые привычки.
+    """
+
+    __tablename__ = "habit_tracking"
+    __table_args__ = (
+        Index(
+            "ix_archive_habit_tracking_habit_id_date",
+            "habit_id",
+            "date",
+            unique=True,
+            postgresql_include=["status"],
+        ),
+        {"schema": ARCHIVE_SCHEMA, "postgresql_partition_by": "RANGE (date)"},
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+
+    habit_id: Mapped[int]
+
+    date: Mapped[datetime.date] = mapped_column(primary_key=True)
+
+    status: Mapped[HabitStatus] = mapped_column(SQLEnum(HabitStatus, native_enum=False))
+
+    notes: Mapped[str | None] = mapped_column(String(500))
+
+    created_at: Mapped[datetime.datetime]
+
+    updated_at: Mapped[datetime.datetime]
+
+    def __repr__(self) -> str:
+        return f"ArchivedHabitTracking(habit_id={self.habit_id}, date={self.date})"
+
+
+# create_all не создаёт схемы сам
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"),
+)
+
+event.listen(
+    ArchivedHabitTracking.__table__,
+    "after_create",
+    DDL(
+        f"CREATE TABLE {ARCHIVE_SCHEMA}.habit_tracking_default "
+        f"PARTITION OF {ARCHIVE_SCHEMA}.habit_tracking DEFAULT"
+    ),
+)
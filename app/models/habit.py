@@ -3,7 +3,7 @@ from enum import Enum
 import uuid
 import datetime
 
-from sqlalchemy import Enum as SQLEnum, ForeignKey, String
+from sqlalchemy import DDL, Enum as SQLEnum, ForeignKey, Index, String, event, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -14,15 +14,25 @@ from app.core.database import Base
 class Habit(Base):
 
     __tablename__ = "habits"
-
-    id: Mapped[int] = mapped_column(
-        primary_key=True, index=True
+    __table_args__ = (
+        # Покрывает и поиск по user_id (каскады, выборки без фильтра активности)
+        Index("ix_habits_user_id_updated_at", "user_id", "updated_at"),
+        # Список и дашборд: активные привычки пользователя, новые первыми
+        Index(
+            "ix_habits_user_id_created_at_active",
+            "user_id",
+            text("created_at DESC"),
+            postgresql_where=text("is_active"),
+        ),
     )
+    # id, created_at и updated_at возвращаются из INSERT/UPDATE ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+
+    id: Mapped[int] = mapped_column(primary_key=True)
 
     user_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
-        index=True,
     )
 
     title: Mapped[str] = mapped_column(String(100))
@@ -33,6 +43,10 @@ class Habit(Base):
         server_default=func.now(),
     )
 
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
+
     is_active: Mapped[bool] = mapped_column(default=True)
 
     color: Mapped[str] = mapped_column(String(7), default="#3B82F6")
@@ -41,10 +55,18 @@ class Habit(Base):
 
     reminder_time: Mapped[datetime.time | None]
 
-    user: Mapped["User"] = relationship("User", back_populates="habits")
+    # Связи не подгружаются неявно: обращение без опции загрузки в запросе
+    # (selectinload и т. п.) падает вместо скрытого запроса на каждый объект
+    user: Mapped["User"] = relationship(
+        "User", back_populates="habits", lazy="raise_on_sql"
+    )
 
     trackings: Mapped[list["HabitTracking"]] = relationship(
-        "HabitTracking", back_populates="habit", cascade="all, delete-orphan"
+        "HabitTracking",
+        back_populates="habit",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql",
     )
 
     def __repr__(self) -> str:
@@ -60,15 +82,32 @@ class HabitStatus(str, Enum):
 class HabitTracking(Base):
 
     __tablename__ = "habit_tracking"
+    __table_args__ = (
+        # Одна отметка на привычку в день — на этом строится upsert. Статус
+        # в листьях индекса: серии и недельные сетки читаются index-only
+        Index(
+            "ix_habit_tracking_habit_id_date",
+            "habit_id",
+            "date",
+            unique=True,
+            postgresql_include=["status"],
+        ),
+        Index("ix_habit_tracking_habit_id_updated_at", "habit_id", "updated_at"),
+        # Отметки пишутся в порядке дат, поэтому для диапазонов по всем
+        # привычкам хватает BRIN в сотни раз меньше B-tree
+        Index("ix_habit_tracking_date_brin", "date", postgresql_using="brin"),
+        # Помесячные секции по дате отметки создаёт TrackingPartitionService
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    # Первичный ключ секционированной таблицы обязан включать ключ секционирования
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
     habit_id: Mapped[int] = mapped_column(
         ForeignKey("habits.id", ondelete="CASCADE"),
-        index=True
     )
 
-    date: Mapped[datetime.date] = mapped_column(index=True)
+    date: Mapped[datetime.date] = mapped_column(primary_key=True)
 
     status: Mapped[HabitStatus] = mapped_column(
         SQLEnum(HabitStatus, native_enum=False),
@@ -81,7 +120,50 @@ class HabitTracking(Base):
         server_default=func.now(),
     )
 
-    habit: Mapped[Habit] = relationship("Habit", back_populates="trackings")
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
+
+    habit: Mapped[Habit] = relationship(
+        "Habit", back_populates="trackings", lazy="raise_on_sql"
+    )
 
     def __repr__(self) -> str:
         return f"HabitTracking(habit_id={self.habit_id}, date={self.date}, status={self.status})"
+
+
+# Секция по умолчанию принимает даты, для которых помесячной секции ещё нет
+event.listen(
+    HabitTracking.__table__,
+    "after_create",
+    DDL("CREATE TABLE habit_tracking_default PARTITION OF habit_tracking DEFAULT"),
+)
+
+
+class HabitTrackingTombstone(Base):
+    """След удалённой отметки — нужен клиентам для дельта-синхронизации."""
+
+    __tablename__ = "habit_tracking_tombstones"
+    __table_args__ = (
+        Index("ix_habit_tracking_tombstones_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+    )
+
+    habit_id: Mapped[int] = mapped_column(
+        ForeignKey("habits.id", ondelete="CASCADE"),
+    )
+
+    date: Mapped[datetime.date]
+
+    deleted_at: Mapped[datetime.datetime] = mapped_column(
+        server_default=func.now(),
+    )
+
+    def __repr__(self) -> str:
+        return f"HabitTrackingTombstone(habit_id={self.habit_id}, date={self.date})"
@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    """Сохранённый ответ на запрос с заголовком Idempotency-Key."""
+
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+
+    # sha256 метода, пути и тела запроса
+    request_hash: Mapped[str] = mapped_column(String(64))
+
+    # NULL, пока первый запрос ещё выполняется
+    status_code: Mapped[int | None]
+
+    # Аренда выполняющегося запроса: после неё ключ может занять повтор,
+    # если процесс упал, не сохранив ответ и не освободив ключ
+    locked_until: Mapped[datetime | None]
+
+    response: Mapped[Any | None] = mapped_column(JSONB)
+
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+    expires_at: Mapped[datetime] = mapped_column(index=True)
+
+    def __repr__(self) -> str:
+        return f"IdempotencyKey(user_id={self.user_id}, key={self.key})"
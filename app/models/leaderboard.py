@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class LeaderboardScore(Base):
+    """
+    Снимок рейтингов, которые приложение держит в памяти
+    (LEADERBOARD_BACKEND=memory): из него рейтинги восстанавливаются при старте.
+    """
+
+    __tablename__ = "leaderboard_scores"
+
+    board: Mapped[str] = mapped_column(String(32), primary_key=True)
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    score: Mapped[float]
+
+    # Когда истекает весь рейтинг (помесячные); NULL — бессрочный
+    expires_at: Mapped[datetime | None]
+
+    def __repr__(self) -> str:
+        return f"LeaderboardScore(board={self.board}, user_id={self.user_id}, score={self.score})"
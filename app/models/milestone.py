@@ -0,0 +1,39 @@
+import datetime
+
+from sqlalchemy import ForeignKey, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class HabitProgress(Base):
+    """
+    Состояние потока отметок привычки для вех цели: текущая серия, дата
+    последней учтённой отметки и пройденные в этой серии вехи. Обновляется
+    по каждой отметке без пересчёта истории.
+    """
+
+    __tablename__ = "habit_progress"
+
+    habit_id: Mapped[int] = mapped_column(
+        ForeignKey("habits.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    streak: Mapped[int] = mapped_column(default=0)
+
+    # Первый день текущей серии; NULL — серии нет
+    run_start: Mapped[datetime.date | None]
+
+    # Дата последней учтённой отметки: более ранние отметки пересчитывают состояние
+    last_date: Mapped[datetime.date | None]
+
+    # Пройдено уровней вех в текущей серии: 0, 1 — половина цели, 2 — цель
+    milestone: Mapped[int] = mapped_column(SmallInteger, default=0)
+
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"HabitProgress(habit_id={self.habit_id}, streak={self.streak})"
@@ -0,0 +1,49 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class RevokedToken(Base):
+    """Отозванный токен (по jti). Запись нужна только до истечения токена."""
+
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True)
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE")
+    )
+
+    expires_at: Mapped[datetime] = mapped_column(index=True)
+
+    revoked_at: Mapped[datetime] = mapped_column(server_default=func.now(), index=True)
+
+    def __repr__(self) -> str:
+        return f"RevokedToken(jti={self.jti}, user_id={self.user_id})"
+
+
+class TokenWatermark(Base):
+    """Все токены пользователя, выданные раньше not_before, недействительны."""
+
+    __tablename__ = "token_watermarks"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    not_before: Mapped[datetime]
+
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now(), index=True
+    )
+
+    def __repr__(self) -> str:
+        return f"TokenWatermark(user_id={self.user_id}, not_before={self.not_before})"
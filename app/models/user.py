@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import String
+from sqlalchemy import Index, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -17,7 +17,6 @@ class User(Base):
         UUID(as_uuid=True),
         primary_key=True,
         server_default=func.gen_random_uuid(),
-        index=True,
     )
 
     username: Mapped[str] = mapped_column(
@@ -32,11 +31,53 @@ class User(Base):
 
     is_active: Mapped[bool] = mapped_column(default=True)
 
+    # Участие в публичных рейтингах — только по согласию пользователя
+    leaderboard_opt_in: Mapped[bool] = mapped_column(default=False, server_default="false")
+
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
+    # Аккаунт помечен на удаление; данные дочищает фоновая задача
+    deleted_at: Mapped[datetime | None]
+
+    # Дочерние строки удаляет ON DELETE CASCADE в БД, ORM их не загружает
     habits: Mapped[list["Habit"]] = relationship(
-        "Habit", back_populates="user", cascade="all, delete-orphan"
+        "Habit",
+        back_populates="user",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql",
     )
 
     def __repr__(self) -> str:
         return f"User(id={self.id}, username={self.username})"
+
+
+class UserDeletion(Base):
+    """
+    Ход удаления аккаунта. Строка переживает удаление пользователя (внешнего
+    ключа нет) и остаётся записью о том, что и когда было удалено.
+    """
+
+    __tablename__ = "user_deletions"
+    __table_args__ = (
+        Index(
+            "ix_user_deletions_pending",
+            "requested_at",
+            postgresql_where=text("finished_at IS NULL"),
+        ),
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+
+    requested_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+    finished_at: Mapped[datetime | None]
+
+    habits: Mapped[int] = mapped_column(server_default=text("0"))
+
+    trackings: Mapped[int] = mapped_column(server_default=text("0"))
+
+    batches: Mapped[int] = mapped_column(server_default=text("0"))
+
+    def __repr__(self) -> str:
+        return f"UserDeletion(user_id={self.user_id}, finished_at={self.finished_at})"
@@ -0,0 +1,81 @@
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import Date, Row, cast, func, literal, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import DatabaseError
+from app.core.logger import get_logger
+from app.models.habit import Habit, HabitStatus, HabitTracking
+
+logger = get_logger(__name__)
+
+
+def _days_with_status(status: HabitStatus, date_from: date, date_to: date):
+    # Смещения дней от date_from; (habit_id, date) INCLUDE status — index-only scan
+    return (
+        select(func.array_agg(HabitTracking.date - date_from))
+        .where(
+            HabitTracking.habit_id == Habit.id,
+            HabitTracking.date.between(date_from, date_to),
+            HabitTracking.status == status,
+        )
+        .scalar_subquery()
+    )
+
+
+class AnalyticsRepository:
+    """
+    Выборки для аналитики: по строке на привычку с массивами дней, а не по
+    строке на отметку, — матрица собирается из них без цикла по отметкам.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_user_ids(self, after: UUID | None, limit: int) -> list[UUID]:
+        """Следующая порция пользователей с активными привычками, по возрастанию id."""
+        try:
+            query = select(Habit.user_id).where(Habit.is_active.is_(True))
+            if after is not None:
+                query = query.where(Habit.user_id > after)
+            result = await self.session.execute(
+                query.group_by(Habit.user_id).order_by(Habit.user_id).limit(limit)
+            )
+            return list(result.scalars().all())
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to fetch analytics users | after=%s | error=%s", after, e)
+            raise DatabaseError("Failed to fetch analytics users") from e
+
+    async def get_habit_days(
+        self, user_ids: list[UUID], date_from: date, date_to: date
+    ) -> list[Row]:
+        """
+        Активные привычки пользователей по порядку (user_id, id): первый
+        учитываемый день и смещения дней с выполнением и с пропуском.
+        """
+        try:
+            first_day = func.greatest(
+                cast(Habit.created_at, Date) - literal(date_from, Date), 0
+            )
+            result = await self.session.execute(
+                select(
+                    Habit.user_id,
+                    Habit.id,
+                    Habit.title,
+                    first_day.label("first_day"),
+                    _days_with_status(HabitStatus.COMPLETED, date_from, date_to).label("completed"),
+                    _days_with_status(HabitStatus.SKIPPED, date_from, date_to).label("skipped"),
+                )
+                .where(Habit.user_id.in_(user_ids), Habit.is_active.is_(True))
+                .order_by(Habit.user_id, Habit.id)
+            )
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to fetch habit days | users=%s | date_from=%s | error=%s",
+                         len(user_ids), date_from, e
+            )
+            raise DatabaseError("Failed to fetch habit days") from e
@@ -0,0 +1,174 @@
+from datetime import date, datetime
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import Row, delete, func, insert, select, true
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import DatabaseError, NotFoundError
+from app.core.logger import get_logger
+from app.models.archive import ArchivedHabit, ArchivedHabitTracking
+from app.models.habit import Habit, HabitTracking
+
+logger = get_logger(__name__)
+
+habits = Habit.__table__
+trackings = HabitTracking.__table__
+archived_habits = ArchivedHabit.__table__
+archived_trackings = ArchivedHabitTracking.__table__
+
+# Колонки, общие для горячих и архивных таблиц
+HABIT_COLUMNS = [c.name for c in habits.c]
+TRACKING_COLUMNS = [c.name for c in trackings.c]
+
+
+class ArchiveBatch(NamedTuple):
+    habits: int
+    trackings: int
+    user_ids: set[UUID]
+
+
+class ArchiveRepository:
+    """
+    Перенос привычек с отметками между горячими таблицами и схемой archive.
+    Каждый перенос — один DELETE ... RETURNING внутри INSERT ... SELECT,
+    поэтому строки не проходят через память приложения.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def archive_inactive_habits(self, before: datetime, limit: int) -> ArchiveBatch:
+        """
+        Переносит до limit привычек, деактивированных раньше before, вместе со
+        всеми отметками. Строки, заблокированные другими транзакциями,
+        пропускаются и достанутся следующему пакету.
+        """
+        try:
+            candidates = await self.session.execute(
+                select(habits.c.id, habits.c.user_id)
+                .where(habits.c.is_active.is_(False), habits.c.updated_at < before)
+                .order_by(habits.c.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            rows = candidates.all()
+            if not rows:
+                return ArchiveBatch(0, 0, set())
+            habit_ids = [row.id for row in rows]
+
+            moved = (
+                delete(trackings)
+                .where(trackings.c.habit_id.in_(habit_ids))
+                .returning(*trackings.c)
+                .cte("moved_trackings")
+            )
+            tracking_result = await self.session.execute(
+                insert(archived_trackings).from_select(
+                    TRACKING_COLUMNS, select(*(moved.c[name] for name in TRACKING_COLUMNS))
+                )
+            )
+
+            # Tombstones отметок удаляются каскадом; клиентам /sync перенос
+            # виден по archived_at новой строки archive.habits
+            moved = (
+                delete(habits)
+                .where(habits.c.id.in_(habit_ids))
+                .returning(*habits.c)
+                .cte("moved_habits")
+            )
+            await self.session.execute(
+                insert(archived_habits).from_select(
+                    HABIT_COLUMNS, select(*(moved.c[name] for name in HABIT_COLUMNS))
+                )
+            )
+            await self.session.commit()
+
+            batch = ArchiveBatch(
+                len(habit_ids), tracking_result.rowcount, {row.user_id for row in rows}
+            )
+            logger.info("Habits archived | habits=%s | trackings=%s | first_id=%s | last_id=%s",
+                        batch.habits, batch.trackings, habit_ids[0], habit_ids[-1]
+            )
+            return batch
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to archive habits | before=%s | limit=%s | error=%s",
+                         before, limit, e
+            )
+            raise DatabaseError("Failed to archive habits") from e
+
+    async def get_habits(self, user_id: UUID) -> list[Row]:
+        try:
+            result = await self.session.execute(
+                select(*archived_habits.c)
+                .where(archived_habits.c.user_id == user_id)
+                .order_by(archived_habits.c.archived_at.desc())
+            )
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to fetch archived habits | user_id=%s | error=%s", user_id, e)
+            raise DatabaseError("Failed to fetch archived habits") from e
+
+    async def restore_habit(self, user_id: UUID, habit_id: int, since: date | None) -> Habit:
+        """
+        Возвращает привычку в горячие таблицы активной, с отметками начиная с
+        since (более старые остаются в архивных секциях по сроку хранения).
+        updated_at выставляется заново, чтобы восстановление попало в
+        дельта-синхронизацию клиентов.
+        """
+        try:
+            moved = (
+                delete(archived_habits)
+                .where(archived_habits.c.id == habit_id, archived_habits.c.user_id == user_id)
+                .returning(*archived_habits.c)
+                .cte("restored_habit")
+            )
+            overrides = {"is_active": true(), "updated_at": func.now()}
+            result = await self.session.execute(
+                insert(habits)
+                .from_select(
+                    HABIT_COLUMNS,
+                    select(*(overrides.get(name, moved.c[name]) for name in HABIT_COLUMNS)),
+                )
+                .returning(habits.c.id)
+            )
+            if result.scalar_one_or_none() is None:
+                raise NotFoundError("Habit")
+
+            criteria = [archived_trackings.c.habit_id == habit_id]
+            if since is not None:
+                criteria.append(archived_trackings.c.date >= since)
+            moved = (
+                delete(archived_trackings)
+                .where(*criteria)
+                .returning(*archived_trackings.c)
+                .cte("restored_trackings")
+            )
+            overrides = {"updated_at": func.now()}
+            tracking_result = await self.session.execute(
+                insert(trackings).from_select(
+                    TRACKING_COLUMNS,
+                    select(*(overrides.get(name, moved.c[name]) for name in TRACKING_COLUMNS)),
+                )
+            )
+
+            habit = (
+                await self.session.execute(select(Habit).where(Habit.id == habit_id))
+            ).scalar_one()
+            await self.session.commit()
+
+            logger.info("Habit restored | user_id=%s | habit_id=%s | trackings=%s",
+                        user_id, habit_id, tracking_result.rowcount
+            )
+            return habit
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to restore habit | user_id=%s | habit_id=%s | error=%s",
+                         user_id, habit_id, e
+            )
+            raise DatabaseError("Failed to restore habit") from e
@@ -0,0 +1,183 @@
+from datetime import datetime
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, tuple_, union, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import DatabaseError
+from app.core.logger import get_logger
+from app.models.archive import ArchivedHabit, ArchivedHabitTracking
+from app.models.habit import Habit, HabitTracking, HabitTrackingTombstone
+from app.models.user import User, UserDeletion
+
+logger = get_logger(__name__)
+
+users = User.__table__
+deletions = UserDeletion.__table__
+habits = Habit.__table__
+trackings = HabitTracking.__table__
+tombstones = HabitTrackingTombstone.__table__
+archived_habits = ArchivedHabit.__table__
+archived_trackings = ArchivedHabitTracking.__table__
+
+
+class PurgeBatch(NamedTuple):
+    habits: int
+    trackings: int
+    # Все данные удалены вместе со строкой пользователя
+    finished: bool
+
+
+class UserDeletionRepository:
+    """
+    Удаление аккаунта в два этапа: пометка в запросе пользователя и
+    фоновая очистка пакетами. Каждый пакет — один DELETE не больше limit
+    строк в своей транзакции, поэтому ни память, ни блокировки не растут
+    с историей пользователя, а прерванная очистка продолжается с места.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def mark_deleted(self, user_id: UUID) -> datetime | None:
+        """
+        Деактивирует аккаунт и ставит его в очередь на очистку.
+        None — удаление уже запрошено раньше.
+        """
+        try:
+            result = await self.session.execute(
+                update(users)
+                .where(users.c.id == user_id, users.c.deleted_at.is_(None))
+                .values(is_active=False, deleted_at=func.now())
+                .returning(users.c.deleted_at)
+            )
+            requested_at = result.scalar_one_or_none()
+            if requested_at is None:
+                await self.session.rollback()
+                return None
+
+            await self.session.execute(
+                pg_insert(deletions)
+                .values(user_id=user_id, requested_at=requested_at)
+                .on_conflict_do_nothing(index_elements=[deletions.c.user_id])
+            )
+            await self.session.commit()
+
+            logger.info("User marked for deletion | user_id=%s", user_id)
+            return requested_at
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to mark user for deletion | user_id=%s | error=%s", user_id, e)
+            raise DatabaseError("Failed to mark user for deletion") from e
+
+    async def get_pending(self, before: datetime, limit: int) -> list[UUID]:
+        """Аккаунты, удаление которых запрошено раньше before и ещё не завершено."""
+        try:
+            result = await self.session.execute(
+                select(deletions.c.user_id)
+                .where(deletions.c.finished_at.is_(None), deletions.c.requested_at < before)
+                .order_by(deletions.c.requested_at)
+                .limit(limit)
+            )
+            return list(result.scalars().all())
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to fetch pending deletions | error=%s", e)
+            raise DatabaseError("Failed to fetch pending deletions") from e
+
+    async def purge_batch(self, user_id: UUID, limit: int) -> PurgeBatch:
+        """
+        Удаляет следующую порцию данных пользователя: сначала отметки (горячие
+        и архивные), затем привычки. Когда удалять больше нечего, удаляется
+        сама строка users — оставшееся (токены, ключи идемпотентности)
+        небольшое и уходит по ON DELETE CASCADE.
+        """
+        owned_habits = union(
+            select(habits.c.id).where(habits.c.user_id == user_id),
+            select(archived_habits.c.id).where(archived_habits.c.user_id == user_id),
+        )
+        steps = [
+            (
+                "tombstones",
+                delete(tombstones).where(
+                    tombstones.c.id.in_(
+                        select(tombstones.c.id)
+                        .where(tombstones.c.user_id == user_id)
+                        .limit(limit)
+                    )
+                ),
+            ),
+            # У архивных отметок нет внешнего ключа: каскад их не удалит
+            ("trackings", self._chunk(archived_trackings, owned_habits, limit)),
+            ("trackings", self._chunk(trackings, owned_habits, limit)),
+            (
+                "habits",
+                delete(habits).where(
+                    habits.c.id.in_(
+                        select(habits.c.id).where(habits.c.user_id == user_id).limit(limit)
+                    )
+                ),
+            ),
+            (
+                "habits",
+                delete(archived_habits).where(
+                    archived_habits.c.id.in_(
+                        select(archived_habits.c.id)
+                        .where(archived_habits.c.user_id == user_id)
+                        .limit(limit)
+                    )
+                ),
+            ),
+        ]
+
+        try:
+            for kind, statement in steps:
+                deleted = (await self.session.execute(statement)).rowcount
+                if deleted == 0:
+                    continue
+
+                batch = PurgeBatch(
+                    deleted if kind == "habits" else 0,
+                    deleted if kind == "trackings" else 0,
+                    False,
+                )
+                await self._track(user_id, batch)
+                await self.session.commit()
+                return batch
+
+            await self.session.execute(delete(users).where(users.c.id == user_id))
+            batch = PurgeBatch(0, 0, True)
+            await self._track(user_id, batch)
+            await self.session.commit()
+
+            logger.info("User purged | user_id=%s", user_id)
+            return batch
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to purge user | user_id=%s | error=%s", user_id, e)
+            raise DatabaseError("Failed to purge user") from e
+
+    @staticmethod
+    def _chunk(table, owned_habits, limit: int):
+        # Условие по habit_id повторяется снаружи: без него планировщик
+        # сопоставляет пакет с (id, date) полным проходом по всем секциям
+        owned = table.c.habit_id.in_(owned_habits)
+        chunk = select(table.c.habit_id, table.c.date).where(owned).limit(limit)
+        return delete(table).where(owned, tuple_(table.c.habit_id, table.c.date).in_(chunk))
+
+    async def _track(self, user_id: UUID, batch: PurgeBatch) -> None:
+        values = {
+            "habits": deletions.c.habits + batch.habits,
+            "trackings": deletions.c.trackings + batch.trackings,
+            "batches": deletions.c.batches + 1,
+        }
+        if batch.finished:
+            values["finished_at"] = func.now()
+        await self.session.execute(
+            update(deletions).where(deletions.c.user_id == user_id).values(**values)
+        )
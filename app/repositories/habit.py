@@ -1,29 +1,54 @@
+from collections.abc import Sequence
+from datetime import date, timedelta
 from uuid import UUID
 
-from sqlalchemy import and_, select
+from sqlalchemy import Row, String, and_, cast, func, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.base import ExecutableOption
 
 from app.core.logger import get_logger
 from app.core.exceptions import NotFoundError, DatabaseError
-from app.models.habit import Habit
+from app.models.habit import Habit, HabitTracking
+from app.repositories.tracking import current_streak_select
 
 logger = get_logger(__name__)
 
+# Колонки привычки без ORM-объектов: для списков, которые сразу уходят в
+# ответ, identity map и отслеживание изменений не нужны
+HABIT_COLUMNS = tuple(Habit.__table__.c)
+
+
+def trackings_between(date_from: date, date_to: date) -> ExecutableOption:
+    """
+    Опция загрузки Habit.trackings за окно дат: один SELECT ... IN на все
+    привычки результата вместо запроса на каждую.
+    """
+    return selectinload(
+        Habit.trackings.and_(HabitTracking.date.between(date_from, date_to))
+    )
+
 
 class HabitRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
         self.model = Habit
 
-    async def get_all(self, user_id: UUID, only_active: bool = True) -> list[Habit]:
+    async def get_all(
+        self,
+        user_id: UUID,
+        only_active: bool = True,
+        options: Sequence[ExecutableOption] = (),
+    ) -> list[Habit]:
         try:
             query = select(self.model).where(self.model.user_id == user_id)
 
             if only_active:
                 query = query.where(self.model.is_active.is_(True))
 
-            query = query.order_by(self.model.created_at.desc())
+            query = query.order_by(self.model.created_at.desc()).options(*options)
 
             result = await self.session.execute(query)
             return list(result.scalars().all())
@@ -36,11 +61,42 @@ class HabitRepository:
             # Оборачиваем в доменную ошибку
             raise DatabaseError("Failed to fetch habits") from e
 
-    async def get(self, user_id: UUID, habit_id: int) -> Habit:
+    async def get_list(self, user_id: UUID, only_active: bool = True) -> list[Row]:
+        """Вариант get_all для списков: строки с колонками вместо объектов."""
+        try:
+            query = select(*HABIT_COLUMNS).where(self.model.user_id == user_id)
+
+            if only_active:
+                query = query.where(self.model.is_active.is_(True))
+
+            result = await self.session.execute(query.order_by(self.model.created_at.desc()))
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            logger.error(
+                "Failed to fetch habit list | user_id=%s | only_active=%s | error=%s",
+                user_id, only_active, e
+            )
+            raise DatabaseError("Failed to fetch habit list") from e
+
+    async def count_active(self, user_id: UUID) -> int:
+        try:
+            query = select(func.count()).where(
+                self.model.user_id == user_id, self.model.is_active.is_(True)
+            )
+            return (await self.session.execute(query)).scalar_one()
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to count habits | user_id=%s | error=%s", user_id, e)
+            raise DatabaseError("Failed to count habits") from e
+
+    async def get(
+        self, user_id: UUID, habit_id: int, options: Sequence[ExecutableOption] = ()
+    ) -> Habit:
         try:
             query = select(self.model).where(
                 and_(self.model.user_id == user_id, self.model.id == habit_id)
-            )
+            ).options(*options)
 
             result = await self.session.execute(query)
             habit = result.scalar_one_or_none()
@@ -56,13 +112,85 @@ class HabitRepository:
             )
             raise DatabaseError("Failed to fetch habit") from e
 
+    async def get_owned_ids(self, user_id: UUID, habit_ids: set[int]) -> set[int]:
+        try:
+            query = select(self.model.id).where(
+                self.model.user_id == user_id,
+                self.model.is_active.is_(True),
+                self.model.id.in_(habit_ids),
+            )
+
+            result = await self.session.execute(query)
+            return set(result.scalars().all())
+
+        except SQLAlchemyError as e:
+            logger.error(
+                "Failed to check habit ownership | user_id=%s | habit_ids=%s | error=%s",
+                user_id, habit_ids, e
+            )
+            raise DatabaseError("Failed to check habit ownership") from e
+
+    async def get_dashboard(
+        self, user_id: UUID, day: date, days: int = 7
+    ) -> list[Row]:
+        """
+        Активные привычки вместе с отметками за последние `days` дней
+        и текущей серией — одним запросом (два LATERAL-подзапроса).
+        """
+        try:
+            tracking = HabitTracking
+            window_start = day - timedelta(days=days - 1)
+
+            recent = (
+                select(
+                    func.array_agg(
+                        aggregate_order_by(tracking.date, tracking.date)
+                    ).label("dates"),
+                    func.array_agg(
+                        aggregate_order_by(cast(tracking.status, String), tracking.date)
+                    ).label("statuses"),
+                )
+                .where(
+                    tracking.habit_id == self.model.id,
+                    tracking.date.between(window_start, day),
+                )
+                .lateral("recent")
+            )
+
+            streak = current_streak_select(
+                day, tracking.habit_id == self.model.id
+            ).lateral("streak")
+
+            query = (
+                select(
+                    *HABIT_COLUMNS,
+                    recent.c.dates,
+                    recent.c.statuses,
+                    streak.c.current_streak,
+                )
+                .select_from(self.model)
+                .join(recent, true())
+                .join(streak, true())
+                .where(self.model.user_id == user_id, self.model.is_active.is_(True))
+                .order_by(self.model.created_at.desc())
+            )
+
+            result = await self.session.execute(query)
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            logger.error(
+                "Failed to fetch dashboard | user_id=%s | day=%s | error=%s",
+                user_id, day, e
+            )
+            raise DatabaseError("Failed to fetch dashboard") from e
+
     async def create(self, user_id: UUID, data: dict) -> Habit:
         try:
             data["user_id"] = user_id
             habit = self.model(**data)
             self.session.add(habit)
             await self.session.commit()
-            await self.session.refresh(habit)
             
             logger.info("Habit created | user_id=%s | habit_id=%s",
                         user_id, habit.id
@@ -86,7 +214,6 @@ class HabitRepository:
                 setattr(habit, key, value)
 
             await self.session.commit()
-            await self.session.refresh(habit)
 
             logger.info("Habit updated | user_id=%s | habit_id=%s",
                         user_id, habit_id
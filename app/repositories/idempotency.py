@@ -0,0 +1,152 @@
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logger import get_logger
+from app.core.exceptions import DatabaseError
+from app.models.idempotency import IdempotencyKey
+
+logger = get_logger(__name__)
+
+
+class IdempotencyRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.model = IdempotencyKey
+
+    async def get(self, user_id: UUID, key: str) -> IdempotencyKey | None:
+        try:
+            query = select(self.model).where(
+                self.model.user_id == user_id,
+                self.model.key == key,
+                self.model.expires_at > func.now(),
+            )
+            result = await self.session.execute(query)
+            return result.scalar_one_or_none()
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to get idempotency key | user_id=%s | key=%s | error=%s",
+                         user_id, key, e
+            )
+            raise DatabaseError("Failed to get idempotency key") from e
+
+    async def acquire(
+        self,
+        user_id: UUID,
+        key: str,
+        request_hash: str,
+        expires_at: datetime,
+        locked_until: datetime,
+    ) -> bool:
+        """
+        Занимает ключ под новый запрос до locked_until. Перезаписываются
+        истёкшая запись и брошенная: без ответа и с истёкшей арендой.
+        False — ключ уже занят живой записью (параллельный повтор).
+        """
+        try:
+            stmt = insert(self.model).values(
+                user_id=user_id,
+                key=key,
+                request_hash=request_hash,
+                expires_at=expires_at,
+                locked_until=locked_until,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[self.model.user_id, self.model.key],
+                set_={
+                    "request_hash": stmt.excluded.request_hash,
+                    "status_code": None,
+                    "response": None,
+                    "created_at": func.now(),
+                    "expires_at": stmt.excluded.expires_at,
+                    "locked_until": stmt.excluded.locked_until,
+                },
+                where=or_(
+                    self.model.expires_at <= func.now(),
+                    and_(
+                        self.model.status_code.is_(None),
+                        func.coalesce(self.model.locked_until, func.now()) <= func.now(),
+                    ),
+                ),
+            ).returning(self.model.key)
+
+            result = await self.session.execute(stmt)
+            acquired = result.scalar_one_or_none() is not None
+            await self.session.commit()
+            return acquired
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to acquire idempotency key | user_id=%s | key=%s | error=%s",
+                         user_id, key, e
+            )
+            raise DatabaseError("Failed to acquire idempotency key") from e
+
+    async def complete(
+        self,
+        user_id: UUID,
+        key: str,
+        locked_until: datetime,
+        status_code: int,
+        response: Any,
+    ) -> None:
+        """
+        Сохраняет ответ. locked_until — аренда, выданная acquire: если ключ
+        уже занял повтор после её истечения, запись повтора не трогается.
+        """
+        try:
+            await self.session.execute(
+                update(self.model)
+                .where(
+                    self.model.user_id == user_id,
+                    self.model.key == key,
+                    self.model.locked_until == locked_until,
+                    self.model.status_code.is_(None),
+                )
+                .values(status_code=status_code, response=response, locked_until=None)
+            )
+            await self.session.commit()
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to store idempotent response | user_id=%s | key=%s | error=%s",
+                         user_id, key, e
+            )
+            raise DatabaseError("Failed to store idempotent response") from e
+
+    async def release(self, user_id: UUID, key: str, locked_until: datetime) -> None:
+        try:
+            await self.session.execute(
+                delete(self.model).where(
+                    self.model.user_id == user_id,
+                    self.model.key == key,
+                    self.model.locked_until == locked_until,
+                    self.model.status_code.is_(None),
+                )
+            )
+            await self.session.commit()
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to release idempotency key | user_id=%s | key=%s | error=%s",
+                         user_id, key, e
+            )
+            raise DatabaseError("Failed to release idempotency key") from e
+
+    async def purge_expired(self) -> int:
+        try:
+            result = await self.session.execute(
+                delete(self.model).where(self.model.expires_at <= func.now())
+            )
+            await self.session.commit()
+            return result.rowcount
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to purge idempotency keys | error=%s", e)
+            raise DatabaseError("Failed to purge idempotency keys") from e
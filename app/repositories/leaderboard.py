@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import delete, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import DatabaseError
+from app.core.logger import get_logger
+from app.models.leaderboard import LeaderboardScore
+
+logger = get_logger(__name__)
+
+scores = LeaderboardScore.__table__
+
+# Строк на один INSERT/DELETE снимка: держим число параметров запроса в пределах
+SNAPSHOT_CHUNK = 5000
+LOAD_CHUNK = 50_000
+
+
+class LeaderboardRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def save(
+        self,
+        changes: dict[tuple[str, UUID], float | None],
+        expires: dict[str, float],
+        expired_boards: list[str],
+    ) -> None:
+        """Записывает изменения рейтингов одной транзакцией."""
+        upserts = [
+            {
+                "board": board,
+                "user_id": user_id,
+                "score": score,
+                "expires_at": _timestamp(expires.get(board)),
+            }
+            for (board, user_id), score in changes.items()
+            if score is not None
+        ]
+        removals = [key for key, score in changes.items() if score is None]
+
+        try:
+            if expired_boards:
+                await self.session.execute(
+                    delete(scores).where(scores.c.board.in_(expired_boards))
+                )
+            for start in range(0, len(removals), SNAPSHOT_CHUNK):
+                await self.session.execute(
+                    delete(scores).where(
+                        tuple_(scores.c.board, scores.c.user_id).in_(
+                            removals[start:start + SNAPSHOT_CHUNK]
+                        )
+                    )
+                )
+            for start in range(0, len(upserts), SNAPSHOT_CHUNK):
+                stmt = insert(scores).values(upserts[start:start + SNAPSHOT_CHUNK])
+                await self.session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[scores.c.board, scores.c.user_id],
+                        set_={
+                            "score": stmt.excluded.score,
+                            "expires_at": stmt.excluded.expires_at,
+                        },
+                    )
+                )
+            await self.session.commit()
+
+            logger.debug("Leaderboard snapshot saved | upserts=%s | removals=%s | expired=%s",
+                         len(upserts), len(removals), expired_boards
+            )
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to save leaderboard snapshot | changes=%s | error=%s",
+                         len(changes), e
+            )
+            raise DatabaseError("Failed to save leaderboard snapshot") from e
+
+    async def load(self) -> dict[str, tuple[list[tuple[UUID, float]], float | None]]:
+        """Действующие рейтинги: board -> (записи, время истечения)."""
+        boards: dict[str, tuple[list[tuple[UUID, float]], float | None]] = {}
+        try:
+            result = await self.session.stream(
+                select(scores.c.board, scores.c.user_id, scores.c.score, scores.c.expires_at)
+                .where(or_(scores.c.expires_at.is_(None), scores.c.expires_at > func.now()))
+                .execution_options(yield_per=LOAD_CHUNK)
+            )
+            async for board, user_id, score, expires_at in result:
+                entries, latest = boards.get(board, ([], None))
+                if expires_at is not None:
+                    expires_at = expires_at.timestamp()
+                    latest = expires_at if latest is None else max(latest, expires_at)
+                entries.append((user_id, score))
+                boards[board] = (entries, latest)
+            return boards
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to load leaderboards | error=%s", e)
+            raise DatabaseError("Failed to load leaderboards") from e
+
+
+def _timestamp(value: float | None) -> datetime | None:
+    return None if value is None else datetime.fromtimestamp(value, timezone.utc)
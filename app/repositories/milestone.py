@@ -0,0 +1,141 @@
+from datetime import date
+
+from sqlalchemy import Row, Select, func, literal, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import DatabaseError
+from app.core.logger import get_logger
+from app.models.habit import Habit, HabitStatus, HabitTracking
+from app.models.milestone import HabitProgress
+
+logger = get_logger(__name__)
+
+
+def _streams_select(epoch: date) -> Select:
+    """
+    Привычки с потоками отметок: дни от epoch по порядку и признак
+    выполнения. Только колонки индекса (habit_id, date) INCLUDE status.
+    """
+    stream = (
+        select(
+            func.array_agg(
+                aggregate_order_by(HabitTracking.date - literal(epoch), HabitTracking.date)
+            ).label("days"),
+            func.array_agg(
+                aggregate_order_by(
+                    HabitTracking.status == HabitStatus.COMPLETED, HabitTracking.date
+                )
+            ).label("completed"),
+        )
+        .where(HabitTracking.habit_id == Habit.id)
+        .lateral("stream")
+    )
+    return (
+        select(Habit.id, Habit.user_id, Habit.goal_streak, stream.c.days, stream.c.completed)
+        .join(stream, true())
+    )
+
+
+class MilestoneRepository:
+    """Состояние вех по привычкам (habit_progress) и потоки отметок для его пересчёта."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.model = HabitProgress
+
+    async def lock(self, habit_ids: set[int]) -> list[Row]:
+        """
+        Привычки с текущим состоянием; has_progress ложно, если строки ещё
+        нет. Строки habits блокируются до save: параллельные отметки одной
+        привычки применяются по очереди. FOR NO KEY UPDATE не конфликтует
+        с проверкой внешнего ключа при вставке отметок.
+        """
+        try:
+            result = await self.session.execute(
+                select(
+                    Habit.id,
+                    Habit.user_id,
+                    Habit.goal_streak,
+                    self.model.habit_id.is_not(None).label("has_progress"),
+                    self.model.streak,
+                    self.model.run_start,
+                    self.model.last_date,
+                    self.model.milestone,
+                )
+                .outerjoin(self.model, self.model.habit_id == Habit.id)
+                .where(Habit.id.in_(habit_ids))
+                .order_by(Habit.id)
+                .with_for_update(of=Habit, key_share=True)
+            )
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to lock habit progress | habit_ids=%s | error=%s", habit_ids, e)
+            raise DatabaseError("Failed to lock habit progress") from e
+
+    async def get_streams(self, habit_ids: set[int], epoch: date) -> list[Row]:
+        try:
+            result = await self.session.execute(
+                _streams_select(epoch).where(Habit.id.in_(habit_ids)).order_by(Habit.id)
+            )
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to fetch habit streams | habit_ids=%s | error=%s", habit_ids, e)
+            raise DatabaseError("Failed to fetch habit streams") from e
+
+    async def get_missing_streams(self, after: int, limit: int, epoch: date) -> list[Row]:
+        """Следующая порция активных привычек без строки прогресса, по возрастанию id."""
+        try:
+            result = await self.session.execute(
+                _streams_select(epoch)
+                .where(
+                    Habit.id > after,
+                    Habit.is_active.is_(True),
+                    ~select(self.model.habit_id)
+                    .where(self.model.habit_id == Habit.id)
+                    .exists(),
+                )
+                .order_by(Habit.id)
+                .limit(limit)
+            )
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to fetch missing habit streams | after=%s | error=%s", after, e)
+            raise DatabaseError("Failed to fetch missing habit streams") from e
+
+    async def save(self, rows: list[dict], overwrite: bool = True) -> int:
+        """
+        Сохраняет состояния и фиксирует транзакцию (снимая блокировки lock).
+        Без overwrite существующие строки не трогаются: начальный расчёт
+        не затирает состояние, которое успели обновить новые отметки.
+        """
+        try:
+            stmt = insert(self.model).values(rows)
+            if overwrite:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[self.model.habit_id],
+                    set_={
+                        "streak": stmt.excluded.streak,
+                        "run_start": stmt.excluded.run_start,
+                        "last_date": stmt.excluded.last_date,
+                        "milestone": stmt.excluded.milestone,
+                        "updated_at": func.now(),
+                    },
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[self.model.habit_id])
+
+            result = await self.session.execute(stmt)
+            await self.session.commit()
+            return result.rowcount
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to save habit progress | count=%s | error=%s", len(rows), e)
+            raise DatabaseError("Failed to save habit progress") from e
@@ -0,0 +1,198 @@
+import re
+from datetime import date
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import DatabaseError
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+_RANGE_BOUND = re.compile(r"FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    # Границы диапазона [lower, upper); у секции по умолчанию их нет
+    lower: date | None
+    upper: date | None
+
+    @property
+    def is_default(self) -> bool:
+        return self.lower is None
+
+
+def _quote(name: str) -> str:
+    # Имя может быть квалифицировано схемой: archive.habit_tracking
+    return ".".join(f'"{part}"' for part in name.split("."))
+
+
+def _bound(lower: date, upper: date) -> str:
+    return f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+
+
+class PartitionRepository:
+    """
+    DDL секций таблиц с RANGE-секционированием по дате.
+    Имена таблиц и секций формирует сервис, а не пользователь.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_partitions(self, parent: str) -> list[Partition]:
+        try:
+            # regclass::text квалифицирует имя схемой, если она не в search_path
+            result = await self.session.execute(
+                text(
+                    """
+                    SELECT CAST(CAST(c.oid AS regclass) AS text), pg_get_expr(c.relpartbound, c.oid)
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = CAST(:parent AS regclass)
+                    ORDER BY c.relname
+                    """
+                ),
+                {"parent": parent},
+            )
+            partitions = []
+            for name, bound in result.all():
+                match = _RANGE_BOUND.search(bound)
+                if match is None:
+                    partitions.append(Partition(name, None, None))
+                else:
+                    lower, upper = match.groups()
+                    partitions.append(
+                        Partition(name, date.fromisoformat(lower), date.fromisoformat(upper))
+                    )
+            return partitions
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to list partitions | parent=%s | error=%s", parent, e)
+            raise DatabaseError("Failed to list partitions") from e
+
+    async def _attach(
+        self, parent: str, name: str, lower: date, upper: date, default: str | None
+    ) -> int:
+        """
+        Подключает таблицу name секцией [lower, upper). Строки этого диапазона,
+        успевшие попасть в секцию по умолчанию, сначала переносятся в неё —
+        иначе Postgres не даст подключить секцию. Возвращает число перенесённых строк.
+        """
+        bounds = {"lower": lower, "upper": upper}
+        moved = 0
+        if default is not None:
+            result = await self.session.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {_quote(default)} "
+                    "WHERE date >= :lower AND date < :upper RETURNING *) "
+                    f"INSERT INTO {_quote(name)} SELECT * FROM moved"
+                ),
+                bounds,
+            )
+            moved = result.rowcount
+        await self.session.execute(
+            text(f"ALTER TABLE {_quote(parent)} ATTACH PARTITION {_quote(name)} {_bound(lower, upper)}")
+        )
+        return moved
+
+    async def create_partition(
+        self, parent: str, name: str, lower: date, upper: date, default: str | None
+    ) -> int:
+        """
+        Создаёт секцию [lower, upper) и забирает в неё строки диапазона из
+        секции по умолчанию. Возвращает число перенесённых строк.
+        """
+        bounds = {"lower": lower, "upper": upper}
+        try:
+            stray = False
+            if default is not None:
+                stray = (
+                    await self.session.execute(
+                        text(
+                            f"SELECT EXISTS (SELECT 1 FROM {_quote(default)} "
+                            "WHERE date >= :lower AND date < :upper)"
+                        ),
+                        bounds,
+                    )
+                ).scalar_one()
+
+            moved = 0
+            if not stray:
+                await self.session.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {_quote(name)} "
+                        f"PARTITION OF {_quote(parent)} {_bound(lower, upper)}"
+                    )
+                )
+            else:
+                await self.session.execute(
+                    text(f"CREATE TABLE {_quote(name)} (LIKE {_quote(parent)} INCLUDING DEFAULTS)")
+                )
+                moved = await self._attach(parent, name, lower, upper, default)
+
+            await self.session.commit()
+            logger.info("Partition created | parent=%s | partition=%s | moved_rows=%s",
+                        parent, name, moved
+            )
+            return moved
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to create partition | parent=%s | partition=%s | error=%s",
+                         parent, name, e
+            )
+            raise DatabaseError("Failed to create partition") from e
+
+    async def move_partition(
+        self,
+        parent: str,
+        partition: Partition,
+        archive_parent: str,
+        archive_default: str | None,
+    ) -> str:
+        """
+        Отключает секцию от parent и подключает её к archive_parent (таблица
+        с тем же ключом секционирования в архивной схеме) без копирования
+        данных. Возвращает новое квалифицированное имя секции.
+        """
+        schema = archive_parent.split(".")[0]
+        name = f"{schema}.{partition.name.split('.')[-1]}"
+        try:
+            await self.session.execute(
+                text(f"ALTER TABLE {_quote(parent)} DETACH PARTITION {_quote(partition.name)}")
+            )
+            # Отключённая секция сохраняет внешние ключи родителя: каскадное
+            # удаление привычки задело бы и архивные отметки
+            foreign_keys = await self.session.execute(
+                text(
+                    "SELECT conname FROM pg_constraint "
+                    "WHERE conrelid = CAST(:name AS regclass) AND contype = 'f'"
+                ),
+                {"name": partition.name},
+            )
+            for constraint in foreign_keys.scalars().all():
+                await self.session.execute(
+                    text(f'ALTER TABLE {_quote(partition.name)} DROP CONSTRAINT "{constraint}"')
+                )
+            await self.session.execute(
+                text(f'ALTER TABLE {_quote(partition.name)} SET SCHEMA "{schema}"')
+            )
+            moved = await self._attach(
+                archive_parent, name, partition.lower, partition.upper, archive_default
+            )
+            await self.session.commit()
+            logger.info("Partition archived | parent=%s | partition=%s | archive=%s | moved_rows=%s",
+                        parent, partition.name, archive_parent, moved
+            )
+            return name
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to archive partition | parent=%s | partition=%s | error=%s",
+                         parent, partition.name, e
+            )
+            raise DatabaseError("Failed to archive partition") from e
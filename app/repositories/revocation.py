@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logger import get_logger
+from app.core.exceptions import DatabaseError
+from app.models.revocation import RevokedToken, TokenWatermark
+
+logger = get_logger(__name__)
+
+
+class RevocationChanges(NamedTuple):
+    jtis: list[str]
+    watermarks: list[tuple[UUID, datetime]]
+    # Время БД на момент чтения — отсюда начинается следующая выборка
+    as_of: datetime
+
+
+class RevocationRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def revoke(self, jti: str, user_id: UUID, expires_at: datetime) -> None:
+        try:
+            await self.session.execute(
+                insert(RevokedToken)
+                .values(jti=jti, user_id=user_id, expires_at=expires_at)
+                .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+            )
+            await self.session.commit()
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to revoke token | user_id=%s | jti=%s | error=%s",
+                         user_id, jti, e
+            )
+            raise DatabaseError("Failed to revoke token") from e
+
+    async def is_revoked(self, jti: str) -> bool:
+        try:
+            result = await self.session.execute(
+                select(RevokedToken.jti).where(RevokedToken.jti == jti)
+            )
+            return result.scalar_one_or_none() is not None
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to check token revocation | jti=%s | error=%s", jti, e)
+            raise DatabaseError("Failed to check token revocation") from e
+
+    async def set_watermark(self, user_id: UUID, not_before: datetime) -> None:
+        try:
+            stmt = insert(TokenWatermark).values(user_id=user_id, not_before=not_before)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[TokenWatermark.user_id],
+                set_={
+                    "not_before": func.greatest(
+                        TokenWatermark.not_before, stmt.excluded.not_before
+                    ),
+                    "updated_at": func.now(),
+                },
+            )
+            await self.session.execute(stmt)
+            await self.session.commit()
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to set token watermark | user_id=%s | error=%s", user_id, e)
+            raise DatabaseError("Failed to revoke tokens") from e
+
+    async def get_changes(
+        self, since: datetime | None, horizon: datetime
+    ) -> RevocationChanges:
+        """
+        Действующие отзывы jti и водяные знаки, изменённые начиная с since
+        (все — если since не задан). Водяные знаки старше horizon уже ничего
+        не отсекают: выданные до них токены истекли.
+        """
+        try:
+            as_of = (await self.session.execute(select(func.now()))).scalar_one()
+
+            revoked = select(RevokedToken.jti).where(RevokedToken.expires_at > func.now())
+            watermarks = select(TokenWatermark.user_id, TokenWatermark.not_before).where(
+                TokenWatermark.not_before > horizon
+            )
+            if since is not None:
+                revoked = revoked.where(RevokedToken.revoked_at >= since)
+                watermarks = watermarks.where(TokenWatermark.updated_at >= since)
+
+            jtis = (await self.session.execute(revoked)).scalars().all()
+            marks = (await self.session.execute(watermarks)).tuples().all()
+            return RevocationChanges(list(jtis), list(marks), as_of)
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to load token revocations | since=%s | error=%s", since, e)
+            raise DatabaseError("Failed to load token revocations") from e
+
+    async def purge_expired(self) -> int:
+        try:
+            result = await self.session.execute(
+                delete(RevokedToken).where(RevokedToken.expires_at <= func.now())
+            )
+            await self.session.commit()
+            return result.rowcount
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to purge revoked tokens | error=%s", e)
+            raise DatabaseError("Failed to purge revoked tokens") from e
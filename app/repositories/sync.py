@@ -0,0 +1,185 @@
+from datetime import datetime
+from typing import Any, NamedTuple
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, DateTime, column, func, select, table, true, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logger import get_logger
+from app.core.exceptions import DatabaseError
+from app.models.archive import ArchivedHabit
+from app.models.habit import Habit, HabitTracking, HabitTrackingTombstone
+
+logger = get_logger(__name__)
+
+
+class SyncCursor(NamedTuple):
+    """Позиция в ленте изменений: (время изменения, вид записи, id)."""
+
+    changed_at: datetime
+    kind: int
+    id: int
+
+
+class SyncChange(NamedTuple):
+    changed_at: datetime
+    kind: int
+    id: int
+    entity: Any
+
+    @property
+    def cursor(self) -> SyncCursor:
+        return SyncCursor(self.changed_at, self.kind, self.id)
+
+
+KIND_HABIT = 0
+KIND_TRACKING = 1
+KIND_TOMBSTONE = 2
+# Привычка перенесена в архив вместе с отметками и их tombstones
+KIND_ARCHIVED = 3
+
+
+def _after(
+    changed_at: ColumnElement, id_: ColumnElement, kind: int, cursor: SyncCursor | None
+) -> ColumnElement[bool]:
+    """Keyset-условие (changed_at, kind, id) > cursor для потока одного вида."""
+    if cursor is None:
+        return true()
+    if kind > cursor.kind:
+        return changed_at >= cursor.changed_at
+    if kind < cursor.kind:
+        return changed_at > cursor.changed_at
+    return tuple_(changed_at, id_) > tuple_(cursor.changed_at, cursor.id)
+
+
+# Открытые транзакции других клиентских соединений к этой базе
+_activity = table(
+    "pg_stat_activity",
+    column("pid"),
+    column("datname"),
+    column("backend_type"),
+    column("xact_start"),
+)
+
+
+class SyncRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_horizon(self) -> datetime:
+        """
+        Время, раньше которого новых изменений в ленте уже не появится.
+        Метки изменений — now() в Postgres, то есть начало пишущей транзакции,
+        а видны строки только после коммита. Поэтому горизонт — часы базы,
+        но не позже начала самой старой открытой транзакции: строки, которые
+        она ещё закоммитит, не окажутся за курсором клиента. Транзакции
+        других ролей видны только с правом pg_read_all_stats;
+        pg_stat_activity читается снимком, один раз за транзакцию.
+        """
+        oldest = (
+            select(func.min(_activity.c.xact_start))
+            .where(
+                _activity.c.pid != func.pg_backend_pid(),
+                _activity.c.datname == func.current_database(),
+                _activity.c.backend_type == "client backend",
+            )
+            .scalar_subquery()
+        )
+        try:
+            # least() пропускает NULL: без открытых транзакций — текущее время
+            result = await self.session.execute(
+                select(func.least(func.clock_timestamp(), oldest, type_=DateTime(timezone=True)))
+            )
+            return result.scalar_one()
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to fetch sync horizon | error=%s", e)
+            raise DatabaseError("Failed to fetch changes") from e
+
+    async def get_changes(
+        self,
+        user_id: UUID,
+        cursor: SyncCursor | None,
+        until: datetime,
+        limit: int,
+    ) -> list[SyncChange]:
+        """
+        Изменения пользователя после cursor и не позже until, упорядоченные
+        по (changed_at, kind, id). Каждый поток читается по своему индексу
+        с LIMIT, затем потоки сливаются. Записи — строки колонок, а не
+        ORM-объекты: страница сразу сериализуется в ответ.
+        """
+        try:
+            habits = await self.session.execute(
+                select(*Habit.__table__.c)
+                .where(
+                    Habit.user_id == user_id,
+                    Habit.updated_at <= until,
+                    _after(Habit.updated_at, Habit.id, KIND_HABIT, cursor),
+                )
+                .order_by(Habit.updated_at, Habit.id)
+                .limit(limit)
+            )
+            trackings = await self.session.execute(
+                select(*HabitTracking.__table__.c)
+                .where(
+                    HabitTracking.habit_id.in_(
+                        select(Habit.id).where(Habit.user_id == user_id)
+                    ),
+                    HabitTracking.updated_at <= until,
+                    _after(HabitTracking.updated_at, HabitTracking.id, KIND_TRACKING, cursor),
+                )
+                .order_by(HabitTracking.updated_at, HabitTracking.id)
+                .limit(limit)
+            )
+            tombstones = await self.session.execute(
+                select(*HabitTrackingTombstone.__table__.c)
+                .where(
+                    HabitTrackingTombstone.user_id == user_id,
+                    HabitTrackingTombstone.deleted_at <= until,
+                    _after(
+                        HabitTrackingTombstone.deleted_at,
+                        HabitTrackingTombstone.id,
+                        KIND_TOMBSTONE,
+                        cursor,
+                    ),
+                )
+                .order_by(HabitTrackingTombstone.deleted_at, HabitTrackingTombstone.id)
+                .limit(limit)
+            )
+            archived = await self.session.execute(
+                select(ArchivedHabit.id, ArchivedHabit.archived_at)
+                .where(
+                    ArchivedHabit.user_id == user_id,
+                    ArchivedHabit.archived_at <= until,
+                    _after(ArchivedHabit.archived_at, ArchivedHabit.id, KIND_ARCHIVED, cursor),
+                )
+                .order_by(ArchivedHabit.archived_at, ArchivedHabit.id)
+                .limit(limit)
+            )
+
+            changes = [
+                SyncChange(h.updated_at, KIND_HABIT, h.id, h)
+                for h in habits
+            ]
+            changes += [
+                SyncChange(t.updated_at, KIND_TRACKING, t.id, t)
+                for t in trackings
+            ]
+            changes += [
+                SyncChange(t.deleted_at, KIND_TOMBSTONE, t.id, t)
+                for t in tombstones
+            ]
+            changes += [
+                SyncChange(a.archived_at, KIND_ARCHIVED, a.id, a)
+                for a in archived
+            ]
+            changes.sort(key=lambda change: change.cursor)
+            return changes[:limit]
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to fetch sync changes | user_id=%s | cursor=%s | error=%s",
+                         user_id, cursor, e
+            )
+            raise DatabaseError("Failed to fetch changes") from e
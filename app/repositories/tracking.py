@@ -0,0 +1,340 @@
+from datetime import date, timedelta
+from uuid import UUID
+
+from sqlalchemy import Date, Integer, Row, Select, case, cast, delete, distinct, func, literal, select, true, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logger import get_logger
+from app.core.exceptions import DatabaseError, NotFoundError
+from app.models.archive import ArchivedHabit, ArchivedHabitTracking
+from app.models.habit import Habit, HabitStatus, HabitTracking, HabitTrackingTombstone
+from app.models.user import User
+
+logger = get_logger(__name__)
+
+
+# Окно, в котором серия ищется сначала: затрагивает две-три помесячные секции
+STREAK_WINDOW_DAYS = 60
+
+
+def _streak_select(day: date, *criteria) -> Select:
+    """
+    Длина серии подряд идущих дней с выполнением, заканчивающейся day или day - 1.
+
+    Острова дат: у серии date + dense_rank (по убыванию даты) постоянен.
+    Серия, включающая day, имеет grp = day + 1, закончившаяся вчера — grp = day.
+    Вчерашняя серия засчитывается, только пока за day нет отметок: невыполнение
+    или пропуск за day обрывает её, как и advance в потоке вех.
+    """
+    ranked = (
+        select(
+            HabitTracking.date,
+            (
+                HabitTracking.date
+                + cast(
+                    func.dense_rank().over(order_by=HabitTracking.date.desc()),
+                    Integer,
+                )
+            ).label("grp")
+        )
+        .where(
+            HabitTracking.status == HabitStatus.COMPLETED,
+            HabitTracking.date <= day,
+            *criteria,
+        )
+        .correlate_except(HabitTracking)
+        .subquery("ranked")
+    )
+
+    # distinct: у пользователя за один день может быть несколько отметок
+    days_in_run = func.count(distinct(ranked.c.date))
+    run_through_today = days_in_run.filter(ranked.c.grp == day + timedelta(days=1))
+    run_through_yesterday = days_in_run.filter(ranked.c.grp == day)
+    marked_today = (
+        select(HabitTracking.id)
+        .where(HabitTracking.date == day, *criteria)
+        .correlate_except(HabitTracking)
+        .exists()
+    )
+
+    return select(
+        func.coalesce(
+            func.nullif(run_through_today, 0),
+            case((marked_today, 0), else_=run_through_yesterday),
+        ).label("current_streak")
+    )
+
+
+def current_streak_select(day: date, *criteria) -> Select:
+    """
+    Текущая серия с отсечением секций: сначала считается по последним
+    STREAK_WINDOW_DAYS дням. Серия короче окна в него целиком помещается;
+    только если она дотянулась до начала окна, CASE вычисляет подзапрос
+    по всей истории.
+    """
+    window_start = day - timedelta(days=STREAK_WINDOW_DAYS)
+    recent = _streak_select(day, HabitTracking.date >= window_start, *criteria).subquery(
+        "recent_streak"
+    )
+    full = _streak_select(day, *criteria).scalar_subquery()
+
+    return select(
+        case(
+            (recent.c.current_streak < STREAK_WINDOW_DAYS, recent.c.current_streak),
+            else_=full,
+        ).label("current_streak")
+    ).select_from(recent)
+
+
+class HabitTrackingRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.model = HabitTracking
+
+    async def get_history(
+        self,
+        user_id: UUID,
+        habit_id: int,
+        date_from: date,
+        date_to: date,
+        include_archive: bool,
+    ) -> list[Row]:
+        """
+        Отметки привычки за период. С include_archive в выборку добавляются
+        архивная таблица отметок (секции по сроку хранения и отметки
+        архивированных привычек) и сами архивированные привычки.
+        """
+        sources = [(Habit, HabitTracking)]
+        if include_archive:
+            sources.append((ArchivedHabit, ArchivedHabitTracking))
+
+        try:
+            owned = await self.session.execute(
+                union_all(
+                    *(
+                        select(habit.id).where(habit.id == habit_id, habit.user_id == user_id)
+                        for habit, _ in sources
+                    )
+                )
+            )
+            if owned.first() is None:
+                raise NotFoundError("Habit")
+
+            history = union_all(
+                *(
+                    select(
+                        tracking.id,
+                        tracking.habit_id,
+                        tracking.date,
+                        tracking.status,
+                        tracking.notes,
+                        tracking.created_at,
+                    ).where(
+                        tracking.habit_id == habit_id,
+                        tracking.date >= date_from,
+                        tracking.date <= date_to,
+                    )
+                    for _, tracking in sources
+                )
+            ).subquery("history")
+
+            result = await self.session.execute(select(history).order_by(history.c.date))
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to fetch tracking history | user_id=%s | habit_id=%s | error=%s",
+                         user_id, habit_id, e
+            )
+            raise DatabaseError("Failed to fetch tracking history") from e
+
+    async def get_heatmap(
+        self,
+        user_id: UUID,
+        date_from: date,
+        date_to: date,
+        habit_id: int | None,
+        include_archive: bool,
+    ) -> list[Row]:
+        """
+        Активные привычки по возрастанию id, по строке на привычку: массивы
+        смещений от date_from для дней с выполнением, невыполнением и
+        пропуском (NULL — таких дней нет). Читаются только колонки индекса
+        (habit_id, date) INCLUDE status — index-only scan, без id, заметок
+        и времени создания.
+        """
+        trackings = [HabitTracking]
+        if include_archive:
+            trackings.append(ArchivedHabitTracking)
+
+        try:
+            marks = union_all(
+                *(
+                    select(tracking.date, tracking.status)
+                    .where(
+                        tracking.habit_id == Habit.id,
+                        tracking.date.between(date_from, date_to),
+                    )
+                    .correlate(Habit)
+                    for tracking in trackings
+                )
+            ).subquery("marks")
+
+            # LATERAL: отметки ищутся по индексу для каждой привычки, а не
+            # соединяются хешем со всеми отметками периода
+            days = (
+                select(
+                    *(
+                        func.array_agg(marks.c.date - date_from)
+                        .filter(marks.c.status == status)
+                        .label(status.name.lower())
+                        for status in HabitStatus
+                    )
+                )
+                .lateral("days")
+            )
+
+            query = (
+                select(Habit.id, days)
+                .join(days, true())
+                .where(Habit.user_id == user_id, Habit.is_active.is_(True))
+                .order_by(Habit.id)
+            )
+            if habit_id is not None:
+                query = query.where(Habit.id == habit_id)
+
+            result = await self.session.execute(query)
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to fetch heatmap | user_id=%s | habit_id=%s | error=%s",
+                         user_id, habit_id, e
+            )
+            raise DatabaseError("Failed to fetch heatmap") from e
+
+    async def upsert_many(
+        self, user_id: UUID, rows: list[dict], day: date
+    ) -> tuple[list[HabitTracking], int]:
+        """
+        Один многострочный INSERT ... ON CONFLICT (habit_id, date) DO UPDATE
+        и пересчёт users.streak_days в одной транзакции.
+        Принадлежность habit_id пользователю проверяется заранее.
+        """
+        try:
+            stmt = insert(self.model).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[self.model.habit_id, self.model.date],
+                set_={
+                    "status": stmt.excluded.status,
+                    "notes": stmt.excluded.notes,
+                    "updated_at": func.now(),
+                },
+            ).returning(self.model)
+
+            result = await self.session.execute(
+                stmt, execution_options={"populate_existing": True}
+            )
+            trackings = list(result.scalars().all())
+
+            streak = await self._refresh_user_streak(user_id, day)
+            await self.session.commit()
+
+            logger.info("Trackings upserted | user_id=%s | count=%s | streak_days=%s",
+                        user_id, len(trackings), streak
+            )
+            return trackings, streak
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to upsert trackings | user_id=%s | count=%s | error=%s",
+                         user_id, len(rows), e
+            )
+            raise DatabaseError("Failed to save trackings") from e
+
+    async def delete(self, user_id: UUID, habit_id: int, day: date, today: date) -> int:
+        """
+        Удаляет отметку и оставляет tombstone для синхронизации клиентов.
+        Возвращает пересчитанную серию пользователя.
+        """
+        try:
+            result = await self.session.execute(
+                delete(self.model)
+                .where(self.model.habit_id == habit_id, self.model.date == day)
+                .returning(self.model.id)
+            )
+            if result.scalar_one_or_none() is None:
+                raise NotFoundError("Tracking")
+
+            await self.session.execute(
+                insert(HabitTrackingTombstone).values(
+                    user_id=user_id, habit_id=habit_id, date=day
+                )
+            )
+            streak = await self._refresh_user_streak(user_id, today)
+            await self.session.commit()
+
+            logger.info("Tracking deleted | user_id=%s | habit_id=%s | date=%s",
+                        user_id, habit_id, day
+            )
+            return streak
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to delete tracking | user_id=%s | habit_id=%s | date=%s | error=%s",
+                         user_id, habit_id, day, e
+            )
+            raise DatabaseError("Failed to delete tracking") from e
+
+    async def get_completion_rate(self, user_id: UUID, month_start: date, day: date) -> float:
+        """
+        Процент выполненных дней месяца по активным привычкам: выполнения
+        с month_start по day против числа дней, прошедших с начала месяца
+        или с создания привычки, если она моложе.
+        """
+        try:
+            # Отметки задним числом до создания привычки в процент не входят
+            first_day = func.greatest(literal(month_start, Date), cast(Habit.created_at, Date))
+            done = (
+                select(func.count())
+                .where(
+                    HabitTracking.habit_id == Habit.id,
+                    HabitTracking.date.between(first_day, day),
+                    HabitTracking.status == HabitStatus.COMPLETED,
+                )
+                .scalar_subquery()
+            )
+            result = await self.session.execute(
+                select(
+                    func.coalesce(func.sum(done), 0),
+                    func.coalesce(func.sum(literal(day, Date) - first_day + 1), 0),
+                ).where(
+                    Habit.user_id == user_id,
+                    Habit.is_active.is_(True),
+                    cast(Habit.created_at, Date) <= day,
+                )
+            )
+            completed, possible = result.one()
+            return round(100 * completed / possible, 2) if possible else 0.0
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to compute completion rate | user_id=%s | day=%s | error=%s",
+                         user_id, day, e
+            )
+            raise DatabaseError("Failed to compute completion rate") from e
+
+    async def _refresh_user_streak(self, user_id: UUID, day: date) -> int:
+        user_habits = select(Habit.id).where(
+            Habit.user_id == user_id, Habit.is_active.is_(True)
+        )
+        streak = current_streak_select(
+            day, HabitTracking.habit_id.in_(user_habits)
+        ).scalar_subquery()
+
+        result = await self.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(streak_days=streak)
+            .returning(User.streak_days)
+        )
+        return result.scalar_one()
@@ -1,15 +1,29 @@
 from uuid import UUID
 
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logger import get_logger
-from app.core.exceptions import NotFoundError, DatabaseError
+from app.core.exceptions import ConflictError, NotFoundError, DatabaseError
 from app.models.user import User
 
 logger = get_logger(__name__)
 
+# Уникальные индексы users -> ошибка, которую увидит клиент
+UNIQUE_VIOLATIONS = {
+    "ix_users_email": "Email already registered",
+    "ix_users_username": "Username already taken",
+}
+
+
+def _violated_constraint(error: IntegrityError) -> str | None:
+    # asyncpg кладёт имя индекса в constraint_name исходного исключения
+    name = getattr(error.orig.__cause__, "constraint_name", None)
+    if name is not None:
+        return name
+    return next((index for index in UNIQUE_VIOLATIONS if index in str(error.orig)), None)
+
 
 class UserRepository:
     def __init__(self, session: AsyncSession):
@@ -49,16 +63,43 @@ class UserRepository:
             logger.error("Failed to get user by username | username=%s | error=%s", username, e)
             raise DatabaseError("Failed to get user by username") from e
         
+    async def find_taken_identity(self, email: str, username: str) -> tuple[bool, bool]:
+        """Одним запросом: заняты ли email и username."""
+        try:
+            query = select(
+                func.coalesce(func.bool_or(self.model.email == email), False),
+                func.coalesce(func.bool_or(self.model.username == username), False),
+            ).where(or_(self.model.email == email, self.model.username == username))
+            result = await self.session.execute(query)
+            email_taken, username_taken = result.one()
+            return email_taken, username_taken
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to check user identity | email=%s | username=%s | error=%s",
+                         email, username, e
+            )
+            raise DatabaseError("Failed to check user identity") from e
+
     async def create(self, data: dict) -> User:
         try:
             user = self.model(**data)
             self.session.add(user)
+            # id и created_at возвращаются из INSERT ... RETURNING, refresh не нужен
             await self.session.commit()
-            await self.session.refresh(user)
 
             logger.info("User created | user_id=%s", user.id)
             return user
-        
+
+        except IntegrityError as e:
+            await self.session.rollback()
+            constraint = _violated_constraint(e)
+            if constraint in UNIQUE_VIOLATIONS:
+                # Параллельная регистрация успела занять email или username
+                raise ConflictError(UNIQUE_VIOLATIONS[constraint]) from e
+
+            logger.error("Failed to create user | error=%s", e)
+            raise DatabaseError("Failed to create user") from e
+
         except SQLAlchemyError as e:
             await self.session.rollback()
             logger.error("Failed to create user | error=%s", e)
@@ -72,7 +113,6 @@ class UserRepository:
                 setattr(user, key, value)
 
             await self.session.commit()
-            await self.session.refresh(user)
 
             logger.info("User updated | user_id=%s", id)
             return user
@@ -82,11 +122,37 @@ class UserRepository:
             logger.error("Failed to update user | user_id=%s | error=%s", id, e)
             raise DatabaseError("Failed to update user") from e
 
-    async def delete(self, id: UUID) -> bool:
-        user = await self.get(id)
+    async def replace_password_hash(self, id: UUID, old_hash: str, new_hash: str) -> bool:
+        """
+        Меняет хеш, только если пароль не успели сменить с момента чтения old_hash.
+        """
+        try:
+            result = await self.session.execute(
+                update(self.model)
+                .where(self.model.id == id, self.model.hashed_password == old_hash)
+                .values(hashed_password=new_hash)
+            )
+            await self.session.commit()
+            return result.rowcount > 0
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("Failed to replace password hash | user_id=%s | error=%s", id, e)
+            raise DatabaseError("Failed to replace password hash") from e
 
+    async def delete(self, id: UUID) -> bool:
+        """
+        Удаляет пользователя одним DELETE без загрузки связанных объектов:
+        привычки и отметки удаляет ON DELETE CASCADE в БД. Для аккаунтов с
+        длинной историей — UserDeletionRepository, который чистит пакетами.
+        """
         try:
-            await self.session.delete(user)
+            result = await self.session.execute(
+                delete(self.model).where(self.model.id == id)
+            )
+            if result.rowcount == 0:
+                await self.session.rollback()
+                raise NotFoundError("User")
             await self.session.commit()
 
             logger.info("User deleted | user_id=%s", id)
@@ -106,3 +172,17 @@ class UserRepository:
         except SQLAlchemyError as e:
             logger.error("Failed to check user existence | user_id=%s | error=%s", id, e)
             raise DatabaseError("Failed to check user existence") from e
+
+    async def get_usernames(self, ids: set[UUID]) -> dict[UUID, str]:
+        """Имена пользователей по id — для публичных списков без загрузки сущностей."""
+        if not ids:
+            return {}
+        try:
+            result = await self.session.execute(
+                select(self.model.id, self.model.username).where(self.model.id.in_(ids))
+            )
+            return {row.id: row.username for row in result}
+
+        except SQLAlchemyError as e:
+            logger.error("Failed to get usernames | count=%s | error=%s", len(ids), e)
+            raise DatabaseError("Failed to get usernames") from e
@@ -0,0 +1,125 @@
+from datetime import date
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+
+class HabitPairInsight(BaseModel):
+    """Пара привычек, которые обычно выполняются в одни и те же дни."""
+
+    habit_id: Annotated[int, Field(..., description="ID первой привычки", examples=[42])]
+
+    habit_title: Annotated[
+        str, Field(..., description="Название первой привычки", examples=["Утренняя пробежка"])
+    ]
+
+    other_habit_id: Annotated[int, Field(..., description="ID второй привычки", examples=[43])]
+
+    other_habit_title: Annotated[
+        str, Field(..., description="Название второй привычки", examples=["Медитация"])
+    ]
+
+    correlation: Annotated[
+        float,
+        Field(
+            ...,
+            ge=-1,
+            le=1,
+            description="Корреляция выполнений по общим дням (коэффициент фи)",
+            examples=[0.62],
+        )
+    ]
+
+    together_rate: Annotated[
+        float,
+        Field(
+            ...,
+            ge=0,
+            le=1,
+            description="Доля дней, когда выполнены обе, среди дней, когда выполнена хотя бы одна",
+            examples=[0.71],
+        )
+    ]
+
+    days: Annotated[
+        int, Field(..., ge=0, description="Общих учтённых дней у пары", examples=[120])
+    ]
+
+
+class HabitPatternInsight(BaseModel):
+    """Закономерности одной привычки за окно анализа."""
+
+    habit_id: Annotated[int, Field(..., description="ID привычки", examples=[42])]
+
+    title: Annotated[
+        str, Field(..., description="Название привычки", examples=["Утренняя пробежка"])
+    ]
+
+    completion_rate: Annotated[
+        float | None,
+        Field(None, ge=0, le=1, description="Доля выполненных учтённых дней", examples=[0.8])
+    ]
+
+    weekday_rates: Annotated[
+        list[float | None],
+        Field(
+            ...,
+            min_length=7,
+            max_length=7,
+            description="Доля выполнения по дням недели, с понедельника; null — мало данных",
+        )
+    ]
+
+    best_weekday: Annotated[
+        int | None,
+        Field(None, ge=0, le=6, description="Лучший день недели (0 — понедельник)")
+    ]
+
+    worst_weekday: Annotated[
+        int | None,
+        Field(None, ge=0, le=6, description="Худший день недели (0 — понедельник)")
+    ]
+
+    monthly_rates: Annotated[
+        list[float | None],
+        Field(
+            default_factory=list,
+            description="Сезонность: доля выполнения по месяцам из months; null — мало данных",
+        )
+    ]
+
+    trend_per_week: Annotated[
+        float | None,
+        Field(
+            None,
+            description="Наклон тренда: изменение доли выполнения за неделю; null — мало недель",
+            examples=[0.012],
+        )
+    ]
+
+
+class HabitInsightsResponse(BaseModel):
+    """Аналитика пользователя за окно дней, заканчивающееся вчера."""
+
+    date_from: Annotated[date, Field(..., description="Первый день окна", examples=["2026-04-21"])]
+
+    date_to: Annotated[date, Field(..., description="Последний день окна", examples=["2026-10-18"])]
+
+    months: Annotated[
+        list[date],
+        Field(
+            default_factory=list,
+            description="Первые числа месяцев окна — подписи к monthly_rates",
+            examples=[["2026-09-01", "2026-10-01"]],
+        )
+    ]
+
+    pairs: Annotated[
+        list[HabitPairInsight],
+        Field(default_factory=list, description="Привычки, которые выполняются вместе")
+    ]
+
+    habits: Annotated[
+        list[HabitPatternInsight],
+        Field(default_factory=list, description="Закономерности по каждой привычке")
+    ]
@@ -1,3 +1,4 @@
+from enum import Enum
 from uuid import UUID
 from datetime import date, datetime, time
 from typing import Annotated
@@ -408,4 +409,226 @@ class HabitTrackingResponse(HabitTrackingBase):
                 }
             ]
         },
-    )
\ No newline at end of file
+    )
+
+class HabitTrackingBatchCreate(BaseModel):
+    """Пакетная отметка нескольких привычек одним запросом."""
+
+    items: Annotated[
+        list[HabitTrackingCreate],
+        Field(
+            ...,
+            min_length=1,
+            max_length=100,
+            description="Отметки; пара (habit_id, date) не должна повторяться",
+        )
+    ]
+
+    @field_validator("items")
+    @classmethod
+    def validate_unique_items(
+        cls, v: list[HabitTrackingCreate]
+    ) -> list[HabitTrackingCreate]:
+        """
+        Пара (habit_id, date) встречается в пакете не больше одного раза:
+        ON CONFLICT не обновляет одну строку дважды за запрос, а молча
+        выбрать одну из отметок значит сообщить об успехе другой.
+        """
+        seen = set()
+        for item in v:
+            key = (item.habit_id, item.date)
+            if key in seen:
+                raise ValueError(
+                    f"Duplicate check-in for habit {item.habit_id} on {item.date}"
+                )
+            seen.add(key)
+        return v
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "items": [
+                        {"habit_id": 42, "date": "2026-06-09", "status": "+"},
+                        {"habit_id": 43, "date": "2026-06-09", "status": "skip",
+                         "notes": "Выходной"},
+                    ]
+                }
+            ]
+        }
+    }
+
+
+class HabitTrackingBatchItemResult(BaseModel):
+    """Результат обработки одного элемента пакета."""
+
+    habit_id: Annotated[
+        int,
+        Field(..., description="ID привычки из запроса", examples=[42])
+    ]
+
+    date: Annotated[
+        date,
+        Field(..., description="Дата из запроса", examples=["2026-06-09"])
+    ]
+
+    success: Annotated[
+        bool,
+        Field(..., description="Сохранена ли отметка", examples=[True])
+    ]
+
+    error: Annotated[
+        str | None,
+        Field(None, description="Причина отказа", examples=["Habit not found"])
+    ]
+
+    tracking: Annotated[
+        HabitTrackingResponse | None,
+        Field(None, description="Сохранённая запись трекинга")
+    ]
+
+
+class HabitTrackingBatchResponse(BaseModel):
+    """Результаты пакетной отметки в порядке элементов запроса."""
+
+    results: Annotated[
+        list[HabitTrackingBatchItemResult],
+        Field(..., description="Результат по каждому элементу запроса")
+    ]
+
+    streak_days: Annotated[
+        int,
+        Field(
+            ...,
+            ge=0,
+            description="Серия пользователя после применения пакета",
+            examples=[7],
+        )
+    ]
+
+class DashboardDay(BaseModel):
+    """Отметка привычки за один день на главном экране."""
+
+    date: Annotated[
+        date,
+        Field(
+            ...,
+            description="Дата (формат: ГГГГ-ММ-ДД)",
+            examples=["2026-06-09"],
+        )
+    ]
+
+    status: Annotated[
+        HabitStatus | None,
+        Field(
+            None,
+            description="Статус выполнения или null, если отметки нет",
+            examples=["+", None],
+        )
+    ]
+
+
+class HabitDashboardResponse(HabitResponse):
+    """Привычка со статусом за сегодня, последними днями и текущей серией."""
+
+    today_status: Annotated[
+        HabitStatus | None,
+        Field(
+            None,
+            description="Статус выполнения за сегодня (null — ещё не отмечена)",
+            examples=["+", None],
+        )
+    ]
+
+    last_days: Annotated[
+        list[DashboardDay],
+        Field(
+            default_factory=list,
+            description="Отметки за последние 7 дней, от старых к новым",
+        )
+    ]
+
+    current_streak: Annotated[
+        int,
+        Field(
+            0,
+            ge=0,
+            description="Количество дней подряд с выполнением (серия, заканчивающаяся сегодня или вчера)",
+            examples=[5, 21],
+        )
+    ]
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "examples": [
+                {
+                    "id": 42,
+                    "user_id": "550e8400-e29b-41d4-a716-446655440000",
+                    "title": "Утренняя пробежка",
+                    "description": "Бегать в парке 5 км каждое утро",
+                    "color": "#3B82F6",
+                    "goal_streak": 30,
+                    "reminder_time": "07:00:00",
+                    "is_active": True,
+                    "created_at": "2026-06-09T07:00:00.123456",
+                    "today_status": "+",
+                    "last_days": [
+                        {"date": "2026-06-15", "status": "+"},
+                        {"date": "2026-06-16", "status": None},
+                    ],
+                    "current_streak": 5,
+                }
+            ]
+        },
+    )
+
+
+class HeatmapEncoding(str, Enum):
+    BITS = "bits"
+    RLE = "rle"
+
+
+class HabitHeatmap(BaseModel):
+    """
+    Статусы привычки по дням периода. Код дня: 0 — нет отметки,
+    1 — выполнено (+), 2 — не выполнено (-), 3 — пропуск (skip).
+    """
+
+    habit_id: Annotated[int, Field(..., description="ID привычки", examples=[42])]
+
+    bits: Annotated[
+        str | None,
+        Field(
+            None,
+            description=(
+                "Кодировка bits: base64 по 2 бита на день, четыре дня в байте "
+                "начиная с младших битов; день i — биты 2*(i % 4) байта i // 4"
+            ),
+            examples=["VQU="],
+        )
+    ]
+
+    runs: Annotated[
+        list[int] | None,
+        Field(
+            None,
+            description="Кодировка rle: пары [код, число дней подряд] одним плоским списком",
+            examples=[[1, 5, 0, 2, 3, 1]],
+        )
+    ]
+
+
+class HabitHeatmapResponse(BaseModel):
+    """Тепловая карта привычек за период: по строке кодов на привычку."""
+
+    date_from: Annotated[date, Field(..., description="Первый день периода (день 0)")]
+
+    date_to: Annotated[date, Field(..., description="Последний день периода")]
+
+    encoding: Annotated[HeatmapEncoding, Field(..., description="Кодировка дней")]
+
+    habits: Annotated[
+        list[HabitHeatmap],
+        Field(default_factory=list, description="Активные привычки по возрастанию id")
+    ]
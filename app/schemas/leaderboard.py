@@ -0,0 +1,67 @@
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field
+
+# streak — текущая серия, completion — процент выполнения за текущий месяц
+Board = Literal["streak", "completion"]
+
+
+class LeaderboardParticipation(BaseModel):
+    """Согласие на участие в публичных рейтингах."""
+
+    enabled: Annotated[
+        bool,
+        Field(..., description="Показывать ли пользователя в рейтингах", examples=[True])
+    ]
+
+
+class LeaderboardEntryResponse(BaseModel):
+    """Строка рейтинга."""
+
+    rank: Annotated[
+        int,
+        Field(..., ge=1, description="Место, начиная с 1", examples=[1, 42])
+    ]
+
+    username: Annotated[
+        str,
+        Field(..., description="Имя участника", examples=["john_doe"])
+    ]
+
+    score: Annotated[
+        float,
+        Field(
+            ...,
+            description="Дней в текущей серии или процент выполнения за месяц",
+            examples=[21, 87.5],
+        )
+    ]
+
+    is_me: Annotated[
+        bool,
+        Field(False, description="Строка текущего пользователя")
+    ]
+
+
+class LeaderboardResponse(BaseModel):
+    """Срез рейтинга: первые места или соседи текущего пользователя."""
+
+    board: Annotated[
+        Board,
+        Field(..., description="Рейтинг", examples=["streak"])
+    ]
+
+    total: Annotated[
+        int,
+        Field(..., ge=0, description="Всего участников рейтинга", examples=[1250])
+    ]
+
+    entries: Annotated[
+        list[LeaderboardEntryResponse],
+        Field(default_factory=list, description="Строки рейтинга по возрастанию места")
+    ]
+
+    me: Annotated[
+        LeaderboardEntryResponse | None,
+        Field(None, description="Место текущего пользователя, если он участвует")
+    ]
@@ -0,0 +1,122 @@
+from datetime import date, datetime
+from typing import Annotated
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schemas.habit import HabitResponse, HabitTrackingResponse
+
+
+class HabitSyncItem(HabitResponse):
+    """Изменённая привычка. is_active=False — tombstone мягко удалённой привычки."""
+
+    updated_at: Annotated[
+        datetime,
+        Field(
+            ...,
+            description="Время последнего изменения (ISO 8601)",
+            examples=["2026-06-09T10:30:00.123456"],
+        )
+    ]
+
+
+class HabitTrackingSyncItem(HabitTrackingResponse):
+    """Созданная или изменённая отметка."""
+
+    updated_at: Annotated[
+        datetime,
+        Field(
+            ...,
+            description="Время последнего изменения (ISO 8601)",
+            examples=["2026-06-09T10:30:00.123456"],
+        )
+    ]
+
+
+class HabitTrackingTombstoneResponse(BaseModel):
+    """Удалённая отметка: клиент должен убрать её у себя."""
+
+    habit_id: Annotated[
+        int,
+        Field(..., description="ID привычки", examples=[42])
+    ]
+
+    date: Annotated[
+        date,
+        Field(..., description="Дата удалённой отметки", examples=["2026-06-09"])
+    ]
+
+    deleted_at: Annotated[
+        datetime,
+        Field(
+            ...,
+            description="Время удаления (ISO 8601)",
+            examples=["2026-06-09T10:30:00.123456"],
+        )
+    ]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ArchivedHabitSyncItem(BaseModel):
+    """
+    Привычка, перенесённая в архив: клиент убирает её вместе с отметками.
+    Восстановленная привычка вернётся в habits с новым updated_at.
+    """
+
+    id: Annotated[
+        int,
+        Field(..., description="ID привычки", examples=[42])
+    ]
+
+    archived_at: Annotated[
+        datetime,
+        Field(
+            ...,
+            description="Время переноса в архив (ISO 8601)",
+            examples=["2026-06-09T10:30:00.123456"],
+        )
+    ]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SyncResponse(BaseModel):
+    """
+    Порция изменений после курсора клиента.
+    Клиент применяет изменения и передаёт next_cursor в следующий запрос,
+    пока has_more не станет False.
+    """
+
+    habits: Annotated[
+        list[HabitSyncItem],
+        Field(default_factory=list, description="Изменённые привычки")
+    ]
+
+    trackings: Annotated[
+        list[HabitTrackingSyncItem],
+        Field(default_factory=list, description="Созданные или изменённые отметки")
+    ]
+
+    deleted_trackings: Annotated[
+        list[HabitTrackingTombstoneResponse],
+        Field(default_factory=list, description="Удалённые отметки")
+    ]
+
+    archived_habits: Annotated[
+        list[ArchivedHabitSyncItem],
+        Field(default_factory=list, description="Привычки, перенесённые в архив")
+    ]
+
+    next_cursor: Annotated[
+        str | None,
+        Field(
+            None,
+            description="Непрозрачный курсор для следующего запроса (монотонно растёт)",
+            examples=["MjAyNi0wNi0wOVQxMDozMDowMC4xMjM0NTYrMDA6MDB8MHw0Mg"],
+        )
+    ]
+
+    has_more: Annotated[
+        bool,
+        Field(False, description="Есть ли ещё изменения после next_cursor")
+    ]
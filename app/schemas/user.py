@@ -231,6 +231,28 @@ class UserResponse(UserBase):
     )
 
 
+class UserDeletionResponse(BaseModel):
+    """Запрос на удаление аккаунта принят, данные удаляются в фоне."""
+
+    user_id: Annotated[
+        UUID,
+        Field(
+            ...,
+            description="Идентификатор удаляемого пользователя",
+            examples=["550e8400-e29b-41d4-a716-446655440000"],
+        )
+    ]
+
+    requested_at: Annotated[
+        datetime,
+        Field(
+            ...,
+            description="Когда принят запрос на удаление (ISO 8601)",
+            examples=["2026-06-09T10:30:00.123456"],
+        )
+    ]
+
+
 class TokenResponse(BaseModel):
     """Ответ с JWT токенами после успешной аутентификации."""
     
@@ -0,0 +1,300 @@
+import time
+from datetime import date, timedelta
+from itertools import chain
+from typing import NamedTuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Row
+
+from app.core.cache import CacheBackend
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.security import Principal
+from app.models.user import User
+from app.repositories.analytics import AnalyticsRepository
+from app.schemas.analytics import (
+    HabitInsightsResponse,
+    HabitPairInsight,
+    HabitPatternInsight,
+)
+
+logger = get_logger(__name__)
+
+# Пара привычек попадает в выдачу при достаточной корреляции на достаточном числе общих дней
+MIN_PAIR_DAYS = 14
+MIN_CORRELATION = 0.3
+PAIRS_PER_USER = 5
+# Меньше учтённых дней в дне недели, неделе или месяце — доля не считается
+MIN_WEEKDAY_DAYS = 3
+MIN_WEEK_DAYS = 3
+MIN_MONTH_DAYS = 7
+MIN_TREND_WEEKS = 4
+
+
+class HabitMatrix(NamedTuple):
+    """
+    Плотная матрица пользователи × привычки × дни окна. Привычки пользователя
+    занимают первые слоты строки; пустые слоты, дни до создания привычки и
+    дни с пропуском (skip) не учитываются.
+    """
+
+    user_ids: list[UUID]
+    habit_ids: np.ndarray  # (U, H), 0 — пустой слот
+    titles: dict[int, str]
+    completed: np.ndarray  # (U, H, D), bool
+    counted: np.ndarray  # (U, H, D), bool
+    date_from: date
+
+
+class InsightsBatchResult(NamedTuple):
+    users: int
+    batches: int
+    seconds: float
+
+
+def build_matrix(
+    user_ids: list[UUID], rows: list[Row], date_from: date, days: int
+) -> HabitMatrix:
+    """Раскладывает строки AnalyticsRepository.get_habit_days (по (user_id, id)) в матрицу."""
+    index = {user_id: i for i, user_id in enumerate(user_ids)}
+    count = len(rows)
+    users = np.fromiter((index[row.user_id] for row in rows), dtype=np.intp, count=count)
+    # Слот привычки — её номер среди привычек своего пользователя
+    starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]]) if count else users
+    slots = np.arange(count) - np.repeat(starts, np.diff(np.r_[starts, count]))
+    width = int(slots.max()) + 1 if count else 0
+
+    habit_ids = np.zeros((len(user_ids), width), dtype=np.int64)
+    habit_ids[users, slots] = [row.id for row in rows]
+    first_day = np.full((len(user_ids), width), days, dtype=np.intp)
+    first_day[users, slots] = [row.first_day for row in rows]
+
+    counted = np.arange(days) >= first_day[..., None]
+    completed = np.zeros_like(counted)
+    completed[_scatter(rows, "completed", users, slots)] = True
+    counted[_scatter(rows, "skipped", users, slots)] = False
+    # Отметки задним числом до создания привычки не учитываются
+    completed &= counted
+
+    return HabitMatrix(
+        user_ids,
+        habit_ids,
+        {row.id: row.title for row in rows},
+        completed,
+        counted,
+        date_from,
+    )
+
+
+def _scatter(
+    rows: list[Row], column: str, users: np.ndarray, slots: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Массивы дней всех привычек склеиваются в один, индексы привычки повторяются по длинам
+    lengths = np.fromiter(
+        (len(getattr(row, column) or ()) for row in rows), dtype=np.intp, count=len(rows)
+    )
+    days = np.fromiter(
+        chain.from_iterable(getattr(row, column) or () for row in rows),
+        dtype=np.intp,
+        count=int(lengths.sum()),
+    )
+    return np.repeat(users, lengths), np.repeat(slots, lengths), days
+
+
+def _rates(done: np.ndarray, total: np.ndarray, minimum: int) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total >= minimum, done / total, np.nan)
+
+
+def _one_hot(labels: np.ndarray) -> np.ndarray:
+    """(D,) номера корзин -> (D, K) float32: суммы по корзинам — одно матричное умножение."""
+    return np.eye(int(labels.max()) + 1, dtype=np.float32)[labels]
+
+
+def compute_insights(matrix: HabitMatrix) -> list[HabitInsightsResponse]:
+    """
+    Аналитика всех пользователей матрицы пакетными матричными операциями:
+    цикл по пользователям остаётся только при сборке ответа.
+    """
+    x = matrix.completed.astype(np.float32)
+    m = matrix.counted.astype(np.float32)
+    users, width, days = x.shape
+    day_numbers = np.arange(days)
+    dates = np.datetime64(matrix.date_from) + day_numbers
+
+    # Пары: суммы по общим учтённым дням для всех пар сразу, (U, H, H).
+    # Произведения целых до 2^24 в float32 точны, дальше — float64
+    m_t = m.transpose(0, 2, 1)
+    shared = (m @ m_t).astype(np.float64)
+    sx = (x @ m_t).astype(np.float64)
+    sy = sx.transpose(0, 2, 1)
+    sxy = (x @ x.transpose(0, 2, 1)).astype(np.float64)
+    # Для бинарных рядов сумма квадратов равна сумме, корреляция Пирсона — коэффициент фи
+    variance = (shared * sx - sx**2) * (shared * sy - sy**2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = np.clip((shared * sxy - sx * sy) / np.sqrt(variance), -1, 1)
+        together = sxy / (sx + sy - sxy)
+    eligible = (
+        np.triu(np.ones((width, width), dtype=bool), k=1)
+        & (shared >= MIN_PAIR_DAYS)
+        & (variance > 0)
+        & (correlation >= MIN_CORRELATION)
+    )
+    ranking = np.where(eligible, correlation, -np.inf).reshape(users, -1)
+    top_pairs = np.argsort(-ranking, axis=1, kind="stable")[:, :PAIRS_PER_USER]
+
+    # Дни недели, месяцы и недели — суммы по корзинам дней
+    weekday_rates = _rates(
+        *(a @ _one_hot((matrix.date_from.weekday() + day_numbers) % 7) for a in (x, m)),
+        MIN_WEEKDAY_DAYS,
+    )
+    months, month_labels = np.unique(dates.astype("datetime64[M]"), return_inverse=True)
+    monthly_rates = _rates(*(a @ _one_hot(month_labels) for a in (x, m)), MIN_MONTH_DAYS)
+    # Последняя неделя окна полная, неполной может быть только первая
+    week_labels = (day_numbers + (-days) % 7) // 7
+    weekly_rates = _rates(*(a @ _one_hot(week_labels) for a in (x, m)), MIN_WEEK_DAYS)
+
+    # Тренд — наклон МНК по неделям с данными
+    weeks = np.arange(weekly_rates.shape[-1], dtype=np.float64)
+    weight = ~np.isnan(weekly_rates)
+    rate = np.where(weight, weekly_rates, 0.0)
+    n = weight.sum(-1)
+    st, sr = (weight * weeks).sum(-1), rate.sum(-1)
+    stt, srt = (weight * weeks**2).sum(-1), (rate * weeks).sum(-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (n * srt - st * sr) / (n * stt - st**2)
+    slope = np.where(n >= MIN_TREND_WEEKS, slope, np.nan)
+
+    completion = _rates(x.sum(-1), m.sum(-1), 1)
+    has_weekdays = ~np.isnan(weekday_rates).all(-1)
+    best = np.where(np.isnan(weekday_rates), -np.inf, weekday_rates).argmax(-1)
+    worst = np.where(np.isnan(weekday_rates), np.inf, weekday_rates).argmin(-1)
+
+    # Округление и NaN -> None разом для всех массивов: в цикле сборки ответа
+    # остаются только обращения к спискам
+    habit_ids = matrix.habit_ids.tolist()
+    completion, weekday_rates, monthly_rates, slope = (
+        # + 0.0 превращает -0.0 в 0.0
+        _nullable(np.round(a, 4) + 0.0, ~np.isnan(a))
+        for a in (completion, weekday_rates, monthly_rates, slope)
+    )
+    best, worst = (_nullable(a, has_weekdays) for a in (best, worst))
+
+    date_to = matrix.date_from + timedelta(days=days - 1)
+    month_starts = months.astype(date).tolist()
+    results = []
+    for u in range(users):
+        ids = habit_ids[u]
+        pairs = []
+        for flat in top_pairs[u]:
+            if ranking[u, flat] == -np.inf:
+                break
+            i, j = divmod(int(flat), width)
+            pairs.append(
+                HabitPairInsight(
+                    habit_id=ids[i],
+                    habit_title=matrix.titles[ids[i]],
+                    other_habit_id=ids[j],
+                    other_habit_title=matrix.titles[ids[j]],
+                    correlation=round(float(correlation[u, i, j]), 4),
+                    together_rate=round(float(together[u, i, j]), 4),
+                    days=int(shared[u, i, j]),
+                )
+            )
+
+        habits = [
+            HabitPatternInsight(
+                habit_id=habit_id,
+                title=matrix.titles[habit_id],
+                completion_rate=completion[u][h],
+                weekday_rates=weekday_rates[u][h],
+                best_weekday=best[u][h],
+                worst_weekday=worst[u][h],
+                monthly_rates=monthly_rates[u][h],
+                trend_per_week=slope[u][h],
+            )
+            for h, habit_id in enumerate(ids)
+            if habit_id
+        ]
+        results.append(
+            HabitInsightsResponse(
+                date_from=matrix.date_from,
+                date_to=date_to,
+                months=month_starts,
+                pairs=pairs,
+                habits=habits,
+            )
+        )
+    return results
+
+
+def _nullable(values: np.ndarray, present: np.ndarray) -> list:
+    """Вложенные списки значений с None там, где present ложно."""
+    values = values.astype(object)
+    values[~present] = None
+    return values.tolist()
+
+
+def _cache_key(user_id: UUID, date_to: date) -> str:
+    # Окно заканчивается вчера: за день результат не меняется, новый день — новый ключ
+    return f"insights:{user_id}:{date_to.isoformat()}"
+
+
+class AnalyticsService:
+    """
+    Аналитика привычек: какие привычки выполняются вместе, закономерности по
+    дням недели и месяцам, тренд. Фоновая задача считает её пакетами
+    пользователей и кладёт в кэш; запрос без кэша считает одного пользователя.
+    """
+
+    def __init__(self, analytics_repo: AnalyticsRepository, cache: CacheBackend):
+        self.analytics_repo = analytics_repo
+        self.cache = cache
+
+    async def get_insights(
+        self, user: User | Principal, today: date | None = None
+    ) -> HabitInsightsResponse:
+        date_to = (today or date.today()) - timedelta(days=1)
+        key = _cache_key(user.id, date_to)
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return HabitInsightsResponse.model_validate_json(cached)
+
+        [insights] = await self.compute([user.id], date_to)
+        await self._store(user.id, date_to, insights)
+        return insights
+
+    async def compute(self, user_ids: list[UUID], date_to: date) -> list[HabitInsightsResponse]:
+        days = settings.analytics.WINDOW_DAYS
+        date_from = date_to - timedelta(days=days - 1)
+        rows = await self.analytics_repo.get_habit_days(user_ids, date_from, date_to)
+        return compute_insights(build_matrix(user_ids, rows, date_from, days))
+
+    async def compute_all(self, today: date, batch_users: int) -> InsightsBatchResult:
+        """Пересчитывает аналитику всех пользователей с активными привычками."""
+        date_to = today - timedelta(days=1)
+        started = time.perf_counter()
+        users = batches = 0
+        after = None
+
+        while user_ids := await self.analytics_repo.get_user_ids(after, batch_users):
+            for user_id, insights in zip(user_ids, await self.compute(user_ids, date_to)):
+                await self._store(user_id, date_to, insights)
+            users += len(user_ids)
+            batches += 1
+            after = user_ids[-1]
+
+        seconds = time.perf_counter() - started
+        logger.info("Insights computed | users=%s | batches=%s | users_per_second=%s",
+                    users, batches, round(users / seconds) if seconds else users
+        )
+        return InsightsBatchResult(users, batches, round(seconds, 2))
+
+    async def _store(self, user_id: UUID, date_to: date, insights: HabitInsightsResponse) -> None:
+        await self.cache.set(
+            _cache_key(user_id, date_to),
+            insights.model_dump_json().encode(),
+            settings.analytics.CACHE_TTL_SECONDS,
+        )
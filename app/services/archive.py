@@ -0,0 +1,79 @@
+from datetime import date, datetime
+from typing import NamedTuple
+
+from app.core.cache import CacheBackend
+from app.core.config import settings
+from app.core.events import event_hub
+from app.core.exceptions import BusinessError
+from app.core.logger import get_logger
+from app.core.security import Principal
+from app.core.singleflight import singleflight
+from app.models.user import User
+from app.repositories.archive import ArchiveRepository
+from app.repositories.habit import HabitRepository
+from app.schemas.habit import HabitResponse
+from app.services.habit import HabitService, invalidate_user_habits
+from app.services.partition import retention_cutoff
+
+logger = get_logger(__name__)
+
+
+class ArchiveResult(NamedTuple):
+    habits: int
+    trackings: int
+    batches: int
+
+
+class ArchiveService:
+    """
+    Холодный архив: привычки, деактивированные дольше срока, переезжают
+    в схему archive пакетами по отдельной транзакции на пакет, так что
+    блокировки короткие, а прерванный прогон продолжается следующим.
+    """
+
+    def __init__(
+        self, archive_repo: ArchiveRepository, habit_repo: HabitRepository, cache: CacheBackend
+    ):
+        self.archive_repo = archive_repo
+        self.habit_repo = habit_repo
+        self.cache = cache
+
+    async def archive_inactive_habits(
+        self, before: datetime, batch_size: int, max_batches: int
+    ) -> ArchiveResult:
+        habits = trackings = batches = 0
+        while batches < max_batches:
+            batch = await self.archive_repo.archive_inactive_habits(before, batch_size)
+            if batch.habits == 0:
+                break
+            habits += batch.habits
+            trackings += batch.trackings
+            batches += 1
+            # Списки с неактивными привычками (only_active=false) устарели
+            for user_id in batch.user_ids:
+                await invalidate_user_habits(self.cache, user_id)
+
+        logger.info("Inactive habits archived | habits=%s | trackings=%s | batches=%s",
+                    habits, trackings, batches
+        )
+        return ArchiveResult(habits, trackings, batches)
+
+    async def get_archived_habits(self, user: User | Principal) -> list[HabitResponse]:
+        return [
+            HabitResponse.model_validate(habit)
+            for habit in await self.archive_repo.get_habits(user.id)
+        ]
+
+    async def restore_habit(self, user: User, habit_id: int) -> HabitResponse:
+        if await self.habit_repo.count_active(user.id) >= HabitService.MAX_ACTIVE_HABITS:
+            raise BusinessError(f"Maximum {HabitService.MAX_ACTIVE_HABITS} active habits")
+
+        since = retention_cutoff(date.today(), settings.partitions.RETENTION_MONTHS)
+        async with singleflight.writing(user.id):
+            habit = HabitResponse.model_validate(
+                await self.archive_repo.restore_habit(user.id, habit_id, since)
+            )
+        await invalidate_user_habits(self.cache, user.id)
+        # Для клиентов привычка появляется заново
+        await event_hub.publish(user.id, "habit.created", habit.model_dump(mode="json"))
+        return habit
@@ -1,19 +1,29 @@
+import asyncio
+from datetime import datetime, timezone
 from uuid import UUID
 
+from fastapi import BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 from app.core.exceptions import (
     AuthenticationError, 
     BusinessError,
     ConflictError,
 )
 from app.core.logger import get_logger
+from app.core.revocation import revocation_store
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
+    Principal,
     get_password_hash,
+    password_needs_rehash,
     verify_password,
 )
+from app.core.singleflight import singleflight
 from app.models.user import User
 from app.repositories.user import UserRepository
 from app.schemas.auth import LoginRequest, TokenResponse
@@ -28,50 +38,80 @@ class AuthService:
         self.user_repo = user_repo
 
     async def register(self, user_data: UserCreate) -> TokenResponse:
-        existing = await self.user_repo.get_by_email(user_data.email)
-        if existing:
+        # Проверка до хеширования: argon2 дорог, занятый email отсекаем раньше.
+        # Гонку двух регистраций закрывают уникальные индексы в create
+        email_taken, username_taken = await self.user_repo.find_taken_identity(
+            user_data.email, user_data.username
+        )
+        if email_taken:
             raise ConflictError("Email already registered")
-
-        existing_username = await self.user_repo.get_by_username(user_data.username)
-        if existing_username:
+        if username_taken:
             raise ConflictError("Username already taken")
 
         user_dict = user_data.model_dump(exclude={"password"})
-        user_dict["hashed_password"] = get_password_hash(user_data.password)
+        # argon2 занимает CPU на десятки миллисекунд — вне event loop
+        user_dict["hashed_password"] = await asyncio.to_thread(
+            get_password_hash, user_data.password
+        )
 
         user = await self.user_repo.create(user_dict)
 
         logger.info("User registered | user_id=%s", user.id)
         return self._create_token_response(user)
 
-    async def login(self, login_data: LoginRequest) -> TokenResponse:
+    async def login(
+        self, login_data: LoginRequest, background_tasks: BackgroundTasks | None = None
+    ) -> TokenResponse:
         user = await self.user_repo.get_by_email(login_data.email)
 
-        if not user or not verify_password(login_data.password, user.hashed_password):
+        if not user or not await asyncio.to_thread(
+            verify_password, login_data.password, user.hashed_password
+        ):
             raise AuthenticationError("Invalid credentials")
 
         if not user.is_active:
             raise AuthenticationError("Account is inactive")
 
+        # Хеш со старыми параметрами argon2 обновляем после ответа клиенту:
+        # открытый пароль доступен только сейчас, а лишний hash() не должен
+        # удлинять вход
+        if background_tasks is not None and password_needs_rehash(user.hashed_password):
+            background_tasks.add_task(
+                self._rehash_password, user.id, user.hashed_password, login_data.password
+            )
+
         logger.info("User logged in | user_id=%s", user.id)
         return self._create_token_response(user)
     
     async def logout(self, refresh_token: str) -> None:
-        try:
-            payload = decode_token(refresh_token)
-            if not payload:
-                return
-        except Exception:
-            pass
+        payload = decode_token(refresh_token)
+        # Недействительный или уже истёкший токен отзывать не нужно
+        if not payload or payload.get("type") != "refresh" or "jti" not in payload:
+            return
+
+        await revocation_store.revoke(
+            payload["jti"],
+            UUID(payload["sub"]),
+            datetime.fromtimestamp(payload["exp"], timezone.utc),
+        )
+        logger.info("User logged out | user_id=%s", payload["sub"])
+
+    async def logout_all(self, user: User) -> None:
+        """Отзывает все выданные пользователю токены, включая текущий."""
+        await revocation_store.revoke_all(user.id)
+        logger.info("All sessions revoked | user_id=%s", user.id)
     
     async def refresh_tokens(self, refresh_token: str) -> TokenResponse:
         payload = decode_token(refresh_token)
-        if not payload:
+        if not payload or payload.get("type") != "refresh":
             raise AuthenticationError("Invalid refresh token")
         
         user_id = payload.get("sub")
         if not user_id:
             raise AuthenticationError("Invalid refresh token")
+
+        if await revocation_store.is_revoked(payload):
+            raise AuthenticationError("Refresh token has been revoked")
         
         user = await self.user_repo.get(UUID(user_id))
 
@@ -81,6 +121,39 @@ class AuthService:
         logger.info("Tokens refreshed | user_id=%s", user.id)
         return self._create_token_response(user)
 
+    async def authenticate(self, token: str) -> Principal:
+        """
+        Пользователь из claims короткоживущего access-токена без запроса к БД.
+        Деактивация и смена пароля отзывают токены, поэтому отдельная
+        проверка is_active не нужна.
+        """
+        if not settings.auth.STATELESS_ACCESS_TOKENS:
+            user = await self.validate_token(token)
+            return Principal(user.id, user.email, user.username)
+
+        if not token:
+            raise AuthenticationError("Token is required")
+
+        payload = decode_token(token)
+        if not payload:
+            raise AuthenticationError("Invalid or expired token")
+
+        # Долгоживущий refresh-токен не заменяет access-токен
+        if payload.get("type") != "access":
+            raise AuthenticationError("Invalid token type")
+
+        try:
+            principal = Principal(
+                UUID(payload["sub"]), payload["email"], payload["username"]
+            )
+        except (KeyError, ValueError):
+            raise AuthenticationError("Invalid token payload")
+
+        if await revocation_store.is_revoked(payload):
+            raise AuthenticationError("Token has been revoked")
+
+        return principal
+
     async def validate_token(self, token: str) -> User:
         if not token:
             raise AuthenticationError("Token is required")
@@ -89,11 +162,22 @@ class AuthService:
         if not payload:
             raise AuthenticationError("Invalid or expired token")
 
+        # Долгоживущий refresh-токен не заменяет access-токен
+        if payload.get("type") != "access":
+            raise AuthenticationError("Invalid token type")
+
         user_id = payload.get("sub")
         if not user_id:
             raise AuthenticationError("Invalid token payload")
 
-        user = await self.user_repo.get(UUID(user_id))
+        if await revocation_store.is_revoked(payload):
+            raise AuthenticationError("Token has been revoked")
+
+        user_id = UUID(user_id)
+        shared = await singleflight.do(user_id, "user", lambda: self._load_user(user_id))
+        # Общий результат отсоединён от сессий; каждый запрос получает
+        # собственную копию в своей сессии без повторного SELECT
+        user = await self.user_repo.session.merge(shared, load=False)
 
         if not user.is_active:
             raise AuthenticationError("Account is inactive")
@@ -104,13 +188,17 @@ class AuthService:
         self, user: User, current_password: str, new_password: str
     ) -> None:
         # Проверяем текущий пароль
-        if not verify_password(current_password, user.hashed_password):
+        if not await asyncio.to_thread(
+            verify_password, current_password, user.hashed_password
+        ):
             raise AuthenticationError("Current password is incorrect")
 
         # Обновляем пароль
-        await self.user_repo.update(
-            user.id, {"hashed_password": get_password_hash(new_password)}
-        )
+        new_hash = await asyncio.to_thread(get_password_hash, new_password)
+        async with singleflight.writing(user.id):
+            await self.user_repo.update(user.id, {"hashed_password": new_hash})
+        # Сессии, открытые со старым паролем, больше не действуют
+        await revocation_store.revoke_all(user.id)
 
         logger.info("Password changed | user_id=%s", user.id)
 
@@ -120,7 +208,9 @@ class AuthService:
         if not user.is_active:
             raise BusinessError("User is already inactive")
 
-        await self.user_repo.update(user_id, {"is_active": False})
+        async with singleflight.writing(user_id):
+            await self.user_repo.update(user_id, {"is_active": False})
+        await revocation_store.revoke_all(user_id)
 
         logger.info("User deactivated | user_id=%s", user_id)
 
@@ -128,11 +218,38 @@ class AuthService:
         user = await self.user_repo.get(user_id)
         if user.is_active:
             raise BusinessError("User is already active")
+        # Помеченный на удаление аккаунт дочищается в фоне, вернуть его нельзя
+        if user.deleted_at is not None:
+            raise BusinessError("User is being deleted")
 
-        await self.user_repo.update(user_id, {"is_active": True})
+        async with singleflight.writing(user_id):
+            await self.user_repo.update(user_id, {"is_active": True})
 
         logger.info("User activated | user_id=%s", user_id)
     
+    async def _load_user(self, user_id: UUID) -> User:
+        """
+        Чтение пользователя для склейки параллельных запросов — в отдельной
+        короткой сессии на том же движке, что и сессия репозитория: объект
+        не привязан к сессии запроса, который запустил чтение, и не
+        меняется вместе с ней.
+        """
+        async with AsyncSession(self.user_repo.session.bind, expire_on_commit=False) as session:
+            return await UserRepository(session).get(user_id)
+
+    @staticmethod
+    async def _rehash_password(user_id: UUID, old_hash: str, password: str) -> None:
+        new_hash = await asyncio.to_thread(get_password_hash, password)
+
+        # Сессия запроса к этому моменту уже закрыта
+        async with AsyncSessionLocal() as session, singleflight.writing(user_id):
+            replaced = await UserRepository(session).replace_password_hash(
+                user_id, old_hash, new_hash
+            )
+
+        if replaced:
+            logger.info("Password rehashed | user_id=%s", user_id)
+
     def _create_token_response(self, user: User) -> TokenResponse:
         """Создание ответа с токенами."""
         token_data = {
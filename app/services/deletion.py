@@ -0,0 +1,83 @@
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from app.core.cache import CacheBackend
+from app.core.config import settings
+from app.core.exceptions import BusinessError
+from app.core.leaderboard import LeaderboardBackend
+from app.core.logger import get_logger
+from app.core.revocation import revocation_store
+from app.core.singleflight import singleflight
+from app.models.user import User
+from app.repositories.deletion import UserDeletionRepository
+from app.schemas.user import UserDeletionResponse
+from app.services.habit import invalidate_user_habits
+from app.services.leaderboard import remove_from_leaderboards
+
+logger = get_logger(__name__)
+
+
+class PurgeResult(NamedTuple):
+    users: int
+    habits: int
+    trackings: int
+    batches: int
+
+
+class UserDeletionService:
+    """
+    Удаление аккаунта: запрос лишь помечает пользователя и отзывает его
+    токены, данные удаляет фоновая задача пакетами фиксированного размера.
+    """
+
+    def __init__(
+        self,
+        deletion_repo: UserDeletionRepository,
+        cache: CacheBackend,
+        leaderboards: LeaderboardBackend | None = None,
+    ):
+        self.deletion_repo = deletion_repo
+        self.cache = cache
+        self.leaderboards = leaderboards
+
+    async def request_deletion(self, user: User) -> UserDeletionResponse:
+        async with singleflight.writing(user.id):
+            requested_at = await self.deletion_repo.mark_deleted(user.id)
+        if requested_at is None:
+            raise BusinessError("Account deletion already requested")
+
+        await revocation_store.revoke_all(user.id)
+        await invalidate_user_habits(self.cache, user.id)
+        if self.leaderboards is not None and user.leaderboard_opt_in:
+            await remove_from_leaderboards(self.leaderboards, user.id, date.today())
+
+        logger.info("Account deletion requested | user_id=%s", user.id)
+        return UserDeletionResponse(user_id=user.id, requested_at=requested_at)
+
+    async def purge_pending(
+        self, now: datetime, batch_size: int, max_batches: int
+    ) -> PurgeResult:
+        """
+        Очищает помеченные аккаунты, пока не исчерпан бюджет пакетов.
+        Аккаунт берётся в работу, когда истекли выданные ему access-токены:
+        без строки users их больше нечем отозвать.
+        """
+        before = now - timedelta(minutes=settings.auth.ACCESS_TOKEN_EXPIRE_MINUTES)
+        users = habits = trackings = batches = 0
+
+        for user_id in await self.deletion_repo.get_pending(before, max_batches):
+            while batches < max_batches:
+                batch = await self.deletion_repo.purge_batch(user_id, batch_size)
+                habits += batch.habits
+                trackings += batch.trackings
+                batches += 1
+                if batch.finished:
+                    users += 1
+                    break
+            if batches >= max_batches:
+                break
+
+        logger.info("Deleted users purged | users=%s | habits=%s | trackings=%s | batches=%s",
+                    users, habits, trackings, batches
+        )
+        return PurgeResult(users, habits, trackings, batches)
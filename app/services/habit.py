@@ -1,46 +1,135 @@
+from datetime import date, timedelta
+from uuid import UUID, uuid4
+
+from pydantic import TypeAdapter
+
+from app.core.cache import CacheBackend
+from app.core.config import settings
+from app.core.events import event_hub
 from app.core.logger import get_logger
 from app.core.exceptions import BusinessError
-from app.models.habit import Habit
+from app.core.security import Principal
+from app.core.singleflight import singleflight
+from app.models.habit import Habit, HabitStatus
 from app.models.user import User
 from app.repositories.habit import HabitRepository
-from app.schemas.habit import HabitCreate, HabitUpdate
+from app.schemas.habit import (
+    DashboardDay,
+    HabitCreate,
+    HabitDashboardResponse,
+    HabitResponse,
+    HabitUpdate,
+)
 
 logger = get_logger(__name__)
 
+_habit_list_adapter = TypeAdapter(list[HabitResponse])
+
+# Версия живёт дольше данных: её потеря лишь сбрасывает кэш пользователя
+HABITS_VERSION_TTL = 7 * 24 * 3600
+
+
+async def invalidate_user_habits(cache: CacheBackend, user_id: UUID) -> None:
+    """Новая версия делает недоступными все закэшированные списки пользователя."""
+    await cache.set(
+        f"habits:{user_id}:version", uuid4().hex.encode(), HABITS_VERSION_TTL
+    )
+    singleflight.invalidate(user_id)
+
 
 class HabitService:
     MAX_ACTIVE_HABITS = 10
+    DASHBOARD_DAYS = 7
 
-    def __init__(self, habit_repo: HabitRepository):
+    def __init__(self, habit_repo: HabitRepository, cache: CacheBackend):
         self.habit_repo = habit_repo
+        self.cache = cache
 
     async def create_habit(self, user: User, data: HabitCreate) -> Habit:
-        active_habits = await self.habit_repo.get_all(user.id, only_active=True)
-        if len(active_habits) >= self.MAX_ACTIVE_HABITS:
+        active_habits = await self.habit_repo.count_active(user.id)
+        if active_habits >= self.MAX_ACTIVE_HABITS:
             logger.warning("Habit limit reached | user_id=%s | count=%s",
-                           user.id, len(active_habits)
+                           user.id, active_habits
             )
             raise BusinessError(f"Maximum {self.MAX_ACTIVE_HABITS} active habits")
 
-        return await self.habit_repo.create(user.id, data.model_dump())
+        async with singleflight.writing(user.id):
+            habit = await self.habit_repo.create(user.id, data.model_dump())
+        await self._invalidate(user.id)
+        await self._publish(user.id, "habit.created", habit)
+        return habit
 
     async def get_user_habits(
-        self, user: User, only_active: bool = True
-    ) -> list[Habit]:
+        self, user: User | Principal, only_active: bool = True
+    ) -> list[HabitResponse]:
+        key = await self._cache_key(user.id, f"list:{int(only_active)}")
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return _habit_list_adapter.validate_json(cached)
 
-        habits = await self.habit_repo.get_all(user.id, only_active)
+        # singleflight защищает БД от лавины одинаковых промахов
+        habits = await singleflight.do(
+            user.id, key, lambda: self._load_habits(user.id, only_active, key)
+        )
 
         logger.debug("User habits fetched | user_id=%s | count=%s",
                      user.id, len(habits)
         )
-        return habits
+        return list(habits)
+
+    async def get_user_habit(self, user: User | Principal, habit_id: int) -> HabitResponse:
+        key = await self._cache_key(user.id, f"item:{habit_id}")
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return HabitResponse.model_validate_json(cached)
+
+        habit = HabitResponse.model_validate(
+            await self.habit_repo.get(user.id, habit_id)
+        )
+        await self.cache.set(
+            key, habit.model_dump_json().encode(), settings.cache.TTL_SECONDS
+        )
+        return habit
 
-    async def get_user_habit(self, user: User, habit_id: int) -> Habit | None:
-        return await self.habit_repo.get(user.id, habit_id)
+    async def get_dashboard(
+        self, user: User | Principal, day: date | None = None
+    ) -> list[HabitDashboardResponse]:
+        day = day or date.today()
+        rows = await self.habit_repo.get_dashboard(user.id, day, self.DASHBOARD_DAYS)
+        days = [
+            day - timedelta(days=offset)
+            for offset in range(self.DASHBOARD_DAYS - 1, -1, -1)
+        ]
+
+        dashboard = []
+        for row in rows:
+            # Статусы приходят именами членов HabitStatus (native_enum=False)
+            marks = dict(zip(row.dates or [], row.statuses or []))
+            last_days = [
+                DashboardDay(
+                    date=d, status=HabitStatus[marks[d]] if d in marks else None
+                )
+                for d in days
+            ]
+            dashboard.append(
+                HabitDashboardResponse(
+                    **HabitResponse.model_validate(row).model_dump(),
+                    today_status=last_days[-1].status,
+                    last_days=last_days,
+                    current_streak=row.current_streak,
+                )
+            )
+
+        logger.debug("Dashboard built | user_id=%s | day=%s | habits=%s",
+                     user.id, day, len(dashboard)
+        )
+        return dashboard
 
     async def update_habit(
         self, user: User, habit_id: int, data: HabitUpdate
-    ) -> Habit:
+    ) -> Habit | HabitResponse:
         update_dict = data.model_dump(exclude_unset=True)
 
         if not update_dict:
@@ -49,8 +138,47 @@ class HabitService:
         )
             return await self.get_user_habit(user, habit_id)
 
-        return await self.habit_repo.update(user.id, habit_id, update_dict)
+        async with singleflight.writing(user.id):
+            habit = await self.habit_repo.update(user.id, habit_id, update_dict)
+        await self._invalidate(user.id)
+        await self._publish(user.id, "habit.updated", habit)
+        return habit
 
     async def deactivate_habit(self, user: User, habit_id: int) -> bool:
-        return await self.habit_repo.delete(user.id, habit_id)
-    
\ No newline at end of file
+        async with singleflight.writing(user.id):
+            deleted = await self.habit_repo.delete(user.id, habit_id)
+        await self._invalidate(user.id)
+        await event_hub.publish(user.id, "habit.deleted", {"id": habit_id})
+        return deleted
+
+    async def _load_habits(
+        self, user_id: UUID, only_active: bool, key: str
+    ) -> list[HabitResponse]:
+        habits = [
+            HabitResponse.model_validate(habit)
+            for habit in await self.habit_repo.get_list(user_id, only_active)
+        ]
+        await self.cache.set(
+            key, _habit_list_adapter.dump_json(habits), settings.cache.TTL_SECONDS
+        )
+        return habits
+
+    async def _cache_key(self, user_id: UUID, suffix: str) -> str:
+        version_key = f"habits:{user_id}:version"
+        version = await self.cache.get(version_key)
+
+        if version is None:
+            # Новая случайная версия: старые записи не переиспользуются,
+            # даже если ключ версии был вытеснен из кэша
+            await self.cache.add(version_key, uuid4().hex.encode(), HABITS_VERSION_TTL)
+            version = await self.cache.get(version_key) or b"0"
+
+        return f"habits:{user_id}:{version.decode()}:{suffix}"
+
+    async def _invalidate(self, user_id: UUID) -> None:
+        await invalidate_user_habits(self.cache, user_id)
+
+    async def _publish(self, user_id: UUID, event_type: str, habit: Habit) -> None:
+        await event_hub.publish(
+            user_id, event_type, HabitResponse.model_validate(habit).model_dump(mode="json")
+        )
@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, NamedTuple
+from uuid import UUID
+
+from app.core.exceptions import BusinessError, ConflictError, DatabaseError
+from app.core.logger import get_logger
+from app.repositories.idempotency import IdempotencyRepository
+
+logger = get_logger(__name__)
+
+
+class IdempotentResult(NamedTuple):
+    status_code: int
+    body: Any
+    replayed: bool
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    """sha256 метода, пути и тела — повтор ключа с другим запросом отклоняется."""
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IdempotencyService:
+    def __init__(
+        self, idempotency_repo: IdempotencyRepository, ttl: timedelta, lease: timedelta
+    ):
+        self.idempotency_repo = idempotency_repo
+        self.ttl = ttl
+        self.lease = lease
+
+    async def execute(
+        self,
+        user_id: UUID,
+        key: str,
+        fingerprint: str,
+        status_code: int,
+        handler: Callable[[], Awaitable[Any]],
+        serialize: Callable[[Any], Any],
+    ) -> IdempotentResult:
+        """
+        Выполняет handler не более одного раза на (user_id, key).
+        Повтор получает сохранённый ответ, не касаясь основных таблиц.
+        """
+        stored = await self._replay(user_id, key, fingerprint)
+        if stored is not None:
+            return stored
+
+        now = datetime.now(timezone.utc)
+        locked_until = now + self.lease
+        if not await self.idempotency_repo.acquire(
+            user_id, key, fingerprint, now + self.ttl, locked_until
+        ):
+            # Параллельный запрос успел занять ключ между чтением и вставкой
+            stored = await self._replay(user_id, key, fingerprint)
+            if stored is not None:
+                return stored
+            raise ConflictError("Request with this Idempotency-Key is still in progress")
+
+        try:
+            result = await handler()
+            body = serialize(result)
+            await self.idempotency_repo.complete(
+                user_id, key, locked_until, status_code, body
+            )
+        except BaseException:
+            # Ошибку не запоминаем: клиент может повторить запрос с тем же ключом.
+            # Отмена запроса (CancelledError) и сбой сохранения ответа тоже
+            # освобождают ключ; если не удалось и это, ключ отпустит аренда
+            await asyncio.shield(self._release(user_id, key, locked_until))
+            raise
+
+        logger.info("Idempotent request stored | user_id=%s | key=%s", user_id, key)
+        return IdempotentResult(status_code, result, replayed=False)
+
+    async def _replay(
+        self, user_id: UUID, key: str, fingerprint: str
+    ) -> IdempotentResult | None:
+        record = await self.idempotency_repo.get(user_id, key)
+        if record is None:
+            return None
+
+        if record.status_code is None and (
+            record.locked_until is None or record.locked_until <= datetime.now(timezone.utc)
+        ):
+            # Аренда брошенного запроса истекла: ключ займёт acquire
+            return None
+        if record.request_hash != fingerprint:
+            raise BusinessError("Idempotency-Key was already used with a different request")
+        if record.status_code is None:
+            raise ConflictError("Request with this Idempotency-Key is still in progress")
+
+        logger.info("Idempotent request replayed | user_id=%s | key=%s", user_id, key)
+        return IdempotentResult(record.status_code, record.response, replayed=True)
+
+    async def _release(self, user_id: UUID, key: str, locked_until: datetime) -> None:
+        try:
+            await self.idempotency_repo.release(user_id, key, locked_until)
+        except DatabaseError as e:
+            logger.warning("Idempotency key left until lease expiry | user_id=%s | key=%s | error=%s",
+                           user_id, key, e.message
+            )
+
+    async def purge_expired(self) -> int:
+        purged = await self.idempotency_repo.purge_expired()
+        logger.info("Expired idempotency keys purged | count=%s", purged)
+        return purged
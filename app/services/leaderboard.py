@@ -0,0 +1,132 @@
+from datetime import date, timedelta
+from uuid import UUID
+
+from app.core.exceptions import BusinessError
+from app.core.leaderboard import LeaderboardBackend, LeaderboardEntry
+from app.core.logger import get_logger
+from app.core.singleflight import singleflight
+from app.models.user import User
+from app.repositories.tracking import HabitTrackingRepository
+from app.repositories.user import UserRepository
+from app.schemas.leaderboard import Board, LeaderboardEntryResponse, LeaderboardResponse
+
+logger = get_logger(__name__)
+
+STREAK_BOARD = "streak"
+COMPLETION_BOARD = "completion"
+# Помесячный рейтинг живёт до конца следующего месяца и исчезает сам
+MONTHLY_TTL_SECONDS = 62 * 24 * 3600
+
+
+def board_key(board: Board, day: date) -> str:
+    if board == COMPLETION_BOARD:
+        return f"{COMPLETION_BOARD}:{day:%Y-%m}"
+    return STREAK_BOARD
+
+
+async def remove_from_leaderboards(
+    backend: LeaderboardBackend, user_id: UUID, today: date
+) -> None:
+    """Убирает пользователя из всех рейтингов, включая прошлый месяц."""
+    previous_month = today.replace(day=1) - timedelta(days=1)
+    keys = {
+        STREAK_BOARD,
+        board_key(COMPLETION_BOARD, today),
+        board_key(COMPLETION_BOARD, previous_month),
+    }
+    for key in keys:
+        await backend.remove(key, user_id)
+
+
+class LeaderboardService:
+    """
+    Рейтинги по текущей серии и проценту выполнения за месяц. Места не
+    считаются сортировкой пользователей на запрос: бэкенд держит
+    упорядоченную структуру, которую обновляют отметки участников.
+    """
+
+    MAX_LIMIT = 100
+    MAX_RADIUS = 25
+
+    def __init__(
+        self,
+        backend: LeaderboardBackend,
+        user_repo: UserRepository,
+        tracking_repo: HabitTrackingRepository,
+    ):
+        self.backend = backend
+        self.user_repo = user_repo
+        self.tracking_repo = tracking_repo
+
+    async def set_participation(self, user: User, enabled: bool) -> None:
+        if user.leaderboard_opt_in == enabled:
+            return
+
+        async with singleflight.writing(user.id):
+            await self.user_repo.update(user.id, {"leaderboard_opt_in": enabled})
+        if enabled:
+            await self.record(user.id, user.streak_days)
+        else:
+            await remove_from_leaderboards(self.backend, user.id, date.today())
+
+        logger.info("Leaderboard participation changed | user_id=%s | enabled=%s",
+                    user.id, enabled
+        )
+
+    async def record(self, user_id: UUID, streak_days: int, today: date | None = None) -> None:
+        """Обновляет очки участника после изменения его отметок."""
+        today = today or date.today()
+        rate = await self.tracking_repo.get_completion_rate(
+            user_id, today.replace(day=1), today
+        )
+        await self.backend.set_score(STREAK_BOARD, user_id, streak_days)
+        await self.backend.set_score(
+            board_key(COMPLETION_BOARD, today), user_id, rate, MONTHLY_TTL_SECONDS
+        )
+
+    async def get_board(self, user: User, board: Board, limit: int) -> LeaderboardResponse:
+        if not 1 <= limit <= self.MAX_LIMIT:
+            raise BusinessError(f"limit must be between 1 and {self.MAX_LIMIT}")
+
+        key = board_key(board, date.today())
+        entries = await self.backend.top(key, limit)
+        me = await self.backend.get(key, user.id) if user.leaderboard_opt_in else None
+        return await self._response(user, board, key, entries, me)
+
+    async def get_around(self, user: User, board: Board, radius: int) -> LeaderboardResponse:
+        if not 1 <= radius <= self.MAX_RADIUS:
+            raise BusinessError(f"radius must be between 1 and {self.MAX_RADIUS}")
+        if not user.leaderboard_opt_in:
+            raise BusinessError("Join the leaderboards to see your neighbours")
+
+        key = board_key(board, date.today())
+        entries = await self.backend.around(key, user.id, radius)
+        me = next((entry for entry in entries if entry.user_id == user.id), None)
+        return await self._response(user, board, key, entries, me)
+
+    async def _response(
+        self,
+        user: User,
+        board: Board,
+        key: str,
+        entries: list[LeaderboardEntry],
+        me: LeaderboardEntry | None,
+    ) -> LeaderboardResponse:
+        usernames = await self.user_repo.get_usernames({entry.user_id for entry in entries})
+        usernames[user.id] = user.username
+
+        def to_response(entry: LeaderboardEntry) -> LeaderboardEntryResponse:
+            return LeaderboardEntryResponse(
+                rank=entry.rank,
+                username=usernames[entry.user_id],
+                score=entry.score,
+                is_me=entry.user_id == user.id,
+            )
+
+        return LeaderboardResponse(
+            board=board,
+            total=await self.backend.size(key),
+            # Удалённые, но ещё не вычищенные из рейтинга аккаунты не показываем
+            entries=[to_response(entry) for entry in entries if entry.user_id in usernames],
+            me=to_response(me) if me is not None else None,
+        )
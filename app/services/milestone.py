@@ -0,0 +1,167 @@
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import Row
+
+from app.core.logger import get_logger
+from app.core.milestone import (
+    EPOCH,
+    Milestone,
+    MilestoneEvent,
+    MilestoneSink,
+    Progress,
+    advance,
+    level,
+    replay,
+    transition,
+)
+from app.models.habit import HabitStatus
+from app.repositories.milestone import MilestoneRepository
+
+logger = get_logger(__name__)
+
+
+class BackfillResult(NamedTuple):
+    habits: int
+    marks: int
+    batches: int
+    seconds: float
+
+
+def _row(habit_id: int, progress: Progress) -> dict:
+    return {"habit_id": habit_id, **progress._asdict()}
+
+
+class MilestoneService:
+    """
+    Вехи цели привычки (половина goal_streak, цель, оборванная серия) по
+    потоку отметок. Отметка позже последней учтённой сдвигает сохранённое
+    состояние на шаг; отметка задним числом, удаление или привычка без
+    состояния пересчитывают поток этой привычки целиком. Вехи уходят в
+    MilestoneSink. Учитываются отметки живой таблицы, без архива.
+    """
+
+    def __init__(self, milestone_repo: MilestoneRepository, sink: MilestoneSink):
+        self.milestone_repo = milestone_repo
+        self.sink = sink
+
+    async def record(
+        self, marks: Iterable[tuple[int, date, HabitStatus]]
+    ) -> list[MilestoneEvent]:
+        """Применяет сохранённые отметки (habit_id, date, status)."""
+        by_habit: dict[int, list[tuple[date, bool]]] = defaultdict(list)
+        for habit_id, day, status in marks:
+            by_habit[habit_id].append((day, status == HabitStatus.COMPLETED))
+        if not by_habit:
+            return []
+
+        rows = await self.milestone_repo.lock(set(by_habit))
+        events: list[MilestoneEvent] = []
+        saved = []
+        stale = {}
+        for row in rows:
+            steps = sorted(by_habit[row.id])
+            if not row.has_progress or (
+                row.last_date is not None and steps[0][0] <= row.last_date
+            ):
+                stale[row.id] = row
+                continue
+
+            progress = Progress(row.streak, row.run_start, row.last_date, row.milestone)
+            for day, completed in steps:
+                progress, reached = transition(
+                    progress, advance(progress, day, completed), row.goal_streak
+                )
+                events.extend(self._events(row, reached, day))
+            saved.append(_row(row.id, progress))
+
+        if stale:
+            saved.extend(await self._rebuild(stale, by_habit, events))
+        if saved:
+            await self.milestone_repo.save(saved)
+        await self._emit(events)
+        return events
+
+    async def refresh(self, habit_ids: set[int]) -> list[MilestoneEvent]:
+        """Пересчитывает состояние после удаления отметок."""
+        rows = await self.milestone_repo.lock(habit_ids)
+        events: list[MilestoneEvent] = []
+        saved = await self._rebuild({row.id: row for row in rows}, {}, events)
+        if saved:
+            await self.milestone_repo.save(saved)
+        await self._emit(events)
+        return events
+
+    async def backfill(self, batch_habits: int) -> BackfillResult:
+        """
+        Начальный расчёт для привычек без состояния: потоки отметок порциями
+        по batch_habits, каждая порция — одним векторным проходом replay.
+        Вехи из истории не рассылаются.
+        """
+        started = time.perf_counter()
+        habits = marks = batches = 0
+        after = 0
+
+        while streams := await self.milestone_repo.get_missing_streams(
+            after, batch_habits, EPOCH
+        ):
+            states = replay([row.days for row in streams], [row.completed for row in streams])
+            await self.milestone_repo.save(
+                [
+                    _row(row.id, state._replace(milestone=level(state.streak, row.goal_streak)))
+                    for row, state in zip(streams, states)
+                ],
+                overwrite=False,
+            )
+            habits += len(streams)
+            marks += sum(len(row.days or ()) for row in streams)
+            batches += 1
+            after = streams[-1].id
+
+        seconds = time.perf_counter() - started
+        logger.info("Milestone backfill finished | habits=%s | marks=%s | batches=%s | marks_per_second=%s",
+                    habits, marks, batches, round(marks / seconds) if seconds else marks
+        )
+        return BackfillResult(habits, marks, batches, round(seconds, 2))
+
+    async def _rebuild(
+        self,
+        rows: dict[int, Row],
+        by_habit: dict[int, list[tuple[date, bool]]],
+        events: list[MilestoneEvent],
+    ) -> list[dict]:
+        streams = await self.milestone_repo.get_streams(set(rows), EPOCH)
+        states = replay([s.days for s in streams], [s.completed for s in streams])
+        saved = []
+        for stream, new in zip(streams, states):
+            row = rows[stream.id]
+            if row.has_progress:
+                old = Progress(row.streak, row.run_start, row.last_date, row.milestone)
+            elif len(stream.days or ()) <= len(by_habit.get(stream.id, ())):
+                # Вся история — эти отметки: новая привычка, вехи считаются с нуля
+                old = Progress()
+            else:
+                # Состояния ещё нет, а история есть — начальный расчёт без рассылки
+                milestone = level(new.streak, row.goal_streak)
+                saved.append(_row(stream.id, new._replace(milestone=milestone)))
+                continue
+
+            progress, reached = transition(old, new, row.goal_streak)
+            events.extend(self._events(row, reached, new.last_date or date.today()))
+            saved.append(_row(stream.id, progress))
+        return saved
+
+    @staticmethod
+    def _events(
+        row: Row, reached: list[tuple[Milestone, int]], day: date
+    ) -> list[MilestoneEvent]:
+        return [
+            MilestoneEvent(row.user_id, row.id, milestone, streak, row.goal_streak, day)
+            for milestone, streak in reached
+        ]
+
+    async def _emit(self, events: list[MilestoneEvent]) -> None:
+        if events:
+            await self.sink.emit(events)
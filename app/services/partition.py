@@ -0,0 +1,100 @@
+from datetime import date
+from typing import NamedTuple
+
+from app.core.logger import get_logger
+from app.models.archive import ARCHIVE_SCHEMA
+from app.repositories.partition import PartitionRepository
+
+logger = get_logger(__name__)
+
+TRACKING_TABLE = "habit_tracking"
+TRACKING_DEFAULT_PARTITION = "habit_tracking_default"
+ARCHIVE_TRACKING_TABLE = f"{ARCHIVE_SCHEMA}.habit_tracking"
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def retention_cutoff(today: date, retention_months: int) -> date | None:
+    """Отметки раньше этой даты живут в архиве; None — срок хранения не задан."""
+    if retention_months <= 0:
+        return None
+    return add_months(month_start(today), -retention_months)
+
+
+def partition_name(month: date) -> str:
+    return f"{TRACKING_TABLE}_{month:%Y_%m}"
+
+
+class MaintenanceResult(NamedTuple):
+    created: list[str]
+    detached: list[str]
+    moved_rows: int
+
+
+class TrackingPartitionService:
+    """
+    Обслуживание помесячных секций habit_tracking: секции на months_ahead
+    месяцев вперёд создаются заранее, чтобы отметки не копились в секции
+    по умолчанию. Секции старше retention_months (0 — хранить всё)
+    переподключаются к архивной таблице отметок.
+    """
+
+    def __init__(
+        self,
+        partition_repo: PartitionRepository,
+        months_ahead: int,
+        retention_months: int,
+    ):
+        self.partition_repo = partition_repo
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+
+    async def maintain(self, today: date) -> MaintenanceResult:
+        partitions = await self.partition_repo.get_partitions(TRACKING_TABLE)
+        existing = {p.lower for p in partitions if not p.is_default}
+        default = next((p.name for p in partitions if p.is_default), None)
+
+        created = []
+        moved_rows = 0
+        current = month_start(today)
+        for offset in range(self.months_ahead + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            name = partition_name(month)
+            moved_rows += await self.partition_repo.create_partition(
+                TRACKING_TABLE, name, month, add_months(month, 1), default
+            )
+            created.append(name)
+
+        detached = []
+        cutoff = retention_cutoff(today, self.retention_months)
+        if cutoff is not None:
+            archive_default = next(
+                (
+                    p.name
+                    for p in await self.partition_repo.get_partitions(ARCHIVE_TRACKING_TABLE)
+                    if p.is_default
+                ),
+                None,
+            )
+            for partition in partitions:
+                if not partition.is_default and partition.upper <= cutoff:
+                    detached.append(
+                        await self.partition_repo.move_partition(
+                            TRACKING_TABLE, partition, ARCHIVE_TRACKING_TABLE, archive_default
+                        )
+                    )
+
+        logger.info("Tracking partitions maintained | created=%s | detached=%s | moved_rows=%s",
+                    len(created), len(detached), moved_rows
+        )
+        return MaintenanceResult(created, detached, moved_rows)
+
@@ -0,0 +1,82 @@
+import base64
+import binascii
+from datetime import datetime, timedelta
+
+from app.core.exceptions import BusinessError
+from app.core.logger import get_logger
+from app.core.security import Principal
+from app.models.user import User
+from app.repositories.sync import (
+    KIND_ARCHIVED,
+    KIND_HABIT,
+    KIND_TOMBSTONE,
+    KIND_TRACKING,
+    SyncCursor,
+    SyncRepository,
+)
+from app.schemas.sync import (
+    ArchivedHabitSyncItem,
+    HabitSyncItem,
+    HabitTrackingSyncItem,
+    HabitTrackingTombstoneResponse,
+    SyncResponse,
+)
+
+logger = get_logger(__name__)
+
+
+class SyncService:
+    def __init__(self, sync_repo: SyncRepository, commit_lag: timedelta):
+        self.sync_repo = sync_repo
+        self.commit_lag = commit_lag
+
+    async def get_changes(
+        self, user: User | Principal, since: str | None, limit: int
+    ) -> SyncResponse:
+        cursor = self.decode_cursor(since) if since else None
+        until = await self.sync_repo.get_horizon() - self.commit_lag
+
+        changes = await self.sync_repo.get_changes(user.id, cursor, until, limit + 1)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        response = SyncResponse(
+            next_cursor=self.encode_cursor(changes[-1].cursor) if changes else since,
+            has_more=has_more,
+        )
+        for change in changes:
+            if change.kind == KIND_HABIT:
+                response.habits.append(HabitSyncItem.model_validate(change.entity))
+            elif change.kind == KIND_TRACKING:
+                response.trackings.append(
+                    HabitTrackingSyncItem.model_validate(change.entity)
+                )
+            elif change.kind == KIND_TOMBSTONE:
+                response.deleted_trackings.append(
+                    HabitTrackingTombstoneResponse.model_validate(change.entity)
+                )
+            elif change.kind == KIND_ARCHIVED:
+                response.archived_habits.append(
+                    ArchivedHabitSyncItem.model_validate(change.entity)
+                )
+
+        logger.debug("Sync page | user_id=%s | changes=%s | has_more=%s",
+                     user.id, len(changes), has_more
+        )
+        return response
+
+    @staticmethod
+    def encode_cursor(cursor: SyncCursor) -> str:
+        raw = f"{cursor.changed_at.isoformat()}|{cursor.kind}|{cursor.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(value: str) -> SyncCursor:
+        try:
+            padded = value + "=" * (-len(value) % 4)
+            changed_at, kind, id_ = (
+                base64.urlsafe_b64decode(padded).decode().split("|")
+            )
+            return SyncCursor(datetime.fromisoformat(changed_at), int(kind), int(id_))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise BusinessError("Invalid sync cursor")
@@ -0,0 +1,238 @@
+import base64
+from datetime import date
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import Row
+
+from app.core.config import settings
+from app.core.events import event_hub
+from app.core.exceptions import BusinessError, NotFoundError
+from app.core.logger import get_logger
+from app.core.security import Principal
+from app.core.singleflight import singleflight
+from app.models.habit import HabitStatus
+from app.models.user import User
+from app.repositories.habit import HabitRepository
+from app.repositories.tracking import HabitTrackingRepository
+from app.services.leaderboard import LeaderboardService
+from app.services.milestone import MilestoneService
+from app.services.partition import retention_cutoff
+from app.schemas.habit import (
+    HabitHeatmap,
+    HabitHeatmapResponse,
+    HabitTrackingBatchCreate,
+    HabitTrackingBatchItemResult,
+    HabitTrackingBatchResponse,
+    HabitTrackingResponse,
+    HeatmapEncoding,
+)
+
+logger = get_logger(__name__)
+
+# Коды дней тепловой карты, 0 — нет отметки
+HEATMAP_CODES = {HabitStatus.COMPLETED: 1, HabitStatus.FAILED: 2, HabitStatus.SKIPPED: 3}
+
+
+def heatmap_codes(rows: list[Row], days: int) -> np.ndarray:
+    """Строки HabitTrackingRepository.get_heatmap -> матрица кодов привычки × дни, uint8."""
+    codes = np.zeros((len(rows), days), dtype=np.uint8)
+    for status, code in HEATMAP_CODES.items():
+        column = status.name.lower()
+        lengths = np.fromiter(
+            (len(getattr(row, column) or ()) for row in rows), dtype=np.intp, count=len(rows)
+        )
+        marked = np.fromiter(
+            chain.from_iterable(getattr(row, column) or () for row in rows),
+            dtype=np.intp,
+            count=int(lengths.sum()),
+        )
+        codes[np.repeat(np.arange(len(rows)), lengths), marked] = code
+    return codes
+
+
+def pack_bits(codes: np.ndarray) -> list[str]:
+    """По 2 бита на день, четыре дня в байте начиная с младших битов; base64 на строку."""
+    padded = np.pad(codes, ((0, 0), (0, -codes.shape[1] % 4)))
+    quads = padded.reshape(len(codes), padded.shape[1] // 4, 4)
+    packed = (quads << np.array([0, 2, 4, 6], dtype=np.uint8)).sum(-1, dtype=np.uint8)
+    return [base64.b64encode(row).decode("ascii") for row in packed]
+
+
+def run_lengths(codes: np.ndarray) -> list[list[int]]:
+    """Плоские пары [код, длина серии] на строку."""
+    if not codes.size:
+        return [[] for _ in codes]
+    # Серия начинается в первый день строки и там, где код меняется
+    starts = np.ones(codes.shape, dtype=bool)
+    starts[:, 1:] = codes[:, 1:] != codes[:, :-1]
+    rows, cols = np.nonzero(starts)
+    ends = np.r_[cols[1:], 0]
+    row_ends = np.r_[rows[1:] != rows[:-1], True]
+    lengths = np.where(row_ends, codes.shape[1], ends) - cols
+
+    pairs = np.stack([codes[rows, cols], lengths], axis=1).astype(np.int64)
+    bounds = np.flatnonzero(row_ends) + 1
+    return [run.ravel().tolist() for run in np.split(pairs, bounds[:-1])]
+
+
+class TrackingService:
+    MAX_HISTORY_DAYS = 731
+    MAX_HEATMAP_DAYS = 366
+
+    def __init__(
+        self,
+        tracking_repo: HabitTrackingRepository,
+        habit_repo: HabitRepository,
+        leaderboards: LeaderboardService | None = None,
+        milestones: MilestoneService | None = None,
+    ):
+        self.tracking_repo = tracking_repo
+        self.habit_repo = habit_repo
+        self.leaderboards = leaderboards
+        self.milestones = milestones
+
+    async def check_in_batch(
+        self, user: User, data: HabitTrackingBatchCreate
+    ) -> HabitTrackingBatchResponse:
+        # Повторы (habit_id, date) отклоняются при валидации пакета
+        owned = await self.habit_repo.get_owned_ids(
+            user.id, {item.habit_id for item in data.items}
+        )
+        rows = [item.model_dump() for item in data.items if item.habit_id in owned]
+
+        saved = {}
+        streak_days = user.streak_days
+        if rows:
+            async with singleflight.writing(user.id):
+                trackings, streak_days = await self.tracking_repo.upsert_many(
+                    user.id, rows, date.today()
+                )
+            saved = {(t.habit_id, t.date): t for t in trackings}
+            await event_hub.publish(
+                user.id,
+                "tracking.upserted",
+                {
+                    "trackings": [
+                        HabitTrackingResponse.model_validate(t).model_dump(mode="json")
+                        for t in trackings
+                    ],
+                    "streak_days": streak_days,
+                },
+            )
+            await self._update_leaderboards(user, streak_days)
+            if self.milestones is not None:
+                await self.milestones.record((t.habit_id, t.date, t.status) for t in trackings)
+
+        results = []
+        for item in data.items:
+            tracking = saved.get((item.habit_id, item.date))
+            results.append(
+                HabitTrackingBatchItemResult(
+                    habit_id=item.habit_id,
+                    date=item.date,
+                    success=tracking is not None,
+                    error=None if tracking is not None else "Habit not found",
+                    tracking=(
+                        HabitTrackingResponse.model_validate(tracking)
+                        if tracking is not None else None
+                    ),
+                )
+            )
+
+        logger.info("Batch check-in | user_id=%s | items=%s | saved=%s",
+                    user.id, len(data.items), len(saved)
+        )
+        return HabitTrackingBatchResponse(results=results, streak_days=streak_days)
+
+    async def delete_check_in(self, user: User, habit_id: int, day: date) -> int:
+        owned = await self.habit_repo.get_owned_ids(user.id, {habit_id})
+        if habit_id not in owned:
+            raise NotFoundError("Habit")
+
+        async with singleflight.writing(user.id):
+            streak_days = await self.tracking_repo.delete(
+                user.id, habit_id, day, date.today()
+            )
+        await event_hub.publish(
+            user.id,
+            "tracking.deleted",
+            {"habit_id": habit_id, "date": day.isoformat(), "streak_days": streak_days},
+        )
+        await self._update_leaderboards(user, streak_days)
+        if self.milestones is not None:
+            await self.milestones.refresh({habit_id})
+        return streak_days
+
+    async def get_history(
+        self,
+        user: User | Principal,
+        habit_id: int,
+        date_from: date,
+        date_to: date,
+        include_archive: bool = False,
+    ) -> list[HabitTrackingResponse]:
+        if date_from > date_to:
+            raise BusinessError("date_from must not be after date_to")
+        if (date_to - date_from).days >= self.MAX_HISTORY_DAYS:
+            raise BusinessError(f"Maximum {self.MAX_HISTORY_DAYS} days per request")
+
+        # Период старше срока хранения секций целиком или частично в архиве
+        cutoff = retention_cutoff(date.today(), settings.partitions.RETENTION_MONTHS)
+        if cutoff is not None and date_from < cutoff:
+            include_archive = True
+
+        rows = await self.tracking_repo.get_history(
+            user.id, habit_id, date_from, date_to, include_archive
+        )
+        logger.debug("Tracking history fetched | user_id=%s | habit_id=%s | archive=%s | count=%s",
+                     user.id, habit_id, include_archive, len(rows)
+        )
+        return [HabitTrackingResponse.model_validate(row) for row in rows]
+
+    async def get_heatmap(
+        self,
+        user: User | Principal,
+        date_from: date,
+        date_to: date,
+        encoding: HeatmapEncoding = HeatmapEncoding.BITS,
+        habit_id: int | None = None,
+    ) -> HabitHeatmapResponse:
+        if date_from > date_to:
+            raise BusinessError("date_from must not be after date_to")
+        days = (date_to - date_from).days + 1
+        if days > self.MAX_HEATMAP_DAYS:
+            raise BusinessError(f"Maximum {self.MAX_HEATMAP_DAYS} days per request")
+
+        cutoff = retention_cutoff(date.today(), settings.partitions.RETENTION_MONTHS)
+        include_archive = cutoff is not None and date_from < cutoff
+
+        rows = await self.tracking_repo.get_heatmap(
+            user.id, date_from, date_to, habit_id, include_archive
+        )
+        if habit_id is not None and not rows:
+            raise NotFoundError("Habit")
+
+        codes = heatmap_codes(rows, days)
+        if encoding == HeatmapEncoding.BITS:
+            habits = [
+                HabitHeatmap(habit_id=row.id, bits=bits)
+                for row, bits in zip(rows, pack_bits(codes))
+            ]
+        else:
+            habits = [
+                HabitHeatmap(habit_id=row.id, runs=runs)
+                for row, runs in zip(rows, run_lengths(codes))
+            ]
+
+        logger.debug("Heatmap built | user_id=%s | habits=%s | days=%s | marks=%s",
+                     user.id, len(rows), days, int(np.count_nonzero(codes))
+        )
+        return HabitHeatmapResponse(
+            date_from=date_from, date_to=date_to, encoding=encoding, habits=habits
+        )
+
+    async def _update_leaderboards(self, user: User, streak_days: int) -> None:
+        # Рейтинги обновляются только у тех, кто согласился в них участвовать
+        if self.leaderboards is not None and user.leaderboard_opt_in:
+            await self.leaderboards.record(user.id, streak_days)
@@ -0,0 +1,153 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+from uuid import UUID
+
+from app.core.cache import get_cache
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.events import RedisEventBridge, event_hub
+from app.core.logger import get_logger
+from app.core.milestone import LogMilestoneSink
+from app.repositories.analytics import AnalyticsRepository
+from app.repositories.archive import ArchiveRepository
+from app.repositories.deletion import UserDeletionRepository
+from app.repositories.habit import HabitRepository
+from app.repositories.idempotency import IdempotencyRepository
+from app.repositories.milestone import MilestoneRepository
+from app.repositories.partition import PartitionRepository
+from app.services.analytics import AnalyticsService
+from app.services.archive import ArchiveService
+from app.services.deletion import UserDeletionService
+from app.services.idempotency import IdempotencyService
+from app.services.milestone import MilestoneService
+from app.services.partition import TrackingPartitionService
+
+logger = get_logger(__name__)
+
+
+def run_async(fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Выполняет асинхронный код задачи в собственном event loop.
+    Соединения пула привязаны к loop, поэтому после задачи пул закрывается.
+    """
+    async def main() -> Any:
+        try:
+            return await fn()
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+@celery_app.task
+def maintain_tracking_partitions() -> dict:
+    async def maintain() -> dict:
+        async with AsyncSessionLocal() as session:
+            service = TrackingPartitionService(
+                PartitionRepository(session),
+                months_ahead=settings.partitions.MONTHS_AHEAD,
+                retention_months=settings.partitions.RETENTION_MONTHS,
+            )
+            return (await service.maintain(date.today()))._asdict()
+
+    return run_async(maintain)
+
+
+@celery_app.task
+def archive_inactive_habits() -> dict:
+    if settings.archive.INACTIVE_DAYS <= 0:
+        return {"habits": 0, "trackings": 0, "batches": 0}
+
+    async def archive() -> dict:
+        before = datetime.now(timezone.utc) - timedelta(days=settings.archive.INACTIVE_DAYS)
+        async with AsyncSessionLocal() as session:
+            service = ArchiveService(
+                ArchiveRepository(session), HabitRepository(session), get_cache()
+            )
+            result = await service.archive_inactive_habits(
+                before, settings.archive.BATCH_SIZE, settings.archive.MAX_BATCHES
+            )
+            return result._asdict()
+
+    return run_async(archive)
+
+
+@celery_app.task
+def purge_deleted_users() -> dict:
+    async def purge() -> dict:
+        async with AsyncSessionLocal() as session:
+            service = UserDeletionService(UserDeletionRepository(session), get_cache())
+            result = await service.purge_pending(
+                datetime.now(timezone.utc),
+                settings.deletion.BATCH_SIZE,
+                settings.deletion.MAX_BATCHES,
+            )
+            return result._asdict()
+
+    return run_async(purge)
+
+
+@celery_app.task
+def purge_idempotency_keys() -> int:
+    async def purge() -> int:
+        async with AsyncSessionLocal() as session:
+            service = IdempotencyService(
+                IdempotencyRepository(session),
+                ttl=timedelta(hours=settings.idempotency.TTL_HOURS),
+                lease=timedelta(seconds=settings.idempotency.LEASE_SECONDS),
+            )
+            return await service.purge_expired()
+
+    return run_async(purge)
+
+
+@celery_app.task
+def compute_habit_insights() -> dict:
+    async def compute() -> dict:
+        async with AsyncSessionLocal() as session:
+            service = AnalyticsService(AnalyticsRepository(session), get_cache())
+            result = await service.compute_all(date.today(), settings.analytics.BATCH_USERS)
+            return result._asdict()
+
+    return run_async(compute)
+
+
+@celery_app.task
+def notify_milestones(events: list[dict]) -> int:
+    """
+    Уведомляет о вехах цели. Пока канал один — событие habit.milestone
+    в SSE-поток пользователя; без EVENTS_BACKEND=redis воркер не связан
+    с процессами API, и вехи только пишутся в лог.
+    """
+    for event in events:
+        logger.info("Milestone reached | user_id=%s | habit_id=%s | milestone=%s | streak=%s",
+                    event["user_id"], event["habit_id"], event["milestone"], event["streak"]
+        )
+    if settings.events.BACKEND != "redis":
+        return 0
+
+    async def fan_out() -> int:
+        bridge = RedisEventBridge(event_hub, settings.redis.REDIS_URL)
+        try:
+            for event in events:
+                await bridge.publish(UUID(event["user_id"]), {"type": "habit.milestone", "data": event})
+        finally:
+            await bridge.stop()
+        return len(events)
+
+    return run_async(fan_out)
+
+
+@celery_app.task
+def backfill_habit_progress() -> dict:
+    """Начальный расчёт вех для привычек без состояния; запускается вручную после миграции."""
+    async def backfill() -> dict:
+        async with AsyncSessionLocal() as session:
+            # Вехи из истории не рассылаются — получатель не используется
+            service = MilestoneService(MilestoneRepository(session), LogMilestoneSink())
+            result = await service.backfill(settings.milestones.BACKFILL_BATCH)
+            return result._asdict()
+
+    return run_async(backfill)
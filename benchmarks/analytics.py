@@ -0,0 +1,338 @@
+"""
+Аналитика привычек: матрица NumPy против цикла по строкам.
+
+Синтетические пользователи (--habits привычек, --days дней) получают
+отметки с разной вероятностью выполнения, парами «выполняются вместе»,
+провалами в выходные и трендом. Замеряется:
+    reference — та же аналитика циклами Python по отметкам, на --check-users
+                пользователях; её результаты сверяются с матричными
+    matrix    — build_matrix + compute_insights порциями по --batch
+                пользователей, без БД
+    batch     — AnalyticsService.compute_all на одноразовой базе: выборка,
+                матрица и запись в кэш (--db-users пользователей)
+
+Запуск (для batch нужен .env, как для приложения, и право CREATEDB):
+    python -m benchmarks.analytics --users 20000 --batch 500
+    python -m benchmarks.analytics --users 20000 --db-users 5000
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import NamedTuple
+
+import asyncpg
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.cache import FakeCache
+from app.core.config import settings
+from app.core.database import Base
+from app.models import archive, idempotency, leaderboard, revocation  # noqa: F401 — таблицы для create_all
+from app.repositories.analytics import AnalyticsRepository
+from app.services.analytics import (
+    MIN_CORRELATION,
+    MIN_PAIR_DAYS,
+    MIN_TREND_WEEKS,
+    MIN_WEEK_DAYS,
+    MIN_WEEKDAY_DAYS,
+    AnalyticsService,
+    build_matrix,
+    compute_insights,
+)
+from benchmarks.load import git_commit
+from benchmarks.repositories import create_database, drop_database
+
+
+class HabitDays(NamedTuple):
+    """Строка в форме AnalyticsRepository.get_habit_days."""
+
+    user_id: uuid.UUID
+    id: int
+    title: str
+    first_day: int
+    completed: list[int] | None
+    skipped: list[int] | None
+
+
+def synthetic_rows(users: int, habits: int, days: int, seed: int) -> list[HabitDays]:
+    rng = random.Random(seed)
+    rows = []
+    habit_id = 0
+    for _ in range(users):
+        user_id = uuid.uuid4()
+        # Общий для пользователя «хороший день»: на нём держатся пары привычек
+        good_day = [rng.random() < 0.6 for _ in range(days)]
+        for slot in range(rng.randint(1, habits)):
+            habit_id += 1
+            first_day = rng.choice([0, 0, 0, rng.randrange(days)])
+            base, drift = rng.uniform(0.2, 0.9), rng.uniform(-0.3, 0.3) / days
+            linked = slot % 2 == 0
+            completed, skipped = [], []
+            for day in range(first_day, days):
+                if rng.random() < 0.03:
+                    skipped.append(day)
+                    continue
+                chance = base + drift * day - (0.3 if day % 7 in (5, 6) else 0)
+                if (good_day[day] and rng.random() < 0.9) if linked else rng.random() < chance:
+                    completed.append(day)
+            rows.append(
+                HabitDays(
+                    user_id, habit_id, f"Habit {habit_id}", first_day,
+                    completed or None, skipped or None,
+                )
+            )
+    return rows
+
+
+def reference_insights(rows: list[HabitDays], date_from: date, days: int) -> dict:
+    """Аналитика одного пользователя циклами по дням — эталон и базовая скорость."""
+    weekday_start = date_from.weekday()
+    offset = (-days) % 7
+    habits = {}
+    marks = {}
+    for row in rows:
+        done = set(row.completed or ())
+        skipped = set(row.skipped or ())
+        counted = {d for d in range(row.first_day, days) if d not in skipped}
+        done &= counted
+        marks[row.id] = (done, counted)
+
+        weekday_done, weekday_total = [0] * 7, [0] * 7
+        week_done, week_total = {}, {}
+        for day in counted:
+            weekday = (weekday_start + day) % 7
+            week = (day + offset) // 7
+            weekday_total[weekday] += 1
+            week_total[week] = week_total.get(week, 0) + 1
+            if day in done:
+                weekday_done[weekday] += 1
+                week_done[week] = week_done.get(week, 0) + 1
+
+        weekdays = [
+            weekday_done[d] / weekday_total[d] if weekday_total[d] >= MIN_WEEKDAY_DAYS else None
+            for d in range(7)
+        ]
+        points = [
+            (week, week_done.get(week, 0) / total)
+            for week, total in week_total.items()
+            if total >= MIN_WEEK_DAYS
+        ]
+        slope = None
+        if len(points) >= MIN_TREND_WEEKS:
+            n = len(points)
+            mean_t = sum(t for t, _ in points) / n
+            mean_r = sum(r for _, r in points) / n
+            slope = sum((t - mean_t) * (r - mean_r) for t, r in points) / sum(
+                (t - mean_t) ** 2 for t, _ in points
+            )
+        habits[row.id] = {
+            "completion_rate": len(done) / len(counted) if counted else None,
+            "weekday_rates": weekdays,
+            "trend_per_week": slope,
+        }
+
+    pairs = {}
+    ids = [row.id for row in rows]
+    for a_index, a in enumerate(ids):
+        for b in ids[a_index + 1:]:
+            (done_a, counted_a), (done_b, counted_b) = marks[a], marks[b]
+            shared = counted_a & counted_b
+            if len(shared) < MIN_PAIR_DAYS:
+                continue
+            xs = [day in done_a for day in shared]
+            ys = [day in done_b for day in shared]
+            n, sx, sy = len(shared), sum(xs), sum(ys)
+            sxy = sum(x and y for x, y in zip(xs, ys))
+            variance = (n * sx - sx * sx) * (n * sy - sy * sy)
+            if variance <= 0:
+                continue
+            correlation = (n * sxy - sx * sy) / math.sqrt(variance)
+            if correlation >= MIN_CORRELATION:
+                pairs[a, b] = correlation
+    return {"habits": habits, "pairs": pairs}
+
+
+def by_user(rows: list[HabitDays]) -> dict[uuid.UUID, list[HabitDays]]:
+    users: dict[uuid.UUID, list[HabitDays]] = {}
+    for row in rows:
+        users.setdefault(row.user_id, []).append(row)
+    return users
+
+
+def close(a: float | None, b: float | None) -> bool:
+    if a is None or b is None:
+        return a is b
+    # Ответ округлён до 4 знаков
+    return abs(a - b) <= 1e-4
+
+
+def check(rows: list[HabitDays], date_from: date, days: int) -> dict:
+    users = by_user(rows)
+    user_ids = list(users)
+    insights = compute_insights(build_matrix(user_ids, rows, date_from, days))
+
+    started = time.perf_counter()
+    references = [reference_insights(users[user_id], date_from, days) for user_id in user_ids]
+    seconds = time.perf_counter() - started
+
+    for user_id, result, expected in zip(user_ids, insights, references):
+        for habit in result.habits:
+            want = expected["habits"][habit.habit_id]
+            values = [habit.completion_rate, habit.trend_per_week, *habit.weekday_rates]
+            wanted = [want["completion_rate"], want["trend_per_week"], *want["weekday_rates"]]
+            if not all(close(a, b) for a, b in zip(values, wanted)):
+                raise AssertionError(f"Habit {habit.habit_id} mismatch: {values} != {wanted}")
+        top = sorted(expected["pairs"].items(), key=lambda item: -item[1])[: len(result.pairs)]
+        for pair, (key, correlation) in zip(result.pairs, top):
+            if not close(pair.correlation, correlation):
+                raise AssertionError(f"User {user_id} pair mismatch: {pair} != {key}, {correlation}")
+        if len(result.pairs) != min(len(expected["pairs"]), 5):
+            raise AssertionError(f"User {user_id}: {len(result.pairs)} pairs")
+
+    return {"users": len(user_ids), "users_per_second": round(len(user_ids) / seconds)}
+
+
+def bench_matrix(rows: list[HabitDays], date_from: date, days: int, batch: int) -> dict:
+    users = by_user(rows)
+    user_ids = list(users)
+    started = time.perf_counter()
+    build_seconds = 0.0
+    for start in range(0, len(user_ids), batch):
+        chunk = user_ids[start:start + batch]
+        chunk_rows = [row for user_id in chunk for row in users[user_id]]
+        built = time.perf_counter()
+        matrix = build_matrix(chunk, chunk_rows, date_from, days)
+        build_seconds += time.perf_counter() - built
+        compute_insights(matrix)
+    seconds = time.perf_counter() - started
+    return {
+        "users": len(user_ids),
+        "seconds": round(seconds, 2),
+        "build_share": round(build_seconds / seconds, 3),
+        "users_per_second": round(len(user_ids) / seconds),
+    }
+
+
+async def bench_batch(rows: list[HabitDays], days: int, batch: int, keep: bool) -> dict:
+    name = f"habits_analytics_{os.getpid()}"
+    url = await create_database(name)
+    engine = create_async_engine(url)
+    today = date.today()
+    # Окно сервиса заканчивается вчера
+    date_from = today - timedelta(days=days)
+    settings.analytics.WINDOW_DAYS = days
+    users = by_user(rows)
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        conn = await asyncpg.connect(url.replace("+asyncpg", ""))
+        try:
+            await conn.copy_records_to_table(
+                "users",
+                records=[
+                    (user_id, f"user_{n}", f"user_{n}@example.com", "-", 0, True)
+                    for n, user_id in enumerate(users)
+                ],
+                columns=["id", "username", "email", "hashed_password", "streak_days", "is_active"],
+            )
+            created = datetime.combine(date_from, dt_time(12), timezone.utc)
+            await conn.copy_records_to_table(
+                "habits",
+                records=[
+                    (
+                        row.id, row.user_id, row.title,
+                        created + timedelta(days=row.first_day), True, "#3B82F6", 21,
+                    )
+                    for row in rows
+                ],
+                columns=["id", "user_id", "title", "created_at", "is_active", "color", "goal_streak"],
+            )
+
+            def trackings():
+                for row in rows:
+                    for status, marked in (("COMPLETED", row.completed), ("SKIPPED", row.skipped)):
+                        for day in marked or ():
+                            yield row.id, date_from + timedelta(days=day), status
+
+            copied = await conn.copy_records_to_table(
+                "habit_tracking", records=trackings(), columns=["habit_id", "date", "status"]
+            )
+            await conn.execute("ANALYZE")
+        finally:
+            await conn.close()
+
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as session:
+            service = AnalyticsService(AnalyticsRepository(session), FakeCache())
+            result = await service.compute_all(today, batch)
+
+        return {
+            "users": result.users,
+            "trackings": int(copied.split()[-1]),
+            "batches": result.batches,
+            "seconds": result.seconds,
+            "users_per_second": round(result.users / result.seconds),
+        }
+    finally:
+        await engine.dispose()
+        if not keep:
+            await drop_database(name)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    date_from = date.today() - timedelta(days=args.days)
+    rows = synthetic_rows(args.users, args.habits, args.days, args.seed)
+    user_ids = list(by_user(rows))
+    checked = set(user_ids[: args.check_users])
+
+    report = {
+        "commit": git_commit(),
+        "config": {
+            "users": args.users,
+            "habits": args.habits,
+            "days": args.days,
+            "batch": args.batch,
+        },
+        "reference": check(
+            [row for row in rows if row.user_id in checked], date_from, args.days
+        ),
+        "matrix": bench_matrix(rows, date_from, args.days, args.batch),
+    }
+    if args.db_users:
+        seeded = set(user_ids[: args.db_users])
+        report["batch"] = await bench_batch(
+            [row for row in rows if row.user_id in seeded], args.days, args.batch, args.keep
+        )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vectorized habit analytics throughput")
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--habits", type=int, default=10, help="Максимум привычек у пользователя")
+    parser.add_argument("--days", type=int, default=182, help="Окно аналитики")
+    parser.add_argument("--batch", type=int, default=500, help="Пользователей в одной матрице")
+    parser.add_argument("--check-users", type=int, default=300, help="Пользователей для сверки с циклом")
+    parser.add_argument("--db-users", type=int, default=0, help="Пользователей для замера с БД; 0 — без БД")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Не удалять базу после прогона")
+    parser.add_argument("--output", help="Файл для JSON-отчёта (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Тепловая карта: компактные кодировки против списка отметок в JSON.
+
+В отдельной базе создаются --users пользователей по --habits привычек
+с отметками за --days дней (доля дней с отметкой — --density). Для
+случайного пользователя замеряется, во что обходится год по всем его
+привычкам в каждой форме ответа:
+    json  — /tracking/{habit_id} на каждую привычку: HabitTrackingResponse
+            с id, заметками и временем создания на каждую отметку
+    bits  — /tracking/heatmap?encoding=bits: base64 по 2 бита на день
+    rle   — /tracking/heatmap?encoding=rle: пары [код, длина серии]
+
+Задержка — вызов сервиса и сериализация ответа, как в эндпоинте, без
+HTTP; размер — байты JSON и они же после gzip.
+
+Перед замерами ответы bits и rle декодируются и сверяются со списком
+отметок.
+
+Запуск (нужен .env, как для приложения, и право CREATEDB):
+    python -m benchmarks.heatmap --users 200 --habits 10
+"""
+import argparse
+import asyncio
+import base64
+import gzip
+import json
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+import asyncpg
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.core.security import Principal
+from app.models import archive, idempotency, leaderboard, revocation  # noqa: F401 — таблицы для create_all
+from app.repositories.habit import HabitRepository
+from app.repositories.tracking import HabitTrackingRepository
+from app.schemas.habit import HabitTrackingResponse, HeatmapEncoding
+from app.services.tracking import HEATMAP_CODES, TrackingService
+from benchmarks.load import git_commit
+from benchmarks.repositories import create_database, drop_database
+
+STATUSES = [("COMPLETED", 0.75), ("FAILED", 0.15), ("SKIPPED", 0.1)]
+NOTES = [None, None, None, "Утром", "Пробежал 5 км за 25 минут"]
+
+history_adapter = TypeAdapter(list[HabitTrackingResponse])
+
+
+async def seed(url: str, args: argparse.Namespace, date_from: date) -> list[Principal]:
+    rng = random.Random(args.seed)
+    users = [
+        Principal(uuid.UUID(int=rng.getrandbits(128), version=4), f"user_{n}@example.com", f"user_{n}")
+        for n in range(args.users)
+    ]
+    conn = await asyncpg.connect(url.replace("+asyncpg", ""))
+    try:
+        await conn.copy_records_to_table(
+            "users",
+            records=[(u.id, u.username, u.email, "-", 0, True) for u in users],
+            columns=["id", "username", "email", "hashed_password", "streak_days", "is_active"],
+        )
+        created = datetime.combine(date_from, datetime.min.time(), timezone.utc)
+        habit_ids = range(1, args.users * args.habits + 1)
+        await conn.copy_records_to_table(
+            "habits",
+            records=[
+                (habit_id, users[(habit_id - 1) // args.habits].id, f"habit_{habit_id}",
+                 created, True, "#3B82F6", 21)
+                for habit_id in habit_ids
+            ],
+            columns=["id", "user_id", "title", "created_at", "is_active", "color", "goal_streak"],
+        )
+        statuses, weights = zip(*STATUSES)
+
+        def trackings():
+            for habit_id in habit_ids:
+                for day in range(args.days):
+                    if rng.random() < args.density:
+                        yield (
+                            habit_id, date_from + timedelta(days=day),
+                            rng.choices(statuses, weights)[0], rng.choice(NOTES),
+                        )
+
+        await conn.copy_records_to_table(
+            "habit_tracking", records=trackings(), columns=["habit_id", "date", "status", "notes"]
+        )
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+    return users
+
+
+def decode_bits(bits: str, days: int) -> list[int]:
+    packed = base64.b64decode(bits)
+    return [(packed[i // 4] >> (2 * (i % 4))) & 3 for i in range(days)]
+
+
+def decode_runs(runs: list[int]) -> list[int]:
+    return [code for code, length in zip(runs[::2], runs[1::2]) for _ in range(length)]
+
+
+async def check(
+    service: TrackingService, users: list[Principal], date_from: date, date_to: date
+) -> int:
+    """Сверяет декодированные bits и rle со списком отметок; возвращает число привычек."""
+    days = (date_to - date_from).days + 1
+    checked = 0
+    for user in users:
+        bits = await service.get_heatmap(user, date_from, date_to, HeatmapEncoding.BITS)
+        rle = await service.get_heatmap(user, date_from, date_to, HeatmapEncoding.RLE)
+        for by_bits, by_runs in zip(bits.habits, rle.habits):
+            expected = [0] * days
+            for tracking in await service.get_history(user, by_bits.habit_id, date_from, date_to):
+                expected[(tracking.date - date_from).days] = HEATMAP_CODES[tracking.status]
+            if decode_bits(by_bits.bits, days) != expected or decode_runs(by_runs.runs) != expected:
+                raise AssertionError(f"Mismatch for habit {by_bits.habit_id}")
+            checked += 1
+    return checked
+
+
+async def measure(call: Callable[[Principal], Awaitable[list[bytes]]], users: list[Principal]) -> dict:
+    latencies, sizes, compressed = [], [], []
+    for user in users:
+        started = time.perf_counter()
+        bodies = await call(user)
+        latencies.append((time.perf_counter() - started) * 1000)
+        sizes.append(sum(len(body) for body in bodies))
+        compressed.append(sum(len(gzip.compress(body)) for body in bodies))
+    latencies.sort()
+    return {
+        "requests_per_user": len(bodies),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+        "bytes": round(statistics.mean(sizes)),
+        "gzip_bytes": round(statistics.mean(compressed)),
+    }
+
+
+async def bench(session: AsyncSession, users: list[Principal], args: argparse.Namespace, date_from: date) -> dict:
+    service = TrackingService(HabitTrackingRepository(session), HabitRepository(session))
+    date_to = date_from + timedelta(days=args.days - 1)
+    rng = random.Random(args.seed)
+    picks = [rng.choice(users) for _ in range(args.rounds)]
+
+    async def as_json(user: Principal) -> list[bytes]:
+        habit_ids = await service.habit_repo.get_owned_ids(
+            user.id, set(range(1, args.users * args.habits + 1))
+        )
+        return [
+            history_adapter.dump_json(
+                await service.get_history(user, habit_id, date_from, date_to)
+            )
+            for habit_id in sorted(habit_ids)
+        ]
+
+    def as_heatmap(encoding: HeatmapEncoding) -> Callable[[Principal], Awaitable[list[bytes]]]:
+        async def call(user: Principal) -> list[bytes]:
+            heatmap = await service.get_heatmap(user, date_from, date_to, encoding)
+            return [heatmap.model_dump_json(exclude_none=True).encode()]
+        return call
+
+    report = {"checked_habits": await check(service, users[: args.check_users], date_from, date_to)}
+    for name, call in (
+        ("json", as_json),
+        ("bits", as_heatmap(HeatmapEncoding.BITS)),
+        ("rle", as_heatmap(HeatmapEncoding.RLE)),
+    ):
+        # Прогрев: первый вызов платит за планирование и кэши
+        await call(picks[0])
+        report[name] = await measure(call, picks)
+    return report
+
+
+async def run(args: argparse.Namespace) -> dict:
+    # Период заканчивается вчера: окно целиком в живых секциях
+    date_from = date.today() - timedelta(days=args.days)
+    name = f"habits_heatmap_{os.getpid()}"
+    url = await create_database(name)
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        users = await seed(url, args, date_from)
+
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            report = await bench(session, users, args, date_from)
+    finally:
+        await engine.dispose()
+        if not args.keep:
+            await drop_database(name)
+
+    return {
+        "commit": git_commit(),
+        "config": {
+            "users": args.users,
+            "habits": args.habits,
+            "days": args.days,
+            "density": args.density,
+            "rounds": args.rounds,
+        },
+        **report,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Heatmap encodings vs JSON tracking list")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--habits", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--density", type=float, default=0.7, help="Доля дней с отметкой")
+    parser.add_argument("--rounds", type=int, default=200, help="Запросов на форму ответа")
+    parser.add_argument("--check-users", type=int, default=20, help="Пользователей для сверки")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Не удалять базу после прогона")
+    parser.add_argument("--output", help="Файл для JSON-отчёта (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
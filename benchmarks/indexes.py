@@ -0,0 +1,313 @@
+"""
+Старый и новый наборы индексов users / habits / habit_tracking на одних данных.
+
+Для каждого набора в одноразовой базе создаются схема (с помесячными
+секциями habit_tracking) и одинаковые данные, строятся индексы и после
+VACUUM ANALYZE снимаются замеры. Отметки генерируются в порядке дат,
+как их пишет приложение, — от этого зависит эффективность BRIN.
+
+Чтение:
+    habit_list    — активные привычки пользователя, новые первыми
+    habit_week    — отметки привычки за 7 дней
+    habit_window  — выполнения за 60 дней (окно серии)
+    week_rollup   — статусы за 7 дней по всем привычкам
+Запись (в откатываемой транзакции):
+    user_insert, habit_insert, checkin (upsert), day_copy (COPY дня отметок)
+
+Prepared statement по секционированной таблице Postgres после пяти вызовов
+может перевести на общий план — или продолжать планировать заново на каждый
+вызов, если общий план по оценке дороже. Для коротких запросов по секциям
+планирование дороже выполнения, поэтому выбор плана виден в цифрах;
+--generic-plans убирает этот фактор из сравнения индексов.
+
+Запуск (нужен .env, как для приложения, и право CREATEDB):
+    python -m benchmarks.indexes --habits 20000 --days 365
+    python -m benchmarks.indexes --generic-plans
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Iterator
+
+import asyncpg
+
+from app.services.partition import add_months, month_start
+from benchmarks.load import git_commit
+from benchmarks.partitions import STATUSES, timed
+from benchmarks.repositories import create_database, drop_database
+
+HABITS_PER_USER = 5
+
+SCHEMA = (
+    """
+    CREATE TABLE users (
+        id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+        username varchar(50) NOT NULL UNIQUE,
+        email varchar(100) NOT NULL UNIQUE,
+        created_at timestamptz NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    CREATE TABLE habits (
+        id serial PRIMARY KEY,
+        user_id uuid NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        title varchar(100) NOT NULL,
+        is_active boolean NOT NULL,
+        created_at timestamptz NOT NULL DEFAULT now(),
+        updated_at timestamptz NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    CREATE TABLE habit_tracking (
+        id serial NOT NULL,
+        habit_id integer NOT NULL,
+        date date NOT NULL,
+        status varchar(9) NOT NULL,
+        created_at timestamptz NOT NULL DEFAULT now(),
+        updated_at timestamptz NOT NULL DEFAULT now(),
+        PRIMARY KEY (id, date)
+    ) PARTITION BY RANGE (date)
+    """,
+    "CREATE TABLE habit_tracking_default PARTITION OF habit_tracking DEFAULT",
+)
+
+# Набор индексов до миграции 7155a36919ce и после неё
+INDEX_SETS = {
+    "before": [
+        "CREATE INDEX ix_users_id ON users (id)",
+        "CREATE INDEX ix_habits_id ON habits (id)",
+        "CREATE INDEX ix_habits_user_id ON habits (user_id)",
+        "CREATE INDEX ix_habits_user_id_updated_at ON habits (user_id, updated_at)",
+        "ALTER TABLE habit_tracking ADD CONSTRAINT uq_habit_tracking_habit_id_date UNIQUE (habit_id, date)",
+        "CREATE INDEX ix_habit_tracking_date ON habit_tracking (date)",
+        "CREATE INDEX ix_habit_tracking_habit_id ON habit_tracking (habit_id)",
+        "CREATE INDEX ix_habit_tracking_id ON habit_tracking (id)",
+        "CREATE INDEX ix_habit_tracking_habit_id_updated_at ON habit_tracking (habit_id, updated_at)",
+    ],
+    "after": [
+        "CREATE INDEX ix_habits_user_id_updated_at ON habits (user_id, updated_at)",
+        "CREATE INDEX ix_habits_user_id_created_at_active ON habits (user_id, created_at DESC) WHERE is_active",
+        "CREATE UNIQUE INDEX ix_habit_tracking_habit_id_date ON habit_tracking (habit_id, date) INCLUDE (status)",
+        "CREATE INDEX ix_habit_tracking_habit_id_updated_at ON habit_tracking (habit_id, updated_at)",
+        "CREATE INDEX ix_habit_tracking_date_brin ON habit_tracking USING brin (date)",
+    ],
+}
+
+
+def tracking_rows(habits: int, first_day: date, last_day: date, rng: random.Random) -> Iterator[tuple]:
+    day = first_day
+    while day <= last_day:
+        stamp = datetime.combine(day, dt_time(20), timezone.utc)
+        for habit_id in range(1, habits + 1):
+            if rng.random() < 0.9:
+                yield (habit_id, day, rng.choice(STATUSES), stamp, stamp)
+        day += timedelta(days=1)
+
+
+async def create_schema(conn: asyncpg.Connection, args: argparse.Namespace, today: date) -> list[uuid.UUID]:
+    for ddl in SCHEMA:
+        await conn.execute(ddl)
+    first_day = today - timedelta(days=args.days)
+    month = month_start(first_day)
+    while month <= add_months(month_start(today), 1):
+        upper = add_months(month, 1)
+        await conn.execute(
+            f"CREATE TABLE habit_tracking_{month:%Y_%m} PARTITION OF habit_tracking "
+            f"FOR VALUES FROM ('{month}') TO ('{upper}')"
+        )
+        month = upper
+
+    rng = random.Random(args.seed)
+    users = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(args.habits // HABITS_PER_USER)]
+    await conn.copy_records_to_table(
+        "users",
+        records=[(user_id, f"user{i}", f"user{i}@example.com") for i, user_id in enumerate(users)],
+        columns=["id", "username", "email"],
+    )
+    created = datetime.combine(first_day, dt_time(9), timezone.utc)
+    await conn.copy_records_to_table(
+        "habits",
+        records=[
+            (
+                users[i // HABITS_PER_USER],
+                f"habit {i}",
+                rng.random() < 0.8,
+                created + timedelta(minutes=i),
+                created + timedelta(minutes=i),
+            )
+            for i in range(len(users) * HABITS_PER_USER)
+        ],
+        columns=["user_id", "title", "is_active", "created_at", "updated_at"],
+    )
+    await conn.copy_records_to_table(
+        "habit_tracking",
+        records=tracking_rows(len(users) * HABITS_PER_USER, first_day, today - timedelta(days=1), rng),
+        columns=["habit_id", "date", "status", "created_at", "updated_at"],
+    )
+    return users
+
+
+async def index_sizes(conn: asyncpg.Connection) -> dict[str, int]:
+    sizes = {}
+    for table in ("users", "habits", "habit_tracking"):
+        sizes[table] = await conn.fetchval(
+            "SELECT coalesce(sum(pg_indexes_size(relid)), pg_indexes_size($1::regclass))::bigint "
+            "FROM pg_partition_tree($1::regclass)",
+            table,
+        )
+    return sizes
+
+
+async def bench_writes(
+    conn: asyncpg.Connection, args: argparse.Namespace, users: list[uuid.UUID], today: date
+) -> dict:
+    rng = random.Random(args.seed)
+    habits = len(users) * HABITS_PER_USER
+    result = {}
+    tx = conn.transaction()
+    await tx.start()
+    try:
+        result["user_insert"] = await timed(
+            conn,
+            "INSERT INTO users (username, email) VALUES ($1, $2)",
+            [(f"new{i}", f"new{i}@example.com") for i in range(args.rounds)],
+            args.rounds,
+        )
+        result["habit_insert"] = await timed(
+            conn,
+            "INSERT INTO habits (user_id, title, is_active) VALUES ($1, 'new', true)",
+            [(rng.choice(users),) for _ in range(args.rounds)],
+            args.rounds,
+        )
+        result["checkin"] = await timed(
+            conn,
+            "INSERT INTO habit_tracking (habit_id, date, status) VALUES ($1, $2, 'COMPLETED') "
+            "ON CONFLICT (habit_id, date) DO UPDATE SET status = excluded.status, updated_at = now()",
+            [(rng.randint(1, habits), today) for _ in range(args.rounds)],
+            args.rounds,
+        )
+        started = time.perf_counter()
+        await conn.copy_records_to_table(
+            "habit_tracking",
+            records=tracking_rows(habits, today + timedelta(days=1), today + timedelta(days=1), rng),
+            columns=["habit_id", "date", "status", "created_at", "updated_at"],
+        )
+        result["day_copy"] = {"seconds": round(time.perf_counter() - started, 3)}
+    finally:
+        await tx.rollback()
+    return result
+
+
+async def bench_reads(
+    conn: asyncpg.Connection, args: argparse.Namespace, users: list[uuid.UUID], today: date
+) -> dict:
+    rng = random.Random(args.seed)
+    habit_ids = [rng.randint(1, len(users) * HABITS_PER_USER) for _ in range(args.rounds)]
+    return {
+        "habit_list": await timed(
+            conn,
+            "SELECT * FROM habits WHERE user_id = $1 AND is_active ORDER BY created_at DESC",
+            [(rng.choice(users),) for _ in range(args.rounds)],
+            args.rounds,
+        ),
+        "habit_week": await timed(
+            conn,
+            "SELECT date, status FROM habit_tracking WHERE habit_id = $1 AND date BETWEEN $2 AND $3",
+            [(habit_id, today - timedelta(days=6), today) for habit_id in habit_ids],
+            args.rounds,
+        ),
+        "habit_window": await timed(
+            conn,
+            "SELECT count(*) FROM habit_tracking "
+            "WHERE habit_id = $1 AND status = 'COMPLETED' AND date >= $2 AND date <= $3",
+            [(habit_id, today - timedelta(days=60), today) for habit_id in habit_ids],
+            args.rounds,
+        ),
+        "week_rollup": await timed(
+            conn,
+            "SELECT status, count(*) FROM habit_tracking WHERE date >= $1 AND date <= $2 GROUP BY status",
+            [(today - timedelta(days=7), today)],
+            max(3, args.rounds // 50),
+        ),
+    }
+
+
+async def bench_set(args: argparse.Namespace, index_set: str, today: date) -> dict:
+    # Своя база на каждый набор: после отката записей и удаления индексов
+    # второй набор заметно медленнее первого, сравнение было бы нечестным
+    name = f"habits_indexes_{index_set}_{os.getpid()}"
+    url = await create_database(name)
+    conn = await asyncpg.connect(url.replace("+asyncpg", ""))
+    try:
+        users = await create_schema(conn, args, today)
+        if args.generic_plans:
+            await conn.execute("SET plan_cache_mode = force_generic_plan")
+        started = time.perf_counter()
+        for create in INDEX_SETS[index_set]:
+            await conn.execute(create)
+        build_seconds = time.perf_counter() - started
+        # VACUUM обновляет карту видимости — без неё не будет index-only scan
+        await conn.execute("VACUUM ANALYZE users, habits, habit_tracking")
+
+        # Первый проход прогревает кеш
+        await bench_reads(conn, args, users, today)
+        return {
+            "build_seconds": round(build_seconds, 2),
+            "index_bytes": await index_sizes(conn),
+            "reads": await bench_reads(conn, args, users, today),
+            "writes": await bench_writes(conn, args, users, today),
+        }
+    finally:
+        await conn.close()
+        if not args.keep:
+            await drop_database(name)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    report = {
+        "commit": git_commit(),
+        "config": {
+            "habits": args.habits,
+            "days": args.days,
+            "rounds": args.rounds,
+            "generic_plans": args.generic_plans,
+        },
+        "sets": {},
+    }
+    today = date.today()
+    for index_set in args.sets:
+        report["sets"][index_set] = await bench_set(args, index_set, today)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Old vs redesigned index set")
+    parser.add_argument("--habits", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=365, help="Глубина истории отметок")
+    parser.add_argument("--rounds", type=int, default=500, help="Запросов на замер")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--generic-plans",
+        action="store_true",
+        help="plan_cache_mode = force_generic_plan: без перепланирования по секциям на каждый вызов",
+    )
+    parser.add_argument("--sets", nargs="+", choices=list(INDEX_SETS), default=list(INDEX_SETS))
+    parser.add_argument("--keep", action="store_true", help="Не удалять базу после прогона")
+    parser.add_argument("--output", help="Файл для JSON-отчёта (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Рейтинги: MemoryLeaderboard (skip list в процессе) против запросов к Postgres.
+
+Рейтинг на --users участников заполняется случайными сериями, после чего
+замеряются операции, которые делает API:
+    load      — начальная загрузка рейтинга (как при старте из снимка)
+    update    — смена очков участника (отметка)
+    rank      — место участника
+    top       — первые --limit мест
+    around    — соседи участника, --radius выше и ниже
+
+Для Postgres те же запросы идут к таблице с индексом (score DESC, user_id):
+первые места читаются по индексу, а место участника — count(*) по всем,
+кто выше, то есть растёт вместе с рейтингом.
+
+Перед замерами ответы skip list сверяются с FakeLeaderboard (сортировка
+на запрос) на небольшой выборке.
+
+Запуск (нужен .env, как для приложения, и право CREATEDB):
+    python -m benchmarks.leaderboard --users 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import statistics
+import time
+import uuid
+from typing import Awaitable, Callable
+
+import asyncpg
+
+from app.core.leaderboard import FakeLeaderboard, MemoryLeaderboard
+from benchmarks.load import git_commit
+from benchmarks.partitions import timed
+from benchmarks.repositories import create_database, drop_database
+
+BOARD = "streak"
+
+
+def random_scores(users: int, seed: int) -> list[tuple[uuid.UUID, float]]:
+    rng = random.Random(seed)
+    # Серии распределены неравномерно: много коротких, мало длинных — много равных очков
+    return [
+        (uuid.UUID(int=rng.getrandbits(128), version=4), float(int(rng.expovariate(1 / 20))))
+        for _ in range(users)
+    ]
+
+
+async def timed_calls(call: Callable[[int], Awaitable], rounds: int) -> dict:
+    latencies = []
+    for i in range(rounds):
+        started = time.perf_counter()
+        await call(i)
+        latencies.append((time.perf_counter() - started) * 1_000_000)
+    latencies.sort()
+    return {
+        "p50_us": round(statistics.median(latencies), 2),
+        "p95_us": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+        "ops_per_second": round(len(latencies) / (sum(latencies) / 1_000_000)),
+    }
+
+
+async def check_against_fake(users: int, seed: int) -> int:
+    """Сверяет ответы MemoryLeaderboard с эталоном; возвращает число проверок."""
+    rng = random.Random(seed)
+    memory, fake = MemoryLeaderboard(), FakeLeaderboard()
+    entries = random_scores(users, seed)
+    checks = 0
+
+    for step in range(users * 3):
+        user_id, _ = rng.choice(entries)
+        if step % 7 == 0:
+            await memory.remove(BOARD, user_id)
+            await fake.remove(BOARD, user_id)
+        else:
+            score = float(rng.randint(0, 30))
+            await memory.set_score(BOARD, user_id, score)
+            await fake.set_score(BOARD, user_id, score)
+
+        if step % 10 == 0:
+            pairs = [
+                (await memory.get(BOARD, user_id), await fake.get(BOARD, user_id)),
+                (await memory.top(BOARD, 10), await fake.top(BOARD, 10)),
+                (await memory.around(BOARD, user_id, 3), await fake.around(BOARD, user_id, 3)),
+                (await memory.size(BOARD), await fake.size(BOARD)),
+            ]
+            for actual, expected in pairs:
+                if actual != expected:
+                    raise AssertionError(f"Mismatch at step {step}: {actual} != {expected}")
+                checks += 1
+    return checks
+
+
+async def bench_memory(entries: list[tuple[uuid.UUID, float]], args: argparse.Namespace) -> dict:
+    board = MemoryLeaderboard()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    board.load(BOARD, entries, None)
+    seconds = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    rng = random.Random(args.seed)
+    picks = [rng.choice(entries)[0] for _ in range(args.rounds)]
+    return {
+        "load": {
+            "entries": len(entries),
+            "seconds": round(seconds, 2),
+            "entries_per_second": round(len(entries) / seconds),
+            # ru_maxrss в Linux — килобайты
+            "rss_growth_mb": round((rss_after - rss_before) / 1024, 1),
+        },
+        "update": await timed_calls(
+            lambda i: board.set_score(BOARD, picks[i], float(rng.randint(0, 200))), args.rounds
+        ),
+        "rank": await timed_calls(lambda i: board.get(BOARD, picks[i]), args.rounds),
+        "top": await timed_calls(lambda i: board.top(BOARD, args.limit), args.rounds),
+        "around": await timed_calls(
+            lambda i: board.around(BOARD, picks[i], args.radius), args.rounds
+        ),
+    }
+
+
+async def bench_postgres(
+    conn: asyncpg.Connection, entries: list[tuple[uuid.UUID, float]], args: argparse.Namespace
+) -> dict:
+    await conn.execute("CREATE TABLE scores (user_id uuid PRIMARY KEY, score float8 NOT NULL)")
+    started = time.perf_counter()
+    await conn.copy_records_to_table("scores", records=entries, columns=["user_id", "score"])
+    await conn.execute("CREATE INDEX ON scores (score DESC, user_id)")
+    await conn.execute("ANALYZE scores")
+    seconds = time.perf_counter() - started
+
+    rng = random.Random(args.seed)
+    picks = [rng.choice(entries) for _ in range(args.rounds)]
+    # Место — число участников выше: с большими очками или с равными и меньшим user_id
+    rank_sql = (
+        "SELECT count(*) FROM scores WHERE score > $1 OR (score = $1 AND user_id < $2)"
+    )
+    return {
+        "load": {
+            "entries": len(entries),
+            "seconds": round(seconds, 2),
+            "entries_per_second": round(len(entries) / seconds),
+        },
+        "update": await timed(
+            conn,
+            "UPDATE scores SET score = $2 WHERE user_id = $1",
+            [(user_id, float(rng.randint(0, 200))) for user_id, _ in picks],
+            args.rounds,
+        ),
+        "rank": await timed(
+            conn, rank_sql, [(score, user_id) for user_id, score in picks], args.pg_rounds
+        ),
+        "top": await timed(
+            conn,
+            "SELECT user_id, score FROM scores ORDER BY score DESC, user_id LIMIT $1",
+            [(args.limit,)],
+            args.rounds,
+        ),
+        "around": await timed(
+            conn,
+            f"SELECT user_id, score FROM scores ORDER BY score DESC, user_id "
+            f"OFFSET greatest(({rank_sql}) - $3, 0) LIMIT $3 * 2 + 1",
+            [(score, user_id, args.radius) for user_id, score in picks],
+            args.pg_rounds,
+        ),
+        "total_bytes": await conn.fetchval("SELECT pg_total_relation_size('scores')"),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    report = {
+        "commit": git_commit(),
+        "config": {
+            "users": args.users,
+            "rounds": args.rounds,
+            "pg_rounds": args.pg_rounds,
+            "limit": args.limit,
+            "radius": args.radius,
+        },
+        "fake_checks": await check_against_fake(args.check_users, args.seed),
+    }
+    entries = random_scores(args.users, args.seed)
+    report["memory"] = await bench_memory(entries, args)
+
+    if not args.skip_postgres:
+        name = f"habits_leaderboard_{os.getpid()}"
+        url = await create_database(name)
+        conn = await asyncpg.connect(url.replace("+asyncpg", ""))
+        try:
+            report["postgres"] = await bench_postgres(conn, entries, args)
+        finally:
+            await conn.close()
+            if not args.keep:
+                await drop_database(name)
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-process leaderboard vs Postgres ranking")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=10_000, help="Операций на замер")
+    parser.add_argument(
+        "--pg-rounds", type=int, default=50, help="Замеров места в Postgres: каждый — O(n)"
+    )
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--radius", type=int, default=5)
+    parser.add_argument("--check-users", type=int, default=2000, help="Участников для сверки")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-postgres", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="Не удалять базу после прогона")
+    parser.add_argument("--output", help="Файл для JSON-отчёта (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Нагрузочный прогон реального ASGI-приложения (app.main.create_application)
+по данным из benchmarks.seed.
+
+Сценарии:
+    login       — шторм входов seeded-пользователей (argon2 + выдача токенов)
+    dashboard   — опрос /dashboard и /habits виртуальными пользователями
+    checkin     — всплески пакетных отметок /tracking/batch
+    export      — полная выгрузка истории через /sync постранично
+
+Приложение по умолчанию работает в том же процессе (httpx.ASGITransport);
+с --url нагрузка идёт на запущенный сервер. Отчёт — JSON с throughput и
+p50/p95/p99 по шаблону маршрута, пригодный для сравнения между коммитами.
+
+Запуск (нужен .env, как для приложения):
+    python -m benchmarks.seed --users 1000 --reset
+    python -m benchmarks.load --users 200 --duration 20 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from datetime import date, datetime, timedelta, timezone
+
+# Все запросы идут с одного адреса — лимиты авторизации отсекли бы шторм входов
+os.environ.setdefault("RATELIMIT_ENABLED", "false")
+
+import httpx
+
+from app.core.config import settings
+from app.main import create_application
+from benchmarks.seed import LOAD_PASSWORD, load_email
+
+SCENARIOS = ("login", "dashboard", "checkin", "export")
+
+
+class Recorder:
+    """Латентности по шаблону маршрута внутри одного сценария."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def request(
+        self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs
+    ) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[route] += 1
+            return None
+
+        self.latencies[route].append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+    def report(self, seconds: float) -> dict:
+        routes = {}
+        for route, samples in sorted(self.latencies.items()):
+            samples.sort()
+            routes[route] = {
+                "requests": len(samples),
+                "errors": self.errors[route],
+                "throughput_rps": round(len(samples) / seconds, 1),
+                "p50_ms": percentile(samples, 50),
+                "p95_ms": percentile(samples, 95),
+                "p99_ms": percentile(samples, 99),
+                "max_ms": round(samples[-1], 2),
+            }
+
+        total = sum(len(samples) for samples in self.latencies.values())
+        return {
+            "seconds": round(seconds, 2),
+            "requests": total,
+            "throughput_rps": round(total / seconds, 1),
+            "routes": routes,
+        }
+
+
+def percentile(sorted_samples: list[float], q: int) -> float:
+    index = min(len(sorted_samples) - 1, round(q / 100 * (len(sorted_samples) - 1)))
+    return round(sorted_samples[index], 2)
+
+
+async def login(client: httpx.AsyncClient, recorder: Recorder, index: int) -> str | None:
+    response = await recorder.request(
+        client, "POST /auth/login", "POST", "/auth/login",
+        json={"email": load_email(index), "password": LOAD_PASSWORD},
+    )
+    if response is None or response.status_code != 200:
+        return None
+    return response.json()["access_token"]
+
+
+async def scenario_login(
+    client: httpx.AsyncClient, users: int, concurrency: int
+) -> tuple[Recorder, list[str]]:
+    """Все пользователи входят одновременно (ограничено concurrency)."""
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> str | None:
+        async with semaphore:
+            return await login(client, recorder, index)
+
+    tokens = await asyncio.gather(*(one(i) for i in range(users)))
+    return recorder, [token for token in tokens if token]
+
+
+async def scenario_dashboard(
+    client: httpx.AsyncClient, tokens: list[str], concurrency: int, duration: float
+) -> Recorder:
+    """Клиенты опрашивают главный экран, как мобильное приложение при открытии."""
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def worker(n: int) -> None:
+        rng = random.Random(n)
+        while time.perf_counter() < deadline:
+            headers = {"Authorization": f"Bearer {rng.choice(tokens)}"}
+            await recorder.request(client, "GET /dashboard", "GET", "/dashboard", headers=headers)
+            await recorder.request(client, "GET /habits", "GET", "/habits", headers=headers)
+
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return recorder
+
+
+async def scenario_checkin(
+    client: httpx.AsyncClient, tokens: list[str], concurrency: int, duration: float
+) -> Recorder:
+    """Всплеск отметок: каждый клиент отмечает свои привычки за последние дни."""
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+    habits: dict[str, list[int]] = {}
+
+    async def worker(n: int) -> None:
+        rng = random.Random(n)
+        while time.perf_counter() < deadline:
+            token = rng.choice(tokens)
+            headers = {"Authorization": f"Bearer {token}"}
+            if token not in habits:
+                response = await recorder.request(
+                    client, "GET /habits", "GET", "/habits", headers=headers
+                )
+                ok = response is not None and response.status_code == 200
+                habits[token] = [habit["id"] for habit in response.json()] if ok else []
+            if not habits[token]:
+                continue
+
+            items = [
+                {
+                    "habit_id": habit_id,
+                    "date": (date.today() - timedelta(days=rng.randint(0, 6))).isoformat(),
+                    "status": rng.choice(["+", "-"]),
+                }
+                for habit_id in habits[token]
+            ]
+            await recorder.request(
+                client, "POST /tracking/batch", "POST", "/tracking/batch",
+                headers=headers, json={"items": items},
+            )
+
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return recorder
+
+
+async def scenario_export(
+    client: httpx.AsyncClient, tokens: list[str], concurrency: int, duration: float
+) -> Recorder:
+    """
+    Полная выгрузка истории пользователя. Отдельного экспорта в API нет,
+    его роль играет /sync без курсора, прочитанный до конца.
+    """
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def worker(n: int) -> None:
+        rng = random.Random(n)
+        while time.perf_counter() < deadline:
+            headers = {"Authorization": f"Bearer {rng.choice(tokens)}"}
+            params = {"limit": 1000}
+            while time.perf_counter() < deadline:
+                response = await recorder.request(
+                    client, "GET /sync", "GET", "/sync", headers=headers, params=params
+                )
+                if response is None or response.status_code != 200:
+                    break
+                page = response.json()
+                if not page["has_more"]:
+                    break
+                params["since"] = page["next_cursor"]
+
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return recorder
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    report = {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.url or "in-process",
+        "config": {
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+        },
+        "scenarios": {},
+    }
+
+    async with AsyncExitStack() as stack:
+        if args.url:
+            transport = None
+            base_url = args.url.rstrip("/") + settings.API_VERSION_STR
+        else:
+            app = create_application()
+            # ASGITransport не запускает lifespan — делаем это сами
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://load" + settings.API_VERSION_STR
+
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(
+                transport=transport,
+                base_url=base_url,
+                limits=httpx.Limits(max_connections=args.concurrency * 2),
+                timeout=60,
+            )
+        )
+
+        # Вход нужен всем сценариям: он же даёт токены остальным
+        started = time.perf_counter()
+        recorder, tokens = await scenario_login(client, args.users, args.concurrency)
+        if "login" in args.scenarios:
+            report["scenarios"]["login"] = recorder.report(time.perf_counter() - started)
+        if not tokens:
+            raise SystemExit("No successful logins, run benchmarks.seed first")
+
+        for name, scenario in (
+            ("dashboard", scenario_dashboard),
+            ("checkin", scenario_checkin),
+            ("export", scenario_export),
+        ):
+            if name not in args.scenarios:
+                continue
+            started = time.perf_counter()
+            recorder = await scenario(client, tokens, args.concurrency, args.duration)
+            report["scenarios"][name] = recorder.report(time.perf_counter() - started)
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the API")
+    parser.add_argument("--users", type=int, default=100, help="Сколько seeded-пользователей входит")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=15, help="Секунд на сценарий")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--url", help="Адрес запущенного сервера вместо прогона в процессе")
+    parser.add_argument("--output", help="Файл для JSON-отчёта (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
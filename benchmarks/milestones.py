@@ -0,0 +1,233 @@
+"""
+Вехи цели: потоковая свёртка по отметке против пакетного replay.
+
+Синтетические потоки --habits привычек за --days дней: выполнение
+держится сериями (цепь Маркова), часть дней без отметки. Замеры:
+    fold      — advance + transition на каждую отметку, как при check-in
+    replay    — итоговые состояния целых потоков одним векторным проходом,
+                как при начальном расчёте
+    backfill  — MilestoneService.backfill по отдельной базе с --db-habits
+                привычками: чтение потоков из Postgres, replay, запись
+    online    — MilestoneService.record одной новой отметки: стоимость не
+                зависит от длины истории, полного пересчёта нет
+
+Перед замерами итоговые состояния replay сверяются со свёрткой.
+
+Запуск (нужен .env, как для приложения, и право CREATEDB):
+    python -m benchmarks.milestones --habits 100000 --db-habits 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.milestone import EPOCH, MilestoneSink, Progress, advance, replay, transition
+from app.models import archive, idempotency, leaderboard, milestone, revocation  # noqa: F401 — таблицы для create_all
+from app.models.habit import HabitStatus
+from app.repositories.milestone import MilestoneRepository
+from app.services.milestone import MilestoneService
+from benchmarks.load import git_commit
+from benchmarks.repositories import create_database, drop_database
+
+GOAL = 21
+
+
+class CountingSink(MilestoneSink):
+    def __init__(self):
+        self.events = 0
+
+    async def emit(self, events) -> None:
+        self.events += len(events)
+
+
+def synthetic_streams(
+    habits: int, days: int, seed: int
+) -> tuple[list[list[int]], list[list[bool]]]:
+    rng = random.Random(seed)
+    start = (date.today() - EPOCH).days - days
+    all_days, all_done = [], []
+    for _ in range(habits):
+        marked, done = [], []
+        keep = rng.uniform(0.8, 0.97)
+        completed = rng.random() < 0.5
+        for day in range(start, start + days):
+            if rng.random() < 0.15:
+                continue
+            if rng.random() > keep:
+                completed = not completed
+            marked.append(day)
+            done.append(completed)
+        all_days.append(marked)
+        all_done.append(done)
+    return all_days, all_done
+
+
+def fold(days: list[int], done: list[bool]) -> tuple[Progress, int]:
+    progress, events = Progress(), 0
+    for day, completed in zip(days, done):
+        progress, reached = transition(
+            progress, advance(progress, EPOCH + timedelta(days=day), completed), GOAL
+        )
+        events += len(reached)
+    return progress, events
+
+
+def check(days: list[list[int]], done: list[list[bool]]) -> dict:
+    started = time.perf_counter()
+    expected = [fold(d, c)[0] for d, c in zip(days, done)]
+    fold_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = replay(days, done)
+    replay_seconds = time.perf_counter() - started
+
+    for i, (a, e) in enumerate(zip(actual, expected)):
+        if a[:3] != e[:3]:
+            raise AssertionError(f"Mismatch for habit {i}: {a} != {e}")
+
+    marks = sum(len(d) for d in days)
+    return {
+        "habits": len(days),
+        "marks": marks,
+        "fold_marks_per_second": round(marks / fold_seconds),
+        "replay_marks_per_second": round(marks / replay_seconds),
+    }
+
+
+async def bench_db(
+    days: list[list[int]], done: list[list[bool]], rounds: int, keep: bool
+) -> dict:
+    name = f"habits_milestones_{os.getpid()}"
+    url = await create_database(name)
+    engine = create_async_engine(url)
+    habit_ids = range(1, len(days) + 1)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        conn = await asyncpg.connect(url.replace("+asyncpg", ""))
+        try:
+            # По 10 привычек на пользователя
+            users = [uuid.uuid4() for _ in range(0, len(days), 10)]
+            await conn.copy_records_to_table(
+                "users",
+                records=[(u, f"user_{n}", f"user_{n}@example.com", "-", 0, True) for n, u in enumerate(users)],
+                columns=["id", "username", "email", "hashed_password", "streak_days", "is_active"],
+            )
+            created = datetime.now(timezone.utc) - timedelta(days=len(days[0]) + 400)
+            await conn.copy_records_to_table(
+                "habits",
+                records=[
+                    (habit_id, users[(habit_id - 1) // 10], f"habit_{habit_id}", created, True, "#3B82F6", GOAL)
+                    for habit_id in habit_ids
+                ],
+                columns=["id", "user_id", "title", "created_at", "is_active", "color", "goal_streak"],
+            )
+
+            def trackings():
+                for habit_id, marked, completed in zip(habit_ids, days, done):
+                    for day, ok in zip(marked, completed):
+                        yield habit_id, EPOCH + timedelta(days=day), "COMPLETED" if ok else "FAILED"
+
+            await conn.copy_records_to_table(
+                "habit_tracking", records=trackings(), columns=["habit_id", "date", "status"]
+            )
+            await conn.execute("VACUUM ANALYZE")
+        finally:
+            await conn.close()
+
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as session:
+            sink = CountingSink()
+            service = MilestoneService(MilestoneRepository(session), sink)
+            result = await service.backfill(settings.milestones.BACKFILL_BATCH)
+
+            # Сохранённые состояния совпадают со свёрткой по каждому потоку
+            saved = await session.execute(
+                text("SELECT habit_id, streak, run_start, last_date FROM habit_progress")
+            )
+            rows = {row.habit_id: row for row in saved}
+            for habit_id, marked, completed in zip(habit_ids, days, done):
+                expected = fold(marked, completed)[0]
+                row = rows[habit_id]
+                if (row.streak, row.run_start, row.last_date) != tuple(expected[:3]):
+                    raise AssertionError(f"Backfill mismatch for habit {habit_id}")
+
+            # Одна новая отметка на следующий день после последней
+            rng = random.Random(0)
+            latencies = []
+            for habit_id in rng.sample(list(habit_ids), min(rounds, len(days))):
+                next_day = EPOCH + timedelta(days=days[habit_id - 1][-1] + 1)
+                started = time.perf_counter()
+                await service.record([(habit_id, next_day, HabitStatus.COMPLETED)])
+                latencies.append((time.perf_counter() - started) * 1000)
+            latencies.sort()
+
+        return {
+            "backfill": {
+                "habits": result.habits,
+                "marks": result.marks,
+                "batches": result.batches,
+                "seconds": result.seconds,
+                "habits_per_second": round(result.habits / result.seconds),
+                "marks_per_second": round(result.marks / result.seconds),
+                "events_sent": sink.events,
+            },
+            "online": {
+                "records": len(latencies),
+                "p50_ms": round(statistics.median(latencies), 2),
+                "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+            },
+        }
+    finally:
+        await engine.dispose()
+        if not keep:
+            await drop_database(name)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    days, done = synthetic_streams(args.habits, args.days, args.seed)
+    report = {
+        "commit": git_commit(),
+        "config": {"habits": args.habits, "days": args.days, "goal": GOAL},
+        "streams": check(days, done),
+    }
+    if args.db_habits:
+        report.update(
+            await bench_db(days[: args.db_habits], done[: args.db_habits], args.rounds, args.keep)
+        )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Streaming milestone fold vs batch replay")
+    parser.add_argument("--habits", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--db-habits", type=int, default=20_000, help="0 — без базы")
+    parser.add_argument("--rounds", type=int, default=500, help="Одиночных отметок для online")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Не удалять базу после прогона")
+    parser.add_argument("--output", help="Файл для JSON-отчёта (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
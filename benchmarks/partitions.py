@@ -0,0 +1,215 @@
+"""
+habit_tracking: обычная таблица против помесячного RANGE-секционирования.
+
+Обе раскладки создаются в одноразовой базе с одинаковыми колонками и
+индексами (как в миграциях), заполняются одинаковыми данными через COPY,
+после чего сравниваются:
+    copy            — массовая загрузка истории (строк в секунду)
+    checkin         — одиночные INSERT ... ON CONFLICT за сегодня
+    habit_week      — отметки привычки за 7 дней (главный экран)
+    habit_window    — выполнения привычки за 60 дней (окно серии)
+    month_rollup    — сводка по статусам за прошлый месяц по всем привычкам
+    habit_history   — вся история привычки: отсечь секции нельзя, видна цена
+                      обхода каждой секции
+
+Запуск (нужен .env, как для приложения, и право CREATEDB):
+    python -m benchmarks.partitions --habits 5000 --days 730
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Iterator
+
+import asyncpg
+
+from app.services.partition import add_months, month_start
+from benchmarks.load import git_commit
+from benchmarks.repositories import create_database, drop_database
+
+LAYOUTS = ("plain", "partitioned")
+STATUSES = ("COMPLETED", "FAILED", "SKIPPED")
+
+COLUMNS = """
+    id serial NOT NULL,
+    habit_id integer NOT NULL,
+    date date NOT NULL,
+    status varchar(9) NOT NULL,
+    notes varchar(500),
+    created_at timestamptz NOT NULL DEFAULT now(),
+    updated_at timestamptz NOT NULL DEFAULT now()
+"""
+
+
+def index_ddl(table: str) -> list[str]:
+    return [
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_habit_id_date_key UNIQUE (habit_id, date)",
+        f"CREATE INDEX ON {table} (habit_id)",
+        f"CREATE INDEX ON {table} (date)",
+        f"CREATE INDEX ON {table} (id)",
+        f"CREATE INDEX ON {table} (habit_id, updated_at)",
+    ]
+
+
+async def create_plain(conn: asyncpg.Connection, first_day: date, today: date) -> None:
+    await conn.execute(f"CREATE TABLE tracking_plain ({COLUMNS}, PRIMARY KEY (id))")
+
+
+async def create_partitioned(conn: asyncpg.Connection, first_day: date, today: date) -> None:
+    await conn.execute(
+        f"CREATE TABLE tracking_partitioned ({COLUMNS}, PRIMARY KEY (id, date)) "
+        "PARTITION BY RANGE (date)"
+    )
+    await conn.execute("CREATE TABLE tracking_partitioned_default PARTITION OF tracking_partitioned DEFAULT")
+    month = month_start(first_day)
+    while month <= add_months(month_start(today), 3):
+        upper = add_months(month, 1)
+        await conn.execute(
+            f"CREATE TABLE tracking_partitioned_{month:%Y_%m} PARTITION OF tracking_partitioned "
+            f"FOR VALUES FROM ('{month}') TO ('{upper}')"
+        )
+        month = upper
+
+
+def tracking_rows(habits: int, days: int, today: date, seed: int) -> Iterator[tuple]:
+    rng = random.Random(seed)
+    for habit_id in range(1, habits + 1):
+        for offset in range(days, 0, -1):
+            if rng.random() < 0.9:
+                day = today - timedelta(days=offset)
+                stamp = datetime.combine(day, dt_time(20), timezone.utc)
+                yield (habit_id, day, rng.choice(STATUSES), stamp, stamp)
+
+
+async def timed(
+    conn: asyncpg.Connection, sql: str, args: list[tuple], rounds: int
+) -> dict:
+    statement = await conn.prepare(sql)
+    latencies = []
+    for i in range(rounds):
+        started = time.perf_counter()
+        await statement.fetch(*args[i % len(args)])
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+        "ops_per_second": round(len(latencies) / (sum(latencies) / 1000)),
+    }
+
+
+async def bench_layout(
+    conn: asyncpg.Connection, layout: str, args: argparse.Namespace, today: date
+) -> dict:
+    table = f"tracking_{layout}"
+    first_day = today - timedelta(days=args.days)
+    create = create_plain if layout == "plain" else create_partitioned
+    await create(conn, first_day, today)
+    result: dict = {}
+
+    # Индексы строятся после загрузки — так же, как в миграции
+    started = time.perf_counter()
+    copied = await conn.copy_records_to_table(
+        table,
+        records=tracking_rows(args.habits, args.days, today, args.seed),
+        columns=["habit_id", "date", "status", "created_at", "updated_at"],
+    )
+    for ddl in index_ddl(table):
+        await conn.execute(ddl)
+    await conn.execute(f"ANALYZE {table}")
+    seconds = time.perf_counter() - started
+    rows = int(copied.split()[-1])
+    result["copy"] = {"rows": rows, "seconds": round(seconds, 2), "rows_per_second": round(rows / seconds)}
+
+    rng = random.Random(args.seed)
+    habit_ids = [(rng.randint(1, args.habits),) for _ in range(args.rounds)]
+    last_month = add_months(month_start(today), -1)
+
+    result["checkin"] = await timed(
+        conn,
+        f"INSERT INTO {table} (habit_id, date, status) VALUES ($1, $2, 'COMPLETED') "
+        "ON CONFLICT (habit_id, date) DO UPDATE SET status = excluded.status, updated_at = now()",
+        [(habit_id, today) for (habit_id,) in habit_ids],
+        args.rounds,
+    )
+    result["habit_week"] = await timed(
+        conn,
+        f"SELECT date, status FROM {table} WHERE habit_id = $1 AND date BETWEEN $2 AND $3",
+        [(habit_id, today - timedelta(days=6), today) for (habit_id,) in habit_ids],
+        args.rounds,
+    )
+    result["habit_window"] = await timed(
+        conn,
+        f"SELECT count(*) FROM {table} "
+        "WHERE habit_id = $1 AND status = 'COMPLETED' AND date >= $2 AND date <= $3",
+        [(habit_id, today - timedelta(days=60), today) for (habit_id,) in habit_ids],
+        args.rounds,
+    )
+    result["month_rollup"] = await timed(
+        conn,
+        f"SELECT status, count(*) FROM {table} WHERE date >= $1 AND date < $2 GROUP BY status",
+        [(last_month, month_start(today))],
+        max(3, args.rounds // 50),
+    )
+    result["habit_history"] = await timed(
+        conn,
+        f"SELECT date, status FROM {table} WHERE habit_id = $1 ORDER BY date",
+        habit_ids,
+        args.rounds,
+    )
+
+    result["total_bytes"] = await conn.fetchval(
+        # Для обычной таблицы pg_partition_tree пуст
+        f"SELECT coalesce(sum(pg_total_relation_size(relid)), pg_total_relation_size('{table}'))::bigint "
+        f"FROM pg_partition_tree('{table}')"
+    )
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict:
+    name = f"habits_partitions_{os.getpid()}"
+    url = await create_database(name)
+    report = {
+        "commit": git_commit(),
+        "config": {"habits": args.habits, "days": args.days, "rounds": args.rounds},
+        "layouts": {},
+    }
+    today = date.today()
+
+    conn = await asyncpg.connect(url.replace("+asyncpg", ""))
+    try:
+        for layout in args.layouts:
+            report["layouts"][layout] = await bench_layout(conn, layout, args, today)
+    finally:
+        await conn.close()
+        if not args.keep:
+            await drop_database(name)
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plain vs partitioned habit_tracking")
+    parser.add_argument("--habits", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=730, help="Глубина истории отметок")
+    parser.add_argument("--rounds", type=int, default=500, help="Запросов на замер")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=list(LAYOUTS))
+    parser.add_argument("--keep", action="store_true", help="Не удалять базу после прогона")
+    parser.add_argument("--output", help="Файл для JSON-отчёта (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
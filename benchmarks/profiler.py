@@ -0,0 +1,162 @@
+"""
+Накладные расходы профилировщика (app.core.profiler) на реальном
+ASGI-приложении в том же процессе.
+
+Режимы:
+    baseline     — middleware профилирования не подключён
+    middleware   — подключён, но запросы без X-Profile
+    background   — работает фоновый сэмплер с --background-interval-ms
+    profiled     — каждый запрос с X-Profile: 1 (сэмплер на запрос)
+
+Маршруты: GET / (почти пустой обработчик — видна фиксированная цена) и
+GET /bench/cpu (обработчик жжёт CPU --cpu-ms миллисекунд — видна цена
+сэмплирования). БД не нужна: токен выпускается локально, а профилирование
+доступно вне production любому аутентифицированному пользователю.
+
+Запуск (нужен .env, как для приложения):
+    python -m benchmarks.profiler --requests 2000 --cpu-ms 5
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+
+os.environ.setdefault("ENVIRONMENT", "development")
+
+import httpx
+
+from app.core.config import settings
+from app.core.profiler import background_profiler
+from app.core.security import create_access_token
+from app.main import create_application
+from benchmarks.load import git_commit, percentile
+
+MODES = ("baseline", "middleware", "background", "profiled")
+
+
+def burn_cpu(ms: float) -> int:
+    deadline = time.perf_counter() + ms / 1000
+    rounds = 0
+    digest = b""
+    while time.perf_counter() < deadline:
+        digest = hashlib.sha256(digest).digest()
+        rounds += 1
+    return rounds
+
+
+def build_app(mode: str, cpu_ms: float):
+    settings.profiling.ENABLED = mode in ("middleware", "profiled")
+    settings.profiling.BACKGROUND_ENABLED = mode == "background"
+    app = create_application()
+
+    async def cpu():
+        return {"rounds": burn_cpu(cpu_ms)}
+
+    app.add_api_route("/bench/cpu", cpu, methods=["GET"])
+    return app
+
+
+async def measure(app, path: str, headers: dict, requests: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        # Прогрев: первый запрос собирает стек middleware
+        await client.get(path, headers=headers)
+
+        async def worker() -> None:
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        seconds = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / seconds, 1),
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    token = create_access_token(
+        {"sub": str(uuid.uuid4()), "email": "bench@example.com", "username": "bench"}
+    )
+    report = {
+        "commit": git_commit(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "cpu_ms": args.cpu_ms,
+            "interval_ms": args.interval_ms,
+            "background_interval_ms": args.background_interval_ms,
+        },
+        "modes": {},
+    }
+    settings.profiling.INTERVAL_MS = args.interval_ms
+    background_profiler.interval_ms = args.background_interval_ms
+
+    for mode in args.modes:
+        app = build_app(mode, args.cpu_ms)
+        headers = {"Authorization": f"Bearer {token}"}
+        if mode == "profiled":
+            headers["X-Profile"] = "1"
+
+        if mode == "background":
+            background_profiler.start()
+        try:
+            report["modes"][mode] = {
+                path: await measure(app, path, headers, args.requests, args.concurrency)
+                for path in ("/", "/bench/cpu")
+            }
+        finally:
+            background_profiler.stop()
+
+    baseline = report["modes"].get("baseline")
+    if baseline:
+        for mode, routes in report["modes"].items():
+            for path, result in routes.items():
+                base_rps = baseline[path]["throughput_rps"]
+                result["overhead_pct"] = round((base_rps / result["throughput_rps"] - 1) * 100, 1)
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure profiler overhead")
+    parser.add_argument("--requests", type=int, default=1000, help="Запросов на маршрут и режим")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--cpu-ms", type=float, default=5.0, help="CPU на запрос /bench/cpu")
+    parser.add_argument("--interval-ms", type=float, default=settings.profiling.INTERVAL_MS)
+    parser.add_argument(
+        "--background-interval-ms", type=float, default=settings.profiling.BACKGROUND_INTERVAL_MS
+    )
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--output", help="Файл для JSON-отчёта (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Микробенчмарки репозиториев и сервисов на одноразовой базе данных.
+
+Для каждого метода фиксируется латентность (p50/p95 по --rounds прогонам).
+Кейсы общие с тестами (tests/repositories/cases.py); бюджеты SQL-выражений
+проверяет pytest, здесь только время.
+
+База создаётся рядом с основной (нужно право CREATEDB) и удаляется после
+прогона; схема строится по моделям.
+
+Запуск (нужен .env, как для приложения):
+    python -m benchmarks.repositories --rounds 30
+    python -m benchmarks.repositories --only habit_service
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.security import get_password_hash
+from app.models import archive, idempotency, leaderboard, milestone, revocation  # noqa: F401 — таблицы для create_all
+from tests.repositories.cases import PASSWORD, Case, Fixture, build_cases, make_fixture
+
+
+async def run_case(
+    case: Case,
+    sessions: async_sessionmaker[AsyncSession],
+    fixture: Fixture,
+    rounds: int,
+) -> dict:
+    latencies = []
+
+    for _ in range(rounds):
+        async with sessions() as session:
+            prepared = await case.prepare(session, fixture) if case.prepare else None
+
+        # Замеряемый вызов — в собственной сессии, как в запросе API
+        async with sessions() as session:
+            started = time.perf_counter()
+            await case.run(session, fixture, prepared)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+    }
+
+
+async def create_database(name: str) -> str:
+    conn = await asyncpg.connect(settings.db.DATABASE_URL.replace("+asyncpg", ""))
+    try:
+        await conn.execute(f'CREATE DATABASE "{name}"')
+    finally:
+        await conn.close()
+    db = settings.db
+    return f"postgresql+asyncpg://{db.USER}:{db.PASS}@{db.HOST}:{db.PORT}/{name}"
+
+
+async def drop_database(name: str) -> None:
+    conn = await asyncpg.connect(settings.db.DATABASE_URL.replace("+asyncpg", ""))
+    try:
+        await conn.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+    finally:
+        await conn.close()
+
+
+async def run(rounds: int, only: str | None, keep: bool) -> dict:
+    name = f"habits_bench_{os.getpid()}"
+    engine = create_async_engine(await create_database(name))
+    results = {}
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as session:
+            fixture = await make_fixture(session, get_password_hash(PASSWORD))
+
+        for case in build_cases():
+            if only and only not in case.name:
+                continue
+            results[case.name] = await run_case(case, sessions, fixture, rounds)
+    finally:
+        await engine.dispose()
+        if not keep:
+            await drop_database(name)
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Repository and service microbenchmarks")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--only", help="Запустить кейсы, в имени которых есть подстрока")
+    parser.add_argument("--keep", action="store_true", help="Не удалять базу после прогона")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rounds, args.only, args.keep))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
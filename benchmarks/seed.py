@@ -0,0 +1,156 @@
+"""
+Синтетические данные для нагрузочных прогонов: пользователи, привычки и
+отметки за заданное число дней, загружаемые через COPY.
+
+Все пользователи получают один пароль (LOAD_PASSWORD), хеш считается один
+раз. Отметки генерируются потоково, память не зависит от объёма данных.
+Повторный запуск с --reset удаляет ранее загруженных пользователей (каскадно).
+
+Запуск (нужен .env, как для приложения, и применённые миграции):
+    python -m benchmarks.seed --users 1000 --habits-per-user 5 --days 730 --reset
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Iterator
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+
+USERNAME_PREFIX = "load_"
+LOAD_PASSWORD = "LoadTest-Passw0rd"
+
+# HabitStatus хранится именами членов enum (native_enum=False)
+STATUSES = ("COMPLETED", "FAILED", "SKIPPED")
+
+
+def load_email(index: int) -> str:
+    return f"{USERNAME_PREFIX}{index}@example.com"
+
+
+def dsn() -> str:
+    return settings.db.DATABASE_URL.replace("+asyncpg", "")
+
+
+def user_rows(users: int, password_hash: str, now: datetime) -> Iterator[tuple]:
+    for i in range(users):
+        yield (uuid.uuid4(), f"{USERNAME_PREFIX}{i}", load_email(i), password_hash, 0, True, now)
+
+
+def tracking_rows(
+    habits: list[tuple[int, date]], today: date, completion_rate: float, rng: random.Random
+) -> Iterator[tuple]:
+    failed_weight = (1 - completion_rate) * 0.8
+    weights = (completion_rate, failed_weight, 1 - completion_rate - failed_weight)
+
+    for habit_id, started in habits:
+        day = started
+        while day <= today:
+            # Пропущенные дни без отметки вообще — как у реальных пользователей
+            if rng.random() < 0.9:
+                status = rng.choices(STATUSES, weights)[0]
+                stamp = datetime.combine(day, dt_time(20), timezone.utc)
+                yield (habit_id, day, status, None, stamp, stamp)
+            day += timedelta(days=1)
+
+
+async def reset(conn: asyncpg.Connection) -> int:
+    result = await conn.execute(
+        "DELETE FROM users WHERE username LIKE $1", f"{USERNAME_PREFIX}%"
+    )
+    return int(result.split()[-1])
+
+
+async def seed(
+    users: int, habits_per_user: int, days: int, completion_rate: float, seed: int, do_reset: bool
+) -> dict:
+    rng = random.Random(seed)
+    today = date.today()
+    now = datetime.now(timezone.utc)
+    stats: dict = {"users": users, "habits_per_user": habits_per_user, "days": days}
+
+    conn = await asyncpg.connect(dsn())
+    try:
+        if do_reset:
+            stats["deleted_users"] = await reset(conn)
+
+        started = time.perf_counter()
+        users_records = list(user_rows(users, get_password_hash(LOAD_PASSWORD), now))
+        await conn.copy_records_to_table(
+            "users",
+            records=users_records,
+            columns=["id", "username", "email", "hashed_password", "streak_days", "is_active", "created_at"],
+        )
+        user_ids = [record[0] for record in users_records]
+
+        # id привычек берём из последовательности заранее, чтобы грузить их COPY
+        habit_count = len(user_ids) * habits_per_user
+        habit_ids = [
+            row[0] for row in await conn.fetch(
+                "SELECT nextval('habits_id_seq') FROM generate_series(1, $1)", habit_count
+            )
+        ]
+        habits = []
+        habit_records = []
+        ids = iter(habit_ids)
+        for user_id in user_ids:
+            for n in range(habits_per_user):
+                habit_id = next(ids)
+                started_on = today - timedelta(days=rng.randint(days // 2, days))
+                stamp = datetime.combine(started_on, dt_time(8), timezone.utc)
+                habits.append((habit_id, started_on))
+                habit_records.append(
+                    (habit_id, user_id, f"Habit {n + 1}", None, stamp, stamp, True, "#3B82F6", 21, None)
+                )
+
+        await conn.copy_records_to_table(
+            "habits",
+            records=habit_records,
+            columns=[
+                "id", "user_id", "title", "description", "created_at", "updated_at",
+                "is_active", "color", "goal_streak", "reminder_time",
+            ],
+        )
+
+        result = await conn.copy_records_to_table(
+            "habit_tracking",
+            records=tracking_rows(habits, today, completion_rate, rng),
+            columns=["habit_id", "date", "status", "notes", "created_at", "updated_at"],
+        )
+        stats["trackings"] = int(result.split()[-1])
+
+        await conn.execute("ANALYZE users, habits, habit_tracking")
+        stats["seconds"] = round(time.perf_counter() - started, 2)
+        stats["rows_per_second"] = round(
+            (len(user_ids) + habit_count + stats["trackings"]) / stats["seconds"]
+        )
+    finally:
+        await conn.close()
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed synthetic load-test data")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--habits-per-user", type=int, default=5)
+    parser.add_argument("--days", type=int, default=365, help="Глубина истории отметок")
+    parser.add_argument("--completion-rate", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Удалить прежние load_* данные")
+    args = parser.parse_args()
+
+    stats = asyncio.run(
+        seed(args.users, args.habits_per_user, args.days, args.completion_rate, args.seed, args.reset)
+    )
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
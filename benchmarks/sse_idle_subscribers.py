@@ -0,0 +1,80 @@
+"""
+Бенчмарк: сколько памяти занимают простаивающие SSE-подписчики одного воркера.
+
+Каждый подписчик — настоящий генератор event_stream с собственной очередью,
+который читается отдельной задачей, как это делает StreamingResponse.
+Стоимость самого HTTP-соединения (буферы uvicorn, сокет) сюда не входит.
+
+Запуск (нужен .env, как для приложения):
+    python -m benchmarks.sse_idle_subscribers --subscribers 10000
+"""
+import argparse
+import asyncio
+import json
+import resource
+import time
+import tracemalloc
+import uuid
+
+from app.core.events import EventHub, event_stream
+
+
+async def consume(hub: EventHub, user_id: uuid.UUID, received: asyncio.Event) -> None:
+    async for chunk in event_stream(hub, user_id, heartbeat=3600):
+        if chunk.startswith("event:"):
+            received.set()
+
+
+async def run(subscribers: int, queue_size: int) -> dict:
+    hub = EventHub(queue_size)
+    user_ids = [uuid.uuid4() for _ in range(subscribers)]
+    received = [asyncio.Event() for _ in range(subscribers)]
+
+    tracemalloc.start()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    tasks = [
+        asyncio.create_task(consume(hub, user_id, event))
+        for user_id, event in zip(user_ids, received)
+    ]
+    # Даём всем генераторам дойти до ожидания очереди
+    await asyncio.sleep(0.5)
+
+    current, peak = tracemalloc.get_traced_memory()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for user_id in user_ids:
+        await hub.publish(user_id, "habit.updated", {"id": 1})
+    await asyncio.gather(*(event.wait() for event in received))
+    fanout_seconds = time.perf_counter() - started
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        "subscribers": subscribers,
+        "python_heap_mb": round((current - baseline) / 2**20, 2),
+        "python_heap_per_subscriber_kb": round((current - baseline) / subscribers / 1024, 2),
+        "python_heap_peak_mb": round((peak - baseline) / 2**20, 2),
+        "max_rss_growth_mb": round((rss_after - rss_before) / 1024, 2),
+        "fanout_seconds": round(fanout_seconds, 3),
+        "events_per_second": round(subscribers / fanout_seconds),
+        "hub_stats_after_close": hub.stats,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--queue-size", type=int, default=100)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.subscribers, args.queue_size)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
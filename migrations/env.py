@@ -1,3 +1,4 @@
+import re
 from logging.config import fileConfig
 
 from alembic import context
@@ -5,8 +6,13 @@ from sqlalchemy import engine_from_config, pool
 
 from app.core.config import settings
 from app.core.database import Base
-from app.models.habit import Habit, HabitTracking
-from app.models.user import User
+from app.models.archive import ARCHIVE_SCHEMA, ArchivedHabit, ArchivedHabitTracking
+from app.models.habit import Habit, HabitTracking, HabitTrackingTombstone
+from app.models.idempotency import IdempotencyKey
+from app.models.leaderboard import LeaderboardScore
+from app.models.milestone import HabitProgress
+from app.models.revocation import RevokedToken, TokenWatermark
+from app.models.user import User, UserDeletion
 
 
 # this is the Alembic Config object, which provides
@@ -27,6 +33,22 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Секции habit_tracking создаёт задача обслуживания, в моделях их нет
+PARTITION_TABLE = re.compile(r"^habit_tracking_(\d{4}_\d{2}|default)$")
+
+
+def include_name(name, type_, parent_names):
+    # Кроме схемы по умолчанию сравниваем только архивную
+    if type_ == "schema":
+        return name in (None, ARCHIVE_SCHEMA)
+    return True
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and reflected and compare_to is None:
+        return not PARTITION_TABLE.match(name)
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -49,6 +71,9 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_schemas=True,
+        include_name=include_name,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -71,7 +96,13 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_schemas=True,
+            include_name=include_name,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
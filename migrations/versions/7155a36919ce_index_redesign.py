@@ -0,0 +1,97 @@
+"""index redesign: drop duplicates of primary keys, composite and BRIN indexes
+
+Revision ID: 7155a36919ce
+Revises: 9ffa01f78722
+Create Date: 2026-10-19 15:02:47.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7155a36919ce'
+down_revision: Union[str, Sequence[str], None] = '9ffa01f78722'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Индексы по ведущей колонке других индексов: поиск по ней уже обслуживают
+# первичные ключи, ix_habits_user_id_updated_at и уникальный (habit_id, date)
+REDUNDANT_INDEXES = ('ix_users_id', 'ix_habits_id', 'ix_habits_user_id')
+REDUNDANT_TRACKING_INDEXES = (
+    'ix_habit_tracking_id', 'ix_habit_tracking_habit_id', 'ix_habit_tracking_date',
+)
+
+# Имя индекса на родителе -> (суффикс имени на секции, определение)
+TRACKING_INDEXES = {
+    'ix_habit_tracking_habit_id_date': (
+        'habit_id_date_status_idx', 'UNIQUE INDEX', 'USING btree (habit_id, date) INCLUDE (status)',
+    ),
+    'ix_habit_tracking_date_brin': (
+        'date_brin_idx', 'INDEX', 'USING brin (date)',
+    ),
+}
+
+
+def _tracking_partitions() -> list[str]:
+    return list(op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'habit_tracking'::regclass ORDER BY c.relname"
+    )).scalars())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.execute(sa.text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_habits_user_id_created_at_active "
+            "ON habits (user_id, created_at DESC) WHERE is_active"
+        ))
+        for name in REDUNDANT_INDEXES:
+            op.execute(sa.text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+        # На секционированной таблице CONCURRENTLY недоступен: индекс
+        # родителя создаётся пустым (ON ONLY), строится на каждой секции
+        # отдельно и подключается — после последней секции он становится валидным
+        partitions = _tracking_partitions()
+        for name, (suffix, kind, definition) in TRACKING_INDEXES.items():
+            op.execute(sa.text(
+                f"CREATE {kind} IF NOT EXISTS {name} ON ONLY habit_tracking {definition}"
+            ))
+            for partition in partitions:
+                op.execute(sa.text(
+                    f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {partition}_{suffix} "
+                    f"ON {partition} {definition}"
+                ))
+                op.execute(sa.text(f"ALTER INDEX {name} ATTACH PARTITION {partition}_{suffix}"))
+
+        # Новый уникальный индекс уже обслуживает ON CONFLICT (habit_id, date)
+        op.execute(sa.text(
+            "ALTER TABLE habit_tracking DROP CONSTRAINT IF EXISTS uq_habit_tracking_habit_id_date"
+        ))
+        for name in REDUNDANT_TRACKING_INDEXES:
+            op.execute(sa.text(f"DROP INDEX IF EXISTS {name}"))
+
+    op.execute(sa.text("ANALYZE habits"))
+    op.execute(sa.text("ANALYZE habit_tracking"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_habit_tracking_date', 'habit_tracking', ['date'], unique=False)
+    op.create_index('ix_habit_tracking_habit_id', 'habit_tracking', ['habit_id'], unique=False)
+    op.create_index('ix_habit_tracking_id', 'habit_tracking', ['id'], unique=False)
+    op.create_unique_constraint(
+        'uq_habit_tracking_habit_id_date', 'habit_tracking', ['habit_id', 'date']
+    )
+    # Вместе с индексами родителя удаляются и индексы секций
+    op.drop_index('ix_habit_tracking_date_brin', table_name='habit_tracking')
+    op.drop_index('ix_habit_tracking_habit_id_date', table_name='habit_tracking')
+
+    op.create_index('ix_habits_user_id', 'habits', ['user_id'], unique=False)
+    op.create_index('ix_habits_id', 'habits', ['id'], unique=False)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.drop_index('ix_habits_user_id_created_at_active', table_name='habits')
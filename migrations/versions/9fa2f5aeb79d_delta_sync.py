@@ -0,0 +1,58 @@
+"""delta sync: updated_at columns and tracking tombstones
+
+Revision ID: 9fa2f5aeb79d
+Revises: d2c35a8aa55b
+Create Date: 2026-10-19 11:03:52.604917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9fa2f5aeb79d'
+down_revision: Union[str, Sequence[str], None] = 'd2c35a8aa55b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('habits', 'habit_tracking'):
+        op.add_column(table, sa.Column(
+            'updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False
+        ))
+        # Существующие строки считаем изменёнными в момент создания
+        op.execute(sa.text(f"UPDATE {table} SET updated_at = created_at"))
+
+    op.create_index('ix_habits_user_id_updated_at', 'habits', ['user_id', 'updated_at'], unique=False)
+    op.create_index(
+        'ix_habit_tracking_habit_id_updated_at', 'habit_tracking', ['habit_id', 'updated_at'], unique=False
+    )
+
+    op.create_table('habit_tracking_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('habit_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['habit_id'], ['habits.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_habit_tracking_tombstones_user_id_deleted_at',
+        'habit_tracking_tombstones', ['user_id', 'deleted_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_habit_tracking_tombstones_user_id_deleted_at', table_name='habit_tracking_tombstones')
+    op.drop_table('habit_tracking_tombstones')
+    op.drop_index('ix_habit_tracking_habit_id_updated_at', table_name='habit_tracking')
+    op.drop_index('ix_habits_user_id_updated_at', table_name='habits')
+    op.drop_column('habit_tracking', 'updated_at')
+    op.drop_column('habits', 'updated_at')
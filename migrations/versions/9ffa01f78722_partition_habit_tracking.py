@@ -0,0 +1,104 @@
+"""partition habit_tracking by month of date
+
+Revision ID: 9ffa01f78722
+Revises: c5d3075629d0
+Create Date: 2026-10-19 12:40:11.532810
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9ffa01f78722'
+down_revision: Union[str, Sequence[str], None] = 'c5d3075629d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Секции создаются на MAX_HISTORY_YEARS назад и MONTHS_AHEAD вперёд;
+# более старые и более поздние отметки попадают в секцию по умолчанию
+MAX_HISTORY_YEARS = 10
+MONTHS_AHEAD = 3
+
+
+def _create_constraints_and_indexes() -> None:
+    op.create_foreign_key(
+        'habit_tracking_habit_id_fkey', 'habit_tracking', 'habits',
+        ['habit_id'], ['id'], ondelete='CASCADE',
+    )
+    op.create_unique_constraint(
+        'uq_habit_tracking_habit_id_date', 'habit_tracking', ['habit_id', 'date']
+    )
+    op.create_index('ix_habit_tracking_date', 'habit_tracking', ['date'], unique=False)
+    op.create_index('ix_habit_tracking_habit_id', 'habit_tracking', ['habit_id'], unique=False)
+    op.create_index('ix_habit_tracking_id', 'habit_tracking', ['id'], unique=False)
+    op.create_index(
+        'ix_habit_tracking_habit_id_updated_at', 'habit_tracking', ['habit_id', 'updated_at'], unique=False
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Новая таблица наследует колонки и default id (общая последовательность)
+    op.execute(sa.text(
+        "CREATE TABLE habit_tracking_partitioned "
+        "(LIKE habit_tracking INCLUDING DEFAULTS) PARTITION BY RANGE (date)"
+    ))
+    op.execute(sa.text(
+        "CREATE TABLE habit_tracking_default PARTITION OF habit_tracking_partitioned DEFAULT"
+    ))
+    op.execute(sa.text(
+        f"""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    greatest(
+                        date_trunc('month', coalesce(min(date), current_date)),
+                        date_trunc('year', current_date) - interval '{MAX_HISTORY_YEARS} years'
+                    ),
+                    date_trunc('month', current_date) + interval '{MONTHS_AHEAD} months',
+                    interval '1 month'
+                )::date
+                FROM habit_tracking
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF habit_tracking_partitioned FOR VALUES FROM (%L) TO (%L)',
+                    'habit_tracking_' || to_char(month, 'YYYY_MM'),
+                    month,
+                    (month + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+        """
+    ))
+
+    # Данные переносятся до создания индексов: построить индекс на
+    # заполненной секции быстрее, чем поддерживать его при вставке
+    op.execute(sa.text("INSERT INTO habit_tracking_partitioned SELECT * FROM habit_tracking"))
+    op.execute(sa.text("ALTER SEQUENCE habit_tracking_id_seq OWNED BY habit_tracking_partitioned.id"))
+    op.drop_table('habit_tracking')
+    op.rename_table('habit_tracking_partitioned', 'habit_tracking')
+
+    op.create_primary_key('habit_tracking_pkey', 'habit_tracking', ['id', 'date'])
+    _create_constraints_and_indexes()
+    op.execute(sa.text("ANALYZE habit_tracking"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.text(
+        "CREATE TABLE habit_tracking_plain (LIKE habit_tracking INCLUDING DEFAULTS)"
+    ))
+    op.execute(sa.text("INSERT INTO habit_tracking_plain SELECT * FROM habit_tracking"))
+    op.execute(sa.text("ALTER SEQUENCE habit_tracking_id_seq OWNED BY habit_tracking_plain.id"))
+    # Вместе с родительской таблицей удаляются и все секции
+    op.drop_table('habit_tracking')
+    op.rename_table('habit_tracking_plain', 'habit_tracking')
+
+    op.create_primary_key('habit_tracking_pkey', 'habit_tracking', ['id'])
+    _create_constraints_and_indexes()
@@ -0,0 +1,42 @@
+"""habit_tracking unique (habit_id, date)
+
+Revision ID: d2c35a8aa55b
+Revises: a45b82feb994
+Create Date: 2026-10-19 10:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2c35a8aa55b'
+down_revision: Union[str, Sequence[str], None] = 'a45b82feb994'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Оставляем последнюю отметку за день, иначе ограничение не создать
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM habit_tracking t
+            USING habit_tracking newer
+            WHERE t.habit_id = newer.habit_id
+              AND t.date = newer.date
+              AND t.id < newer.id
+            """
+        )
+    )
+    op.create_unique_constraint(
+        'uq_habit_tracking_habit_id_date', 'habit_tracking', ['habit_id', 'date']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_habit_tracking_habit_id_date', 'habit_tracking', type_='unique')
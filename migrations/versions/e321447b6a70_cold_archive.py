@@ -0,0 +1,130 @@
+"""cold archive for inactive habits and aged tracking partitions
+
+Revision ID: e321447b6a70
+Revises: 7155a36919ce
+Create Date: 2026-10-19 17:21:06.904153
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e321447b6a70'
+down_revision: Union[str, Sequence[str], None] = '7155a36919ce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ARCHIVE_SCHEMA = 'archive'
+MONTH_PARTITION = re.compile(r'^habit_tracking_(\d{4})_(\d{2})$')
+
+HABIT_COLUMNS = (
+    'id, user_id, title, description, created_at, updated_at, '
+    'is_active, color, goal_streak, reminder_time'
+)
+TRACKING_COLUMNS = 'id, habit_id, date, status, notes, created_at, updated_at'
+
+
+def _detached_partitions() -> list[tuple[str, str, str]]:
+    """Секции, отключённые задачей обслуживания до появления архивной таблицы."""
+    names = op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = :schema AND c.relkind = 'r' AND NOT c.relispartition "
+        "ORDER BY c.relname"
+    ), {'schema': ARCHIVE_SCHEMA}).scalars()
+
+    partitions = []
+    for name in names:
+        match = MONTH_PARTITION.match(name)
+        if match is None:
+            continue
+        year, month = int(match.group(1)), int(match.group(2))
+        upper = f'{year + month // 12}-{month % 12 + 1:02d}-01'
+        partitions.append((name, f'{year}-{month:02d}-01', upper))
+    return partitions
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.text(f'CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}'))
+
+    op.create_table('habits',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('color', sa.String(length=7), nullable=False),
+    sa.Column('goal_streak', sa.Integer(), nullable=False),
+    sa.Column('reminder_time', sa.Time(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    schema=ARCHIVE_SCHEMA,
+    )
+    op.create_index('ix_archive_habits_user_id', 'habits', ['user_id'], unique=False, schema=ARCHIVE_SCHEMA)
+
+    op.create_table('habit_tracking',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('habit_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('status', sa.Enum('COMPLETED', 'FAILED', 'SKIPPED', name='habitstatus', native_enum=False), nullable=False),
+    sa.Column('notes', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'date'),
+    schema=ARCHIVE_SCHEMA,
+    postgresql_partition_by='RANGE (date)',
+    )
+    op.create_index(
+        'ix_archive_habit_tracking_habit_id_date', 'habit_tracking', ['habit_id', 'date'],
+        unique=True, postgresql_include=['status'], schema=ARCHIVE_SCHEMA,
+    )
+    op.execute(sa.text(
+        f'CREATE TABLE {ARCHIVE_SCHEMA}.habit_tracking_default '
+        f'PARTITION OF {ARCHIVE_SCHEMA}.habit_tracking DEFAULT'
+    ))
+
+    # Отключённая секция сохранила внешний ключ на habits: с ним архивация
+    # привычки каскадно удалила бы её архивные отметки
+    for name, lower, upper in _detached_partitions():
+        op.execute(sa.text(
+            f'ALTER TABLE {ARCHIVE_SCHEMA}.{name} DROP CONSTRAINT IF EXISTS habit_tracking_habit_id_fkey'
+        ))
+        op.execute(sa.text(
+            f'ALTER TABLE {ARCHIVE_SCHEMA}.habit_tracking ATTACH PARTITION {ARCHIVE_SCHEMA}.{name} '
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Архивные привычки возвращаются в горячие таблицы неактивными
+    op.execute(sa.text(
+        f'INSERT INTO habits ({HABIT_COLUMNS}) '
+        f'SELECT {HABIT_COLUMNS} FROM {ARCHIVE_SCHEMA}.habits'
+    ))
+    op.execute(sa.text(
+        f'INSERT INTO habit_tracking ({TRACKING_COLUMNS}) '
+        f'SELECT {TRACKING_COLUMNS} FROM {ARCHIVE_SCHEMA}.habit_tracking '
+        f'WHERE habit_id IN (SELECT id FROM {ARCHIVE_SCHEMA}.habits)'
+    ))
+
+    # Секции по сроку хранения остаются отдельными таблицами архивной схемы
+    partitions = op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:parent AS regclass) AND c.relname <> 'habit_tracking_default'"
+    ), {'parent': f'{ARCHIVE_SCHEMA}.habit_tracking'}).scalars().all()
+    for name in partitions:
+        op.execute(sa.text(
+            f'ALTER TABLE {ARCHIVE_SCHEMA}.habit_tracking DETACH PARTITION {ARCHIVE_SCHEMA}.{name}'
+        ))
+
+    op.drop_table('habit_tracking', schema=ARCHIVE_SCHEMA)
+    op.drop_index('ix_archive_habits_user_id', table_name='habits', schema=ARCHIVE_SCHEMA)
+    op.drop_table('habits', schema=ARCHIVE_SCHEMA)
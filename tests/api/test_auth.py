@@ -0,0 +1,27 @@
+from app.core.security import create_access_token, create_refresh_token, decode_token
+
+
+def tokens(headers: dict[str, str]) -> tuple[str, str]:
+    access = headers["Authorization"].removeprefix("Bearer ")
+    claims = {key: decode_token(access)[key] for key in ("sub", "email", "username")}
+    return create_access_token(claims), create_refresh_token(claims)
+
+
+async def test_refresh_token_is_not_a_bearer_token(client, make_user):
+    access, refresh = tokens(await make_user(habits=0))
+
+    response = await client.get("/auth/me", headers={"Authorization": f"Bearer {refresh}"})
+    assert response.status_code == 401
+
+    response = await client.get("/auth/me", headers={"Authorization": f"Bearer {access}"})
+    assert response.status_code == 200
+
+
+async def test_access_token_cannot_refresh(client, make_user):
+    access, refresh = tokens(await make_user(habits=0))
+
+    response = await client.post("/auth/refresh", json={"refresh_token": access})
+    assert response.status_code == 401
+
+    response = await client.post("/auth/refresh", json={"refresh_token": refresh})
+    assert response.status_code == 200
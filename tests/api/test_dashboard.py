@@ -0,0 +1,39 @@
+import pytest
+
+# Экран «Сегодня» собирается одним запросом при любом числе привычек и отметок
+DASHBOARD_STATEMENTS = 1
+
+
+@pytest.mark.parametrize("habits", [1, 10])
+async def test_dashboard_statement_count_is_bounded(client, make_user, statements, habits):
+    headers = await make_user(habits)
+
+    with statements:
+        response = await client.get("/dashboard", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == habits
+    assert statements.count == DASHBOARD_STATEMENTS, statements.statements
+
+
+async def test_dashboard_failed_today_breaks_streak(client, make_user):
+    headers = await make_user(habits=1, days=7)
+
+    response = await client.get("/dashboard", headers=headers)
+
+    [habit] = response.json()
+    assert [day["status"] for day in habit["last_days"]] == ["-", "+", "+", "-", "+", "+", "-"]
+    assert habit["today_status"] == "-"
+    assert habit["current_streak"] == 0
+
+
+async def test_dashboard_keeps_yesterday_streak_until_marked(client, make_user):
+    headers = await make_user(habits=1, days=7, days_ago=1)
+
+    response = await client.get("/dashboard", headers=headers)
+
+    [habit] = response.json()
+    assert [day["status"] for day in habit["last_days"]] == ["-", "+", "+", "-", "+", "+", None]
+    assert habit["today_status"] is None
+    # Серия, закончившаяся вчера, ещё не прервана
+    assert habit["current_streak"] == 2
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+
+async def create_habit(client, headers, title: str) -> int:
+    response = await client.post("/habits", json={"title": title}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def test_batch_rejects_duplicate_check_ins(client, make_user):
+    headers = await make_user(habits=0)
+    habit_id = await create_habit(client, headers, "Чтение")
+    today = date.today().isoformat()
+
+    response = await client.post(
+        "/tracking/batch",
+        json={
+            "items": [
+                {"habit_id": habit_id, "date": today, "status": "+"},
+                {"habit_id": habit_id, "date": today, "status": "-"},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == 422
+
+    history = await client.get(
+        f"/tracking/{habit_id}",
+        params={"date_from": today, "date_to": today},
+        headers=headers,
+    )
+    assert history.json() == []
+
+
+async def test_user_streak_ignores_inactive_habits(client, make_user):
+    headers = await make_user(habits=0)
+    dropped = await create_habit(client, headers, "Бег")
+    kept = await create_habit(client, headers, "Чтение")
+    today = date.today()
+
+    response = await client.post(
+        "/tracking/batch",
+        json={
+            "items": [
+                {"habit_id": dropped, "date": (today - timedelta(days=1)).isoformat(), "status": "+"},
+                {"habit_id": dropped, "date": today.isoformat(), "status": "+"},
+                {"habit_id": kept, "date": today.isoformat(), "status": "+"},
+            ]
+        },
+        headers=headers,
+    )
+    assert response.json()["streak_days"] == 2
+
+    assert (await client.delete(f"/habits/{dropped}", headers=headers)).status_code == 204
+    response = await client.post(
+        "/tracking/batch",
+        json={"items": [{"habit_id": kept, "date": today.isoformat(), "status": "+"}]},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["streak_days"] == 1
@@ -0,0 +1,150 @@
+"""
+Общие фикстуры. Окружение задаётся до импорта приложения: настройки
+читаются один раз при импорте app.core.config. Бэкенды — внутрипроцессные
+fake, база — отдельная TEST_DB_NAME, которая строится по моделям на время
+сессии; без доступного Postgres тесты с базой пропускаются.
+"""
+import os
+
+os.environ.update(
+    DB_NAME=os.environ.get("TEST_DB_NAME", "habits_test"),
+    CACHE_BACKEND="fake",
+    EVENTS_BACKEND="memory",
+    LEADERBOARD_BACKEND="fake",
+    REVOCATION_BACKEND="fake",
+    RATELIMIT_ENABLED="false",
+    MILESTONES_SINK="log",
+    WEB_CONCURRENCY="1",
+)
+
+import uuid  # noqa: E402
+from datetime import date, timedelta  # noqa: E402
+
+import asyncpg  # noqa: E402
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.core.security import Principal, create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import archive, idempotency, leaderboard, milestone, revocation  # noqa: E402,F401 — таблицы для create_all
+from app.models.habit import Habit, HabitStatus, HabitTracking  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+async def _admin_execute(statement: str) -> None:
+    db = settings.db
+    conn = await asyncpg.connect(
+        host=db.HOST, port=db.PORT, user=db.USER, password=db.PASS, database="postgres"
+    )
+    try:
+        await conn.execute(statement)
+    finally:
+        await conn.close()
+
+
+@pytest.fixture(scope="session")
+async def database():
+    name = settings.db.NAME
+    try:
+        await _admin_execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+        await _admin_execute(f'CREATE DATABASE "{name}"')
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"Postgres is not available: {e}")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+
+    await engine.dispose()
+    await _admin_execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+
+
+@pytest.fixture
+async def session(database):
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+async def client(database):
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url=f"http://test{settings.API_VERSION_STR}",
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+async def make_user(session):
+    """
+    Пользователь с привычками и отметками за days дней, последняя — days_ago
+    дней назад; каждая третья отметка — невыполнение. Возвращает заголовки
+    авторизации.
+    """
+
+    async def make(habits: int, days: int = 7, days_ago: int = 0) -> dict[str, str]:
+        user = User(
+            username=f"user_{uuid.uuid4().hex[:12]}",
+            email=f"{uuid.uuid4().hex[:12]}@example.com",
+            hashed_password="-",
+        )
+        session.add(user)
+        await session.flush()
+
+        today = date.today()
+        for n in range(habits):
+            habit = Habit(user_id=user.id, title=f"habit_{n}")
+            session.add(habit)
+            await session.flush()
+            session.add_all(
+                HabitTracking(
+                    habit_id=habit.id,
+                    date=today - timedelta(days=offset),
+                    status=HabitStatus.COMPLETED if offset % 3 else HabitStatus.FAILED,
+                )
+                for offset in range(days_ago, days_ago + days)
+            )
+        await session.commit()
+
+        principal = Principal(user.id, user.email, user.username)
+        token = create_access_token(
+            {"sub": str(principal.id), "email": principal.email, "username": principal.username}
+        )
+        return {"Authorization": f"Bearer {token}"}
+
+    return make
+
+
+class StatementCounter:
+    """Выражения, отправленные драйверу, пока счётчик включён."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+        self.enabled = False
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if self.enabled:
+            self.statements.append(statement)
+
+    def __enter__(self) -> "StatementCounter":
+        self.statements.clear()
+        self.enabled = True
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.enabled = False
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def statements(database):
+    counter = StatementCounter()
+    event.listen(database.sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(database.sync_engine, "before_cursor_execute", counter)
@@ -0,0 +1,202 @@
+"""
+Кейсы бюджета SQL-выражений для методов репозиториев и сервисов.
+
+Каждый кейс — вызов метода в собственной сессии, как в запросе API, и
+предельное число выражений, отправленных драйверу. Бюджеты проверяет
+test_statement_budgets.py: N+1 и лишние refresh ловятся тестами. Те же
+кейсы замеряет по времени python -m benchmarks.repositories.
+"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import FakeCache
+from app.core.security import create_access_token
+from app.models.habit import HabitStatus, HabitTracking
+from app.models.user import User
+from app.repositories.habit import HabitRepository
+from app.repositories.sync import SyncRepository
+from app.repositories.tracking import HabitTrackingRepository
+from app.repositories.user import UserRepository
+from app.schemas.auth import LoginRequest
+from app.schemas.habit import (
+    HabitCreate,
+    HabitTrackingBatchCreate,
+    HabitTrackingCreate,
+    HabitUpdate,
+)
+from app.schemas.user import UserCreate
+from app.services.auth import AuthService
+from app.services.habit import HabitService
+from app.services.sync import SyncService
+from app.services.tracking import TrackingService
+
+PASSWORD = "Bench-Passw0rd"
+HISTORY_DAYS = 60
+HABITS_PER_USER = 5
+
+
+@dataclass
+class Fixture:
+    """Пользователь с привычками и историей отметок; общий для всех кейсов."""
+
+    user: User
+    habit_ids: list[int]
+    token: str
+    password_hash: str
+    cache: FakeCache = field(default_factory=FakeCache)
+
+
+@dataclass
+class Case:
+    name: str
+    budget: int
+    run: Callable[[AsyncSession, Fixture, Any], Awaitable[Any]]
+    # Подготовка перед каждым прогоном, в замеры не входит
+    prepare: Callable[[AsyncSession, Fixture], Awaitable[Any]] | None = None
+
+
+def unique(prefix: str) -> str:
+    return f"{prefix}{uuid.uuid4().hex[:12]}"
+
+
+async def make_user(session: AsyncSession, password_hash: str) -> User:
+    name = unique("bench_")
+    return await UserRepository(session).create(
+        {"username": name, "email": f"{name}@example.com", "hashed_password": password_hash}
+    )
+
+
+async def make_fixture(session: AsyncSession, password_hash: str) -> Fixture:
+    user = await make_user(session, password_hash)
+    habit_repo = HabitRepository(session)
+    habit_ids = [
+        (await habit_repo.create(user.id, {"title": f"Habit {n}"})).id
+        for n in range(HABITS_PER_USER)
+    ]
+
+    today = date.today()
+    rows = [
+        {
+            "habit_id": habit_id,
+            "date": today - timedelta(days=day),
+            "status": HabitStatus.COMPLETED if day % 7 else HabitStatus.FAILED,
+        }
+        for habit_id in habit_ids
+        for day in range(HISTORY_DAYS)
+    ]
+    await session.execute(insert(HabitTracking).values(rows))
+    await session.commit()
+
+    token = create_access_token({"sub": str(user.id), "email": user.email, "username": user.username})
+    return Fixture(user, habit_ids, token, password_hash)
+
+
+def owned_ids(owned: tuple[User, int]) -> tuple[uuid.UUID, int]:
+    user, habit_id = owned
+    return user.id, habit_id
+
+
+def build_cases() -> list[Case]:
+    async def fresh_user(session: AsyncSession, fx: Fixture) -> User:
+        return await make_user(session, fx.password_hash)
+
+    async def fresh_habit(session: AsyncSession, fx: Fixture) -> tuple[User, int]:
+        # Отдельный пользователь, чтобы набор привычек fixture не менялся между кейсами
+        user = await make_user(session, fx.password_hash)
+        return user, (await HabitRepository(session).create(user.id, {"title": "Temp"})).id
+
+    async def checked_in(session: AsyncSession, fx: Fixture) -> date:
+        day = date.today() + timedelta(days=1)
+        await HabitTrackingRepository(session).upsert_many(
+            fx.user.id,
+            [{"habit_id": fx.habit_ids[0], "date": day, "status": HabitStatus.COMPLETED}],
+            date.today(),
+        )
+        return day
+
+    async def warm_cache(session: AsyncSession, fx: Fixture) -> HabitService:
+        service = HabitService(HabitRepository(session), fx.cache)
+        await service.get_user_habits(fx.user)
+        return service
+
+    async def prepare_batch(session: AsyncSession, fx: Fixture) -> HabitTrackingBatchCreate:
+        return HabitTrackingBatchCreate(items=[
+            HabitTrackingCreate(habit_id=habit_id, date=date.today(), status=HabitStatus.COMPLETED)
+            for habit_id in fx.habit_ids
+        ])
+
+    return [
+        # UserRepository
+        Case("user_repo.get", 1, lambda s, fx, _: UserRepository(s).get(fx.user.id)),
+        Case("user_repo.get_by_email", 1, lambda s, fx, _: UserRepository(s).get_by_email(fx.user.email)),
+        Case("user_repo.find_taken_identity", 1,
+             lambda s, fx, _: UserRepository(s).find_taken_identity(fx.user.email, "nobody")),
+        Case("user_repo.create", 1, lambda s, fx, _: make_user(s, fx.password_hash)),
+        Case("user_repo.update", 2,
+             lambda s, fx, user: UserRepository(s).update(user.id, {"streak_days": 3}),
+             prepare=fresh_user),
+
+        # HabitRepository
+        Case("habit_repo.get_all", 1, lambda s, fx, _: HabitRepository(s).get_all(fx.user.id)),
+        Case("habit_repo.get", 1, lambda s, fx, _: HabitRepository(s).get(fx.user.id, fx.habit_ids[0])),
+        Case("habit_repo.get_dashboard", 1,
+             lambda s, fx, _: HabitRepository(s).get_dashboard(fx.user.id, date.today())),
+        Case("habit_repo.create", 1,
+             lambda s, fx, user: HabitRepository(s).create(user.id, {"title": "New"}),
+             prepare=fresh_user),
+        Case("habit_repo.update", 2,
+             lambda s, fx, owned: HabitRepository(s).update(*owned_ids(owned), {"title": "Renamed"}),
+             prepare=fresh_habit),
+        Case("habit_repo.delete", 2,
+             lambda s, fx, owned: HabitRepository(s).delete(*owned_ids(owned)),
+             prepare=fresh_habit),
+
+        # Сервисы
+        Case("auth_service.register", 2,
+             lambda s, fx, _: AuthService(UserRepository(s)).register(UserCreate(
+                 username=unique("reg_"), email=f"{unique('reg_')}@example.com", password=PASSWORD,
+             ))),
+        Case("auth_service.login", 1,
+             lambda s, fx, _: AuthService(UserRepository(s)).login(
+                 LoginRequest(email=fx.user.email, password=PASSWORD)
+             )),
+        Case("auth_service.validate_token", 1,
+             lambda s, fx, _: AuthService(UserRepository(s)).validate_token(fx.token)),
+        Case("auth_service.authenticate", 0,
+             lambda s, fx, _: AuthService(UserRepository(s)).authenticate(fx.token)),
+        Case("habit_service.create_habit", 2,
+             lambda s, fx, user: HabitService(HabitRepository(s), FakeCache()).create_habit(
+                 user, HabitCreate(title="New")
+             ),
+             prepare=fresh_user),
+        Case("habit_service.update_habit", 2,
+             lambda s, fx, owned: HabitService(HabitRepository(s), FakeCache()).update_habit(
+                 *owned, HabitUpdate(title="Renamed")
+             ),
+             prepare=fresh_habit),
+        Case("habit_service.get_user_habits.cold", 1,
+             lambda s, fx, _: HabitService(HabitRepository(s), FakeCache()).get_user_habits(fx.user)),
+        Case("habit_service.get_user_habits.warm", 0,
+             lambda s, fx, service: service.get_user_habits(fx.user),
+             prepare=warm_cache),
+        Case("habit_service.get_dashboard", 1,
+             lambda s, fx, _: HabitService(HabitRepository(s), FakeCache()).get_dashboard(fx.user)),
+        Case("tracking_service.check_in_batch", 3,
+             lambda s, fx, data: TrackingService(
+                 HabitTrackingRepository(s), HabitRepository(s)
+             ).check_in_batch(fx.user, data),
+             prepare=prepare_batch),
+        Case("tracking_service.delete_check_in", 4,
+             lambda s, fx, day: TrackingService(
+                 HabitTrackingRepository(s), HabitRepository(s)
+             ).delete_check_in(fx.user, fx.habit_ids[0], day),
+             prepare=checked_in),
+        # Горизонт ленты, привычки, отметки, tombstones отметок и архивированные привычки
+        Case("sync_service.get_changes", 5,
+             lambda s, fx, _: SyncService(SyncRepository(s), timedelta(0)).get_changes(fx.user, None, 500)),
+    ]
@@ -0,0 +1,23 @@
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.core.security import get_password_hash
+from tests.repositories.cases import PASSWORD, build_cases, make_fixture
+
+
+@pytest.fixture(scope="session")
+async def fixture(database):
+    async with AsyncSessionLocal() as session:
+        return await make_fixture(session, get_password_hash(PASSWORD))
+
+
+@pytest.mark.parametrize("case", build_cases(), ids=lambda case: case.name)
+async def test_statement_budget(case, fixture, statements):
+    async with AsyncSessionLocal() as session:
+        prepared = await case.prepare(session, fixture) if case.prepare else None
+
+    async with AsyncSessionLocal() as session:
+        with statements:
+            await case.run(session, fixture, prepared)
+
+    assert statements.count <= case.budget, statements.statements
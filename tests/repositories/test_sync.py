@@ -0,0 +1,20 @@
+from sqlalchemy import func, select
+
+from app.core.database import AsyncSessionLocal
+from app.repositories.sync import SyncRepository
+
+
+async def horizon():
+    # pg_stat_activity читается снимком на транзакцию — каждый раз новая сессия
+    async with AsyncSessionLocal() as session:
+        return await SyncRepository(session).get_horizon()
+
+
+async def test_horizon_stops_at_oldest_open_transaction(database):
+    async with database.connect() as conn:
+        started = (await conn.execute(select(func.now()))).scalar_one()
+
+        # Строки этой транзакции получат метку started, но видны станут позже
+        assert await horizon() <= started
+
+    assert await horizon() > started
@@ -0,0 +1,36 @@
+import uuid
+
+from app.core.revocation import BloomFilter
+
+
+def test_no_false_negatives():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    items = [uuid.uuid4().hex for _ in range(10_000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    assert bloom.count == len(items)
+
+
+def test_false_positive_rate_within_bound():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for _ in range(10_000):
+        bloom.add(uuid.uuid4().hex)
+
+    probes = 20_000
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(probes))
+    # Запас вдвое к расчётной доле: тест не должен зависеть от случайности
+    assert false_positives / probes < 0.02
+
+
+def test_size_follows_capacity_and_error_rate():
+    bloom = BloomFilter(capacity=1_000_000, error_rate=0.01)
+    # ~9.6 бит и 7 хешей на элемент при 1% ложных срабатываний
+    assert 1_150_000 < bloom.nbytes < 1_250_000
+    assert bloom.hashes == 7
+
+
+def test_empty_filter():
+    bloom = BloomFilter(capacity=100, error_rate=0.01)
+    assert "jti" not in bloom
@@ -0,0 +1,44 @@
+import json
+from uuid import uuid4
+
+import pytest
+
+from app.core.events import EventHub, RedisEventBridge
+
+
+@pytest.fixture
+async def bridge():
+    # Redis.from_url не подключается до первой команды
+    bridge = RedisEventBridge(EventHub(queue_size=10), "redis://localhost:6379/0")
+    yield bridge
+    await bridge.stop()
+
+
+def message(**payload) -> bytes:
+    return json.dumps(payload).encode()
+
+
+async def test_malformed_messages_are_skipped(bridge):
+    user_id = uuid4()
+    subscription = bridge.hub.subscribe(user_id)
+    event = {"type": "habit.updated", "data": {"id": 1}}
+
+    for data in (
+        b"not json",
+        b"[1, 2]",
+        message(origin="other", event=event),
+        message(origin="other", user_id="not-a-uuid", event=event),
+        message(origin="other", user_id=str(user_id), event=event),
+    ):
+        bridge._handle(data)
+
+    assert list(subscription.buffer) == [event]
+
+
+async def test_own_messages_are_ignored(bridge):
+    user_id = uuid4()
+    subscription = bridge.hub.subscribe(user_id)
+
+    bridge._handle(message(origin=bridge.origin, user_id=str(user_id), event={"type": "x"}))
+
+    assert not subscription.buffer
@@ -0,0 +1,60 @@
+import base64
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.tracking import heatmap_codes, pack_bits, run_lengths
+
+
+def row(completed=None, failed=None, skipped=None):
+    return SimpleNamespace(completed=completed, failed=failed, skipped=skipped)
+
+
+def unpack(encoded: str, days: int) -> list[int]:
+    raw = base64.b64decode(encoded)
+    return [(raw[day // 4] >> (day % 4 * 2)) & 3 for day in range(days)]
+
+
+def test_heatmap_codes():
+    codes = heatmap_codes([row([0, 2], [1], [4]), row()], days=5)
+    assert codes.tolist() == [[1, 2, 1, 0, 3], [0, 0, 0, 0, 0]]
+    assert codes.dtype == np.uint8
+
+
+def test_pack_bits_round_trip():
+    codes = np.random.default_rng(3).integers(0, 4, size=(5, 37), dtype=np.uint8)
+    packed = pack_bits(codes)
+
+    assert len(packed) == 5
+    for encoded, expected in zip(packed, codes):
+        assert len(base64.b64decode(encoded)) == 10
+        assert unpack(encoded, 37) == expected.tolist()
+
+
+def test_pack_bits_low_bits_first():
+    [encoded] = pack_bits(np.array([[1, 2, 3, 0, 1]], dtype=np.uint8))
+    assert base64.b64decode(encoded) == bytes([0b00_11_10_01, 0b01])
+
+
+def test_pack_bits_without_habits():
+    assert pack_bits(np.zeros((0, 30), dtype=np.uint8)) == []
+
+
+def test_run_lengths():
+    codes = np.array([[1, 1, 0, 0, 0, 2], [3, 3, 3, 3, 3, 3], [0, 1, 0, 1, 0, 1]], dtype=np.uint8)
+    assert run_lengths(codes) == [
+        [1, 2, 0, 3, 2, 1],
+        [3, 6],
+        [0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1],
+    ]
+
+
+def test_run_lengths_cover_every_day():
+    codes = np.random.default_rng(5).integers(0, 4, size=(20, 90), dtype=np.uint8)
+    for runs, expected in zip(run_lengths(codes), codes):
+        decoded = [code for code, length in zip(runs[::2], runs[1::2]) for _ in range(length)]
+        assert decoded == expected.tolist()
+
+
+def test_run_lengths_without_habits():
+    assert run_lengths(np.zeros((0, 30), dtype=np.uint8)) == []
@@ -0,0 +1,97 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.milestone import (
+    EPOCH,
+    MIN_BROKEN_STREAK,
+    Milestone,
+    Progress,
+    advance,
+    level,
+    replay,
+    transition,
+)
+
+DAY = date(2026, 1, 1)
+
+
+def fold(days: list[int], completed: list[bool], goal: int) -> tuple[Progress, list]:
+    progress, events = Progress(), []
+    for day, done in zip(days, completed):
+        progress, reached = transition(
+            progress, advance(progress, EPOCH + timedelta(days=day), done), goal
+        )
+        events.extend(reached)
+    return progress, events
+
+
+@pytest.mark.parametrize("streak, goal, expected", [
+    (0, 21, 0), (10, 21, 0), (11, 21, 1), (20, 21, 1), (21, 21, 2), (30, 21, 2),
+    (1, 1, 2), (0, 1, 0), (1, 2, 1),
+])
+def test_level(streak, goal, expected):
+    assert level(streak, goal) == expected
+
+
+def test_advance_extends_run_on_next_day():
+    progress = advance(Progress(), DAY, True)
+    assert progress == Progress(1, DAY, DAY, 0)
+
+    progress = advance(progress, DAY + timedelta(days=1), True)
+    assert progress == Progress(2, DAY, DAY + timedelta(days=1), 0)
+
+
+def test_advance_gap_and_failure_reset_run():
+    progress = Progress(5, DAY, DAY + timedelta(days=4), 1)
+
+    later = DAY + timedelta(days=7)
+    assert advance(progress, later, True) == Progress(1, later, later, 0)
+    assert advance(progress, later, False) == Progress(0, None, later, 0)
+
+
+def test_milestones_are_reported_once_per_run():
+    goal = 4
+    days = list(range(10))
+    _, events = fold(days, [True] * 10, goal)
+    assert events == [(Milestone.HALF, 2), (Milestone.GOAL, 4)]
+
+
+def test_broken_run_is_reported_from_min_length():
+    short = [True] * (MIN_BROKEN_STREAK - 1) + [False]
+    _, events = fold(list(range(len(short))), short, goal=21)
+    assert events == []
+
+    long = [True] * MIN_BROKEN_STREAK + [False]
+    _, events = fold(list(range(len(long))), long, goal=21)
+    assert events == [(Milestone.BROKEN, MIN_BROKEN_STREAK)]
+
+
+def test_transition_keeps_passed_level_within_run():
+    old = Progress(3, DAY, DAY + timedelta(days=2), 2)
+    new = Progress(4, DAY, DAY + timedelta(days=3), 0)
+    progress, events = transition(old, new, goal=3)
+    assert events == []
+    assert progress.milestone == 2
+
+
+def test_replay_matches_fold():
+    rng = random.Random(7)
+    days, completed = [], []
+    for _ in range(300):
+        marked = sorted(rng.sample(range(200), rng.randrange(0, 120)))
+        days.append(marked)
+        completed.append([rng.random() < 0.8 for _ in marked])
+    # Привычки без отметок приходят из LATERAL array_agg как NULL
+    days.append(None)
+    completed.append(None)
+
+    for state, marked, done in zip(replay(days, completed), days, completed):
+        expected, _ = fold(marked or [], done or [], goal=21)
+        assert state[:3] == expected[:3]
+        assert state.milestone == 0
+
+
+def test_replay_empty():
+    assert replay([], []) == []
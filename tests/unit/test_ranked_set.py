@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from app.core.leaderboard import RankedSet
+
+
+def check(ranked: RankedSet, expected: list) -> None:
+    assert len(ranked) == len(expected)
+    assert ranked.slice(0, len(expected)) == expected
+    for position, key in enumerate(expected):
+        assert ranked.index(key) == position
+
+
+def test_add_remove_match_sorted_list():
+    rng = random.Random(1)
+    ranked, expected = RankedSet(), []
+    for _ in range(2000):
+        key = (rng.randrange(100), rng.random())
+        if expected and rng.random() < 0.3:
+            key = expected.pop(rng.randrange(len(expected)))
+            ranked.remove(key)
+        else:
+            ranked.add(key)
+            expected.append(key)
+            expected.sort()
+    check(ranked, expected)
+
+
+def test_fill_builds_same_set_as_add():
+    keys = sorted(random.Random(2).sample(range(10_000), 500))
+    ranked = RankedSet()
+    ranked.fill(keys)
+    check(ranked, keys)
+
+    ranked.add(-1)
+    ranked.remove(keys[10])
+    check(ranked, [-1] + keys[:10] + keys[11:])
+
+
+def test_fill_requires_empty_set():
+    ranked = RankedSet()
+    ranked.add(1)
+    with pytest.raises(ValueError):
+        ranked.fill([2, 3])
+
+
+@pytest.mark.parametrize("start, stop, expected", [
+    (2, 5, [2, 3, 4]),
+    (-3, 2, [0, 1]),
+    (8, 20, [8, 9]),
+    (5, 5, []),
+    (12, 15, []),
+])
+def test_slice_bounds(start, stop, expected):
+    ranked = RankedSet()
+    ranked.fill(list(range(10)))
+    assert ranked.slice(start, stop) == expected
+
+
+def test_missing_key():
+    ranked = RankedSet()
+    ranked.fill([1, 3])
+    with pytest.raises(KeyError):
+        ranked.index(2)
+    with pytest.raises(KeyError):
+        ranked.remove(2)
+    check(ranked, [1, 3])
@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.core.revocation import FakeRevocationBackend, RevocationStore
+
+
+class FlakyBackend(FakeRevocationBackend):
+    """Первые failures чтений изменений падают не DatabaseError."""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    async def get_changes(self, since, horizon):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("connection reset")
+        return await super().get_changes(since, horizon)
+
+
+async def test_refresh_loop_survives_unexpected_errors():
+    backend = FlakyBackend(failures=0)
+    store = RevocationStore(
+        backend,
+        capacity=1000,
+        error_rate=0.01,
+        lru_size=100,
+        refresh_seconds=0.01,
+        rebuild_seconds=3600,
+        max_token_lifetime=timedelta(days=1),
+    )
+    await store.start()
+    backend.failures = 3
+    try:
+        # Отзыв на другом воркере: попадает в хранилище, минуя этот store
+        expires = datetime.now(timezone.utc) + timedelta(hours=1)
+        await backend.revoke("jti-1", uuid4(), expires)
+
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if "jti-1" in store._bloom:
+                break
+
+        assert backend.failures == 0
+        assert "jti-1" in store._bloom
+        assert not store._task.done()
+    finally:
+        await store.stop()
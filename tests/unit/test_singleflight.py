@@ -0,0 +1,71 @@
+import asyncio
+
+from app.core.singleflight import SingleFlight
+
+
+class Store:
+    """Источник данных: чтение берёт снимок сразу, а отвечает по сигналу."""
+
+    def __init__(self) -> None:
+        self.value = "old"
+        self.release = asyncio.Event()
+        self.loads = 0
+
+    async def load(self) -> str:
+        self.loads += 1
+        snapshot = self.value
+        await self.release.wait()
+        return snapshot
+
+    async def started(self, loads: int) -> None:
+        while self.loads < loads:
+            await asyncio.sleep(0)
+
+
+async def test_read_started_before_write_is_not_joined_after_commit():
+    flight, store = SingleFlight(), Store()
+
+    before = asyncio.ensure_future(flight.do("user", "list", store.load))
+    await store.started(1)
+
+    async with flight.writing("user"):
+        store.value = "new"
+        # Коммит прошёл, но запись ещё не завершилась (события, кэш)
+        after = asyncio.ensure_future(flight.do("user", "list", store.load))
+        await store.started(2)
+
+    store.release.set()
+
+    assert await before == "old"
+    assert await after == "new"
+    assert store.loads == 2
+
+
+async def test_read_started_during_write_is_not_joined_after_it():
+    flight, store = SingleFlight(), Store()
+
+    async with flight.writing("user"):
+        # Чтение между началом записи и коммитом видит старые данные
+        during = asyncio.ensure_future(flight.do("user", "list", store.load))
+        await store.started(1)
+        store.value = "new"
+
+    after = asyncio.ensure_future(flight.do("user", "list", store.load))
+    await store.started(2)
+    store.release.set()
+
+    assert await during == "old"
+    assert await after == "new"
+    assert flight.stats["inflight"] == 0
+
+
+async def test_reads_outside_writes_are_merged():
+    flight, store = SingleFlight(), Store()
+
+    first = asyncio.ensure_future(flight.do("user", "list", store.load))
+    second = asyncio.ensure_future(flight.do("user", "list", store.load))
+    await store.started(1)
+    store.release.set()
+
+    assert await asyncio.gather(first, second) == ["old", "old"]
+    assert store.loads == 1
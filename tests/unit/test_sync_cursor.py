@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.exceptions import BusinessError
+from app.repositories.sync import KIND_ARCHIVED, KIND_HABIT, KIND_TOMBSTONE, SyncCursor
+from app.services.sync import SyncService
+
+
+@pytest.mark.parametrize("cursor", [
+    SyncCursor(datetime(2026, 6, 9, 10, 30, 0, 123456, tzinfo=timezone.utc), KIND_HABIT, 42),
+    SyncCursor(datetime(2026, 1, 1, tzinfo=timezone.utc), KIND_TOMBSTONE, 1),
+    SyncCursor(datetime(2026, 12, 31, 23, 59, 59, 999999, tzinfo=timezone.utc), KIND_ARCHIVED, 2**40),
+])
+def test_cursor_round_trip(cursor):
+    encoded = SyncService.encode_cursor(cursor)
+    assert "=" not in encoded
+    assert SyncService.decode_cursor(encoded) == cursor
+
+
+def test_cursors_are_url_safe():
+    cursor = SyncCursor(datetime(2026, 6, 9, tzinfo=timezone.utc), KIND_HABIT, 10**12)
+    encoded = SyncService.encode_cursor(cursor)
+    assert all(c.isalnum() or c in "-_" for c in encoded)
+
+
+@pytest.mark.parametrize("value", [
+    "not base64!",
+    "bm90IGEgY3Vyc29y",  # "not a cursor"
+    "MjAyNi0wNi0wOXwwfHg",  # "2026-06-09|0|x"
+    "//79",
+])
+def test_invalid_cursor(value):
+    with pytest.raises(BusinessError):
+        SyncService.decode_cursor(value)